@@ -3,33 +3,66 @@
 EG4-SRP Monitor - Simplified monitoring and alerting system
 """
 
+import time
+STARTUP_STARTED = time.monotonic()  # Origin of the startup phase timings
+
 from flask import Flask, render_template, jsonify, request, make_response, send_from_directory
-from flask_socketio import SocketIO, emit
+from flask_socketio import SocketIO, emit, join_room, leave_room
 import asyncio
-from playwright.async_api import async_playwright
 from datetime import datetime, timedelta
 import os
 from dotenv import load_dotenv
 import subprocess
 import threading
-import time
+import signal
+import socket
+import weakref
 import logging
 import sys
 import json
+import copy
 import pytz
+import atexit
 from logging.handlers import RotatingFileHandler
 from collections import deque
 import csv
 import glob
+from urllib.parse import parse_qs, urlparse
+import re
 
 # Import data storage module
 try:
-    from data_storage import DataStorage, CachedDataStorage
+    from data_storage import DataStorage, CachedDataStorage, ALL_EG4_DEVICES
     DATA_STORAGE_AVAILABLE = True
 except ImportError as e:
     print(f"Warning: Data storage module not available: {e}")
     DATA_STORAGE_AVAILABLE = False
 
+# Import adaptive polling scheduler
+from polling_scheduler import AdaptiveScheduler
+from browser_memory import BrowserMemoryTracker, child_pids
+from hot_standby import HotStandby, swap_browser_state
+from circuit_breaker import CircuitBreaker
+from scrape_phases import PhaseStats, PhaseTimer, timed_phase
+from readiness import ReadinessWaits
+from srp_exports import SRPExportStore, APPENDED
+from modbus_source import ModbusInverterSource
+from ingest import IngestError, parse_batch, parse_timestamp
+from live_state import LiveState, strip_debug
+from topic_hub import TopicHub, DEVICE_ROOM_PREFIX, is_topic_room, topic_rooms
+from warm_start import RecentHistory, HISTORY_FIELDS, encode_snapshot, write_snapshot, load_snapshot
+
+# Import EG4 HTTP collector module
+try:
+    from eg4_http_client import (EG4HttpClient, SessionExpiredError, RUNTIME_PATH, AIOHTTP_AVAILABLE,
+                                 parse_runtime_payload)
+    EG4_HTTP_CLIENT_AVAILABLE = AIOHTTP_AVAILABLE
+    EG4_RUNTIME_API_AVAILABLE = True
+except ImportError as e:
+    print(f"Warning: EG4 HTTP collector not available: {e}")
+    EG4_HTTP_CLIENT_AVAILABLE = False
+    EG4_RUNTIME_API_AVAILABLE = False
+
 # Configure logging with rotation
 LOG_FILE = './logs/eg4_srp_monitor.log'
 LOG_MAX_SIZE = 10 * 1024 * 1024  # 10MB
@@ -38,27 +71,8 @@ LOG_BACKUP_COUNT = 3
 # Create formatters
 log_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 
-# Set up root logger
+# Root logger; its handlers are added by setup_logging() at startup
 root_logger = logging.getLogger()
-root_logger.setLevel(logging.DEBUG)
-
-# Suppress Werkzeug production warnings
-werkzeug_logger = logging.getLogger('werkzeug')
-werkzeug_logger.setLevel(logging.ERROR)
-
-# Console handler (for Docker logs)
-console_handler = logging.StreamHandler(sys.stdout)
-console_handler.setFormatter(log_formatter)
-root_logger.addHandler(console_handler)
-
-# Rotating file handler (for web interface)
-file_handler = RotatingFileHandler(
-    LOG_FILE,
-    maxBytes=LOG_MAX_SIZE,
-    backupCount=LOG_BACKUP_COUNT
-)
-file_handler.setFormatter(log_formatter)
-root_logger.addHandler(file_handler)
 
 # Get logger for this module
 logger = logging.getLogger(__name__)
@@ -66,23 +80,70 @@ logger = logging.getLogger(__name__)
 # In-memory log buffer for web interface (last 1000 lines)
 log_buffer = deque(maxlen=1000)
 
+# Socket.IO topic subscriptions, with emits coalesced per topic
+topic_hub = TopicHub()
+topic_flusher = None
+# Most log entries sent to clients in one coalesced message
+LOG_ENTRIES_PER_MESSAGE = 200
+# Seconds between checks of the housekeeping thread
+HOUSEKEEPING_INTERVAL = 10
+
 class WebLogHandler(logging.Handler):
     """Custom handler to store logs in memory for web interface"""
     def emit(self, record):
         log_entry = self.format(record)
-        log_buffer.append({
+        entry = {
             'timestamp': record.created,
             'level': record.levelname,
             'message': log_entry
-        })
+        }
+        log_buffer.append(entry)
+        # Stream to clients watching the logs
+        if topic_hub.watched('logs'):
+            topic_hub.submit('logs', [entry], send_log_entries,
+                             combine=lambda pending, new: (pending + new)[-LOG_ENTRIES_PER_MESSAGE:])
+
+def send_log_entries(entries):
+    socketio.emit('log_entries', {'logs': entries}, to='logs')
 
-# Add web handler to root logger
-web_handler = WebLogHandler()
-web_handler.setFormatter(log_formatter)
-root_logger.addHandler(web_handler)
+def setup_logging():
+    """Attach the console, rotating file and web handlers to the root logger
+
+    Called from the startup path rather than at import, so importing this module
+    (tests, tools) neither opens the log file nor duplicates handlers.
+    """
+    if any(isinstance(handler, WebLogHandler) for handler in root_logger.handlers):
+        return
+    root_logger.setLevel(logging.DEBUG)
+    
+    # Suppress Werkzeug production warnings
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    
+    # Console handler (for Docker logs)
+    console_handler = logging.StreamHandler(sys.stdout)
+    console_handler.setFormatter(log_formatter)
+    root_logger.addHandler(console_handler)
+    
+    # Rotating file handler (for web interface)
+    os.makedirs(os.path.dirname(LOG_FILE), exist_ok=True)
+    file_handler = RotatingFileHandler(
+        LOG_FILE,
+        maxBytes=LOG_MAX_SIZE,
+        backupCount=LOG_BACKUP_COUNT
+    )
+    file_handler.setFormatter(log_formatter)
+    root_logger.addHandler(file_handler)
+    
+    # Web handler for the in-memory buffer and the logs topic
+    web_handler = WebLogHandler()
+    web_handler.setFormatter(log_formatter)
+    root_logger.addHandler(web_handler)
 
 load_dotenv()
 
+# Port the web interface listens on
+PORT = int(os.getenv('EG4_SRP_MONITOR_PORT', '5002'))
+
 app = Flask(__name__)
 app.config['SECRET_KEY'] = os.urandom(24).hex()
 socketio = SocketIO(app, cors_allowed_origins="*")
@@ -91,30 +152,82 @@ socketio = SocketIO(app, cors_allowed_origins="*")
 eg4_monitor = None
 srp_monitor = None
 enphase_monitor = None
+eg4_fleet = None
+modbus_source = None
+poll_scheduler = None
+browser_memory = BrowserMemoryTracker()
+scrape_timings = PhaseStats()
+readiness_waits = ReadinessWaits()
+hot_standbys = {}
+circuit_breakers = {}
 
 # Global state
 monitor_data = {
     'eg4': {},
+    'eg4_devices': {},  # Latest sample per inverter, keyed by device
     'srp': {},
     'enphase': {},
-    'last_update': None
+    'last_update': None,
+    'eg4_connected': False,
+    'enphase_connected': False
 }
+# Held while changing more than one value of monitor_data, or a dict nested in it,
+# so the warm-start snapshot copies it in a consistent state
+monitor_data_lock = threading.Lock()
+
+# Recent EG4 samples per device, carried across restarts by the warm-start snapshot
+recent_history = RecentHistory()
+# Date of the last successful SRP update, restored at boot so a restart does not rescrape
+last_srp_update_date = None
+# What the warm-start snapshot restored, reported in /api/status; the scheduler part is applied by the monitor loop
+warm_start_status = {'restored': False, 'snapshot_age_seconds': None, 'load_ms': None, 'history_samples': 0}
+warm_start_scheduler = None
+
+# Versioned state pushed to dashboard clients as snapshots and deltas
+live_state = LiveState()
 
-# Initialize data storage
+# Data storage (opened by init_data_storage at startup)
 data_storage = None
 cached_data_storage = None
 
-if DATA_STORAGE_AVAILABLE:
+# Startup phase timings in seconds since module load, reported in /api/status
+startup_timings = {
+    'module_loaded': None,
+    'storage_ready': None,
+    'data_restored': None,
+    'server_ready': None,
+    'monitor_started': None,
+    'browsers_ready': None,
+    'logins_ready': None,
+    'first_eg4_sample': None,
+    'browser_launch_seconds': {}  # Per-source launch duration
+}
+
+def mark_startup(phase):
+    """Record when a startup phase completed, the first time it does"""
+    if startup_timings.get(phase) is None:
+        startup_timings[phase] = round(time.monotonic() - STARTUP_STARTED, 3)
+
+def init_data_storage():
+    """Open the database, at startup rather than at import"""
+    global data_storage, cached_data_storage
+    if data_storage:
+        return
+    if not DATA_STORAGE_AVAILABLE:
+        logger.warning("Data storage not available - running without persistence")
+        return
     try:
-        data_storage = DataStorage()
+        tiers = {key: value for key, value in alert_config['storage_tiers'].items() if key != 'rollup_interval'}
+        data_storage = DataStorage(tiers=tiers, series=alert_config.get('series_store'),
+                                   change_detection=alert_config.get('change_detection'),
+                                   primary_device=primary_eg4_device())
         cached_data_storage = CachedDataStorage(data_storage)
         logger.info("Data storage initialized successfully")
     except Exception as e:
         logger.error(f"Failed to initialize data storage: {e}")
         data_storage = None
         cached_data_storage = None
-else:
-    logger.warning("Data storage not available - running without persistence")
+    mark_startup('storage_ready')
 
 # Track manual refresh requests
 manual_refresh_requested = False
@@ -125,6 +238,55 @@ last_manual_refresh = None
 # Configuration file path
 CONFIG_FILE = './config/config.json'
 
+# Saved browser login state (cookies + local storage) per source
+SESSION_STATE_DIR = './data/sessions'
+SESSION_STATE_MAX_AGE = 12 * 3600  # Ignore saved sessions older than 12 hours
+
+# Portal base URLs - overridable per source, e.g. to point a monitor at a local fixture server
+DEFAULT_PORTAL_URLS = {
+    'eg4': 'https://monitor.eg4electronics.com',
+    'srp': 'https://myaccount.srpnet.com',
+    'enphase': 'https://enlighten.enphaseenergy.com'
+}
+
+# Where SRP CSV exports are saved
+DOWNLOADS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'downloads')
+
+# Per-source request routing defaults - images, fonts and media are aborted. Requests
+# outside the first-party domains are only logged unless enforce_domains is set, as
+# login flows may load scripts, captchas or SSO pages from other hosts
+DEFAULT_RESOURCE_POLICIES = {
+    'eg4': {
+        'enabled': True,
+        'blocked_types': ['image', 'font', 'media'],
+        'allowed_domains': ['eg4electronics.com'],
+        'enforce_domains': False
+    },
+    'srp': {
+        'enabled': True,
+        'blocked_types': ['image', 'font', 'media'],
+        'allowed_domains': ['srpnet.com'],
+        'enforce_domains': False
+    },
+    'enphase': {
+        'enabled': True,
+        'blocked_types': ['image', 'font', 'media'],
+        'allowed_domains': ['enphaseenergy.com'],
+        'enforce_domains': False
+    }
+}
+
+# Typical body size per resource type (bytes), used for bytes-saved estimates of types
+# that are always blocked and so never loaded to learn an average from
+DEFAULT_BLOCKED_TYPE_SIZES = {
+    'image': 25000,
+    'font': 40000,
+    'media': 250000,
+    'stylesheet': 15000,
+    'script': 50000,
+    'other': 5000
+}
+
 # Default configuration
 alert_config = {
     'email_enabled': False,
@@ -149,6 +311,107 @@ alert_config = {
         'grid_import_start_hour': 14,  # 2 PM
         'grid_import_end_hour': 20     # 8 PM
     },
+    'eg4_collector': {
+        'mode': 'browser',         # 'browser' (page reloads) or 'http' (direct runtime polling)
+        'serial_number': '',       # Inverter serial, captured from the monitor page when empty
+        'http_poll_interval': 15,  # Seconds between HTTP polls
+        'page_refresh': 'fetch',   # Browser mode on the monitor page: 'fetch' (re-issue its runtime request) or 'reload'
+        'full_reload_interval': 1800  # Seconds between full page reloads while refreshing with 'fetch'
+    },
+    'eg4_fleet': {
+        'primary_device': 'primary',  # Device key for the inverter collected by the main EG4 monitor
+        'targets': [],                # Additional inverters: {'device', 'serial_number', 'username', 'password'}
+        'concurrency': 4,             # Runtime requests in flight at once across all targets
+        'poll_interval': 60           # Seconds between collections of the additional inverters
+    },
+    'eg4_modbus': {
+        'enabled': False,     # Read the primary inverter over Modbus/TCP on the LAN instead of the portal
+        'host': '',           # Inverter or WiFi dongle address
+        'port': 502,
+        'unit_id': 1,
+        'poll_interval': 2,   # Seconds between samples
+        'timeout': 2,         # Seconds allowed per connect or register read
+        'stale_after': 30     # Seconds without a sample before the EG4 browser takes over again
+    },
+    'ingest': {
+        'max_samples': 50000,  # Samples accepted per POST /api/ingest request
+        'max_body_mb': 32      # Largest request body accepted
+    },
+    'storage_tiers': {
+        'enabled': False,        # Keep raw EG4 samples briefly and roll older ones up (for 1-second sampling)
+        'raw_hours': 48,         # Raw samples (hot tier)
+        'minute_days': 30,       # 1-minute rollups with avg/min/max (warm tier)
+        'hour_days': 1825,       # 1-hour rollups (cold tier)
+        'keep_raw_json': False,  # Also store each raw sample's full JSON document
+        'rollup_interval': 300   # Seconds between rollup and trim runs
+    },
+    'series_store': {
+        'enabled': False,        # Pack completed windows of raw EG4 samples into compressed chunks
+        'window_minutes': 60     # Samples per chunk, must divide a day
+    },
+    'live_updates': {
+        'enabled': True,                       # Send a snapshot on connect and field-level deltas afterwards
+        'history': 500,                        # Deltas kept for reconnecting clients
+        'legacy_events': False,                # Also emit full eg4_update/srp_update/... events for older clients
+        'coalesce_interval': 1.0,              # Seconds; bursts of updates send one message per topic (0 = send at once)
+        'default_topics': ['eg4', 'eg4_devices', 'srp', 'enphase', 'health', 'alerts']  # For clients naming none
+    },
+    'warm_start': {
+        'enabled': True,                       # Snapshot live state periodically and restore it at boot
+        'path': './data/warm_start.json',
+        'interval': 60,                        # Seconds between snapshots
+        'max_age_minutes': 360,                # Ignore older snapshots at boot
+        'history_minutes': 180                 # Recent EG4 samples kept per device
+    },
+    'change_detection': {
+        'enabled': False,        # Extend the previous EG4 row instead of inserting an unchanged sample
+        'max_run_minutes': 60,   # Start a new row at least this often
+        'max_gap_seconds': 300,  # A longer gap between samples ends the run
+        'deadbands': {}          # Per-column tolerances overriding the defaults, e.g. {"load_power": 50}
+    },
+    'portal_urls': dict(DEFAULT_PORTAL_URLS),
+    'resource_policy': copy.deepcopy(DEFAULT_RESOURCE_POLICIES),
+    'srp_session': {
+        'probe_url': None,    # Requested without rendering, defaults to the usage page
+        'cache_seconds': 300,  # Trust a successful probe for this long
+        'auth_cookies': []     # Names of SRP's session cookies; empty = any SRP cookie
+    },
+    'srp_csv': {
+        'concurrency': 4,  # Chart exports running at once, each in its own page
+        'keep_files': 5,   # Newest export files kept per chart, whatever their age
+        'keep_days': 30    # Older exports beyond keep_files are pruned after this many days
+    },
+    'enphase_extraction': {
+        'mode': 'api',  # 'api' (JSON fetched inside the loaded page) or 'page' (full page text scrape)
+        'api_paths': ['/pv/systems/{system_id}/today'],
+        'page_refresh_minutes': 30  # Full page scrape for fields the API does not provide
+    },
+    'scheduler': {
+        'enabled': True,        # Adapt EG4/Enphase polling intervals instead of a fixed 60s
+        'night_start_hour': 20,
+        'night_end_hour': 6,
+        'sources': {}           # Per-source min_interval/max_interval/base_interval overrides
+    },
+    'browser_memory': {
+        'max_pss_mb': 500,       # Recycle a source's browser when its Chromium processes exceed this PSS
+        'max_age_minutes': 360,  # Recycle a source's browser after this long even if under budget
+        'min_age_minutes': 30,   # Never recycle a browser younger than this
+        'over_budget_samples': 3,  # Consecutive samples over max_pss_mb before recycling
+        'sources': {}            # Per-source overrides of the settings above
+    },
+    'circuit_breaker': {
+        'failure_threshold': 3,  # Consecutive failed polls before a source's circuit opens
+        'base_delay': 60,        # First open period in seconds, doubled on each failed probe
+        'max_delay': 1800,       # Longest open period in seconds
+        'jitter': 0.2,           # Random +/- fraction applied to each open period
+        'sources': {}            # Per-source overrides of the settings above
+    },
+    'hot_standby': {
+        'enabled': False,             # Keep a logged-in spare browser per critical source
+        'sources': ['eg4'],           # Sources with a spare ('eg4', 'enphase')
+        'failover_after_failures': 2, # Consecutive failed polls before swapping to the spare
+        'keepalive_minutes': 10       # How often the spare's session is revalidated
+    },
     'last_alerts': {
         'battery_checked_date': None,
         'peak_demand_checked_date': None,
@@ -185,26 +448,12 @@ def save_config():
         logger.error(f"Failed to save config: {e}")
 
 def kill_zombie_browsers():
-    """Kill all zombie browser processes to prevent thread exhaustion"""
+    """Kill orphaned browser processes left behind by this monitor's own browsers"""
     try:
-        # Count existing browser processes first
-        result = subprocess.run(['pgrep', '-f', 'chromium|chrome.*headless'], 
-                              capture_output=True, text=True)
-        if result.stdout:
-            process_count = len(result.stdout.strip().split('\n'))
-            logger.warning(f"Found {process_count} browser processes, cleaning up...")
-            
-            # Kill all chromium/chrome headless processes
-            subprocess.run(['pkill', '-9', '-f', 'chromium|chrome.*headless'], 
-                         capture_output=True)
-            
-            # Clean up playwright temp directories
-            subprocess.run(['rm', '-rf', '/tmp/playwright*'], 
-                         capture_output=True)
-            
-            logger.info("Zombie browser cleanup completed")
-            return process_count
-        return 0
+        killed_count = browser_memory.kill_orphans()
+        if killed_count:
+            logger.warning(f"Killed {killed_count} orphaned browser processes")
+        return killed_count
     except Exception as e:
         logger.error(f"Error during zombie browser cleanup: {e}")
         return 0
@@ -217,13 +466,10 @@ def check_system_resources():
         test_thread.start()
         test_thread.join(timeout=1)
         
-        # Check browser process count
-        result = subprocess.run(['pgrep', '-f', 'chromium|chrome.*headless'], 
-                              capture_output=True, text=True)
-        browser_count = len(result.stdout.strip().split('\n')) if result.stdout else 0
-        
-        if browser_count > 10:
-            logger.warning(f"High browser process count detected: {browser_count}")
+        # Check for browser processes of ours that outlived their Playwright driver
+        orphans = browser_memory.orphaned_pids()
+        if orphans:
+            logger.warning(f"Orphaned browser processes detected: {len(orphans)}")
             return False
             
         return True
@@ -231,8 +477,308 @@ def check_system_resources():
         logger.error(f"Resource check failed: {e}")
         return False
 
+# One driver start at a time per event loop, so each new driver process is attributed to its source
+playwright_start_locks = weakref.WeakKeyDictionary()
+
+async def start_playwright(source):
+    """Start a Playwright driver and track its process tree for memory budgeting"""
+    # Imported here so the web server doesn't wait for Playwright to load
+    from playwright.async_api import async_playwright
+    
+    lock = playwright_start_locks.setdefault(asyncio.get_running_loop(), asyncio.Lock())
+    async with lock:
+        existing = child_pids(os.getpid())
+        playwright = await async_playwright().start()
+        new_pids = child_pids(os.getpid()) - existing
+    if len(new_pids) == 1:
+        browser_memory.register(source, new_pids.pop())
+    else:
+        logger.debug(f"Could not identify {source.upper()} Playwright driver process ({len(new_pids)} candidates)")
+    return playwright
+
+async def manage_browser_memory(monitors):
+    """Sample each browser's PSS and recycle any over its memory or age budget
+    
+    Called between scrapes so a recycle never interrupts a page in use.
+    """
+    config = alert_config.get('browser_memory', {})
+    for source, monitor in monitors.items():
+        if not monitor.browser:
+            continue
+        budget = dict(config, **config.get('sources', {}).get(source, {}))
+        browser_memory.sample(source)
+        reason = browser_memory.needs_recycle(source, budget.get('max_pss_mb'), budget.get('max_age_minutes'),
+                                              budget.get('min_age_minutes', 30), budget.get('over_budget_samples', 3))
+        if not reason:
+            continue
+        logger.info(f"Recycling {source.upper()} browser: {reason}")
+        try:
+            await monitor.recycle()
+            browser_memory.record_recycle(source)
+            # A relaunched spare restored its saved session, which must be checked before a failover relies on it
+            for standby in hot_standbys.values():
+                if standby.spare is monitor:
+                    standby.recycled()
+        except Exception as e:
+            logger.error(f"Error recycling {source.upper()} browser: {e}")
+
+def create_hot_standbys():
+    """Create spare browser managers for the configured critical sources"""
+    config = alert_config.get('hot_standby', {})
+    if not config.get('enabled'):
+        return {}
+    factories = {
+        'eg4': lambda: EG4Monitor(standby=True),
+        'enphase': lambda: EnphaseMonitor(standby=True)
+    }
+    keepalive_seconds = config.get('keepalive_minutes', 10) * 60
+    standbys = {}
+    for source in config.get('sources', []):
+        if source in factories:
+            standbys[source] = HotStandby(source, factories[source], keepalive_seconds)
+        else:
+            logger.warning(f"Hot standby is not supported for source '{source}'")
+    return standbys
+
+async def maintain_hot_standbys():
+    """Build missing spare browsers and revalidate the sessions of ready ones"""
+    for standby in hot_standbys.values():
+        await standby.keep_warm()
+
+def session_state_path(source):
+    """Get the saved storage state file for a source"""
+    return os.path.join(SESSION_STATE_DIR, f'{source}_storage_state.json')
+
+async def save_session_state(source, context):
+    """Persist a logged-in browser context's storage state, readable by the owner only"""
+    try:
+        os.makedirs(SESSION_STATE_DIR, mode=0o700, exist_ok=True)
+        state = await context.storage_state()
+        path = session_state_path(source)
+        tmp_path = f'{path}.tmp'
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, path)
+        logger.debug(f"Saved {source.upper()} session state")
+    except Exception as e:
+        logger.warning(f"Failed to save {source.upper()} session state: {e}")
+
+def load_session_state(source):
+    """Return the saved storage state path for a source if it is recent enough to reuse"""
+    path = session_state_path(source)
+    try:
+        if os.path.exists(path) and time.time() - os.path.getmtime(path) < SESSION_STATE_MAX_AGE:
+            return path
+    except OSError:
+        pass
+    return None
+
+def clear_session_state(source):
+    """Remove a saved storage state, e.g. after credentials change"""
+    try:
+        os.remove(session_state_path(source))
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logger.warning(f"Failed to remove {source.upper()} session state: {e}")
+
+def portal_url(source, path=''):
+    """Absolute URL on a source's portal, honouring any configured base URL override"""
+    base = alert_config.get('portal_urls', {}).get(source) or DEFAULT_PORTAL_URLS[source]
+    return base.rstrip('/') + path
+
+# A password field, as on the login forms the scrapers fill in
+LOGIN_FORM_PATTERN = re.compile(r'<input[^>]*\b(?:type|name)\s*=\s*["\']?password', re.IGNORECASE)
+
+def is_login_page(html):
+    """Whether a page is a login form, by the markers the scrapers' login checks use"""
+    return bool(LOGIN_FORM_PATTERN.search(html)) or ('username' in html and 'password' in html)
+
+async def probe_session(context, url, timeout=10000):
+    """Check a restored session with a single request, without rendering a page
+    
+    Some portals answer an expired session with the login form itself (HTTP
+    200) rather than a redirect, so the body is checked too.
+    """
+    try:
+        response = await context.request.get(url, max_redirects=0, timeout=timeout)
+        if 300 <= response.status < 400:
+            return 'login' not in response.headers.get('location', '').lower()
+        if not response.ok or 'login' in response.url.lower():
+            return False
+        return not is_login_page(await response.text())
+    except Exception as e:
+        logger.debug(f"Session probe of {url} failed: {e}")
+        return False
+
+class ResourcePolicy:
+    """Per-source request routing that aborts resources the scrapers don't need"""
+    
+    def __init__(self, source):
+        self.source = source
+        config = dict(DEFAULT_RESOURCE_POLICIES.get(source, {}))
+        config.update(alert_config.get('resource_policy', {}).get(source, {}))
+        self.enabled = config.get('enabled', True)
+        self.blocked_types = set(config.get('blocked_types', []))
+        # Optional allowlist of resource types, every type not blocked is loaded without one
+        self.allowed_types = set(config.get('allowed_types', []))
+        self.allowed_domains = [domain.lower() for domain in config.get('allowed_domains', [])]
+        # Without enforcement, requests outside allowed_domains are loaded and only counted
+        self.enforce_domains = config.get('enforce_domains', False)
+        # Always allow the configured portal host, which may be a local fixture server
+        portal_host = (urlparse(portal_url(source)).hostname or '').lower() if source in DEFAULT_PORTAL_URLS else ''
+        if self.allowed_domains and portal_host and not self.is_allowed_host(portal_host):
+            self.allowed_domains.append(portal_host)
+        # Average response size per resource type, learned from loaded responses
+        self.type_sizes = {}
+        # Fallback sizes for types that are never loaded, e.g. images and fonts
+        self.default_sizes = dict(DEFAULT_BLOCKED_TYPE_SIZES)
+        self.default_sizes.update(config.get('blocked_type_sizes', {}))
+        self.stats = {
+            'enabled': self.enabled,
+            'requests_allowed': 0,
+            'requests_blocked': 0,
+            'blocked_by_type': {},
+            'bytes_loaded': 0,
+            'bytes_saved_estimate': 0,
+            'blocked_unsized': 0,
+            'enforce_domains': self.enforce_domains,
+            'outside_domains': {},
+            'scrape_seconds': {
+                'with_policy': {'count': 0, 'total': 0.0},
+                'without_policy': {'count': 0, 'total': 0.0}
+            }
+        }
+    
+    def is_allowed(self, resource_type, url):
+        """Check a request against the blocked and allowlisted resource types and the allowed domains"""
+        if resource_type in self.blocked_types:
+            return False
+        if self.allowed_types and resource_type not in self.allowed_types:
+            return False
+        host = (urlparse(url).hostname or '').lower()
+        if self.is_allowed_host(host):
+            return True
+        if self.enforce_domains:
+            return False
+        # Dry run: record the host that enforcing the allowlist would block
+        outside = self.stats['outside_domains']
+        if host not in outside:
+            logger.info(f"{self.source.upper()} resource policy: {host} is outside allowed_domains (not enforced)")
+        outside[host] = outside.get(host, 0) + 1
+        return True
+    
+    def is_allowed_host(self, host):
+        if not host or not self.allowed_domains:
+            return True
+        return any(host == domain or host.endswith('.' + domain) for domain in self.allowed_domains)
+    
+    async def handle_route(self, route):
+        request = route.request
+        if self.is_allowed(request.resource_type, request.url):
+            self.stats['requests_allowed'] += 1
+            await route.continue_()
+            return
+        
+        self.stats['requests_blocked'] += 1
+        blocked = self.stats['blocked_by_type']
+        blocked[request.resource_type] = blocked.get(request.resource_type, 0) + 1
+        size = self.estimated_size(request.resource_type)
+        if size is None:
+            self.stats['blocked_unsized'] += 1
+        else:
+            self.stats['bytes_saved_estimate'] += size
+        await route.abort()
+    
+    def estimated_size(self, resource_type):
+        """Average loaded size of a resource type, else its configured typical size"""
+        total, count = self.type_sizes.get(resource_type, (0, 0))
+        if count:
+            return total // count
+        return self.default_sizes.get(resource_type)
+    
+    async def handle_request_finished(self, request):
+        # The transferred body size, which unlike content-length is known for chunked responses too
+        try:
+            size = (await request.sizes())['responseBodySize']
+        except Exception:
+            response = await request.response()
+            try:
+                size = int(response.headers.get('content-length', 0)) if response else 0
+            except (TypeError, ValueError):
+                size = 0
+        if size <= 0:
+            return
+        self.stats['bytes_loaded'] += size
+        total, count = self.type_sizes.get(request.resource_type, (0, 0))
+        self.type_sizes[request.resource_type] = (total + size, count + 1)
+    
+    async def apply(self, target):
+        """Install the policy on a Playwright page or browser context"""
+        target.on('requestfinished', self.handle_request_finished)
+        if self.enabled:
+            await target.route('**/*', self.handle_route)
+            logger.info(f"{self.source.upper()} resource policy active - blocking {sorted(self.blocked_types)}"
+                        + (f", loading only {sorted(self.allowed_types)}" if self.allowed_types else '')
+                        + (f" from {self.allowed_domains}" if self.enforce_domains and self.allowed_domains else ''))
+    
+    def record_scrape(self, seconds):
+        """Record a browser scrape duration so runs with and without the policy can be compared"""
+        bucket = self.stats['scrape_seconds']['with_policy' if self.enabled else 'without_policy']
+        bucket['count'] += 1
+        bucket['total'] += seconds
+    
+    def summary(self):
+        summary = copy.deepcopy(self.stats)
+        for bucket in summary['scrape_seconds'].values():
+            bucket['average'] = round(bucket['total'] / bucket['count'], 2) if bucket['count'] else None
+            bucket['total'] = round(bucket['total'], 2)
+        return summary
+
+# Page conditions for readiness waits, each bounded by the fixed sleep it replaced
+ENPHASE_PAGE_READY = """
+    () => (document.body?.innerText || '').includes('kWh') || !!document.querySelector('input[type="email"]')
+"""
+SRP_PAGE_READY = """
+    () => !!document.querySelector('input[name="username"], .srp-red-text, .chart-type-btn') ||
+          location.pathname.includes('dashboard')
+"""
+SRP_DEMAND_READY = """
+    () => ['.srp-red-text strong', '.peak-demand-value', '.demand-value', '.current-peak strong',
+           '[data-testid="peak-demand"]', '.usage-summary .value']
+        .some(selector => (document.querySelector(selector)?.textContent || '').trim())
+"""
+
+# Re-issues the EG4 monitor page's runtime request from inside the loaded page
+EG4_RUNTIME_FETCH = """
+    async ({path, serial}) => {
+        const response = await fetch(path, {
+            method: 'POST',
+            credentials: 'same-origin',
+            redirect: 'manual',
+            headers: {
+                'Content-Type': 'application/x-www-form-urlencoded; charset=UTF-8',
+                'X-Requested-With': 'XMLHttpRequest'
+            },
+            body: new URLSearchParams({serialNum: serial})
+        });
+        const type = response.headers.get('content-type') || '';
+        if (!response.ok || !type.includes('json')) {
+            return {status: response.status, payload: null};
+        }
+        return {status: response.status, payload: await response.json()};
+    }
+"""
+
+# Browser attributes handed over when an active monitor is promoted onto its standby's browser
+EG4_BROWSER_FIELDS = ('playwright', 'browser', 'context', 'page', 'browser_pid',
+                      'logged_in', 'session_start_time', 'resource_policy', 'page_loaded_at')
+ENPHASE_BROWSER_FIELDS = ('playwright', 'browser', 'context', 'page',
+                          'logged_in', 'last_login_time', 'resource_policy')
+
 class EG4Monitor:
-    def __init__(self):
+    def __init__(self, standby=False):
         self.username = alert_config['credentials'].get('eg4_username', '') or os.getenv('EG4_USERNAME', '')
         self.password = alert_config['credentials'].get('eg4_password', '') or os.getenv('EG4_PASSWORD', '')
         self.browser = None
@@ -241,7 +787,29 @@ class EG4Monitor:
         self.playwright = None
         self.logged_in = False
         self.session_start_time = None
+        self.max_session_duration = 7200  # Force re-login after 2 hours
         self.browser_pid = None
+        self.resource_policy = ResourcePolicy('eg4')
+        self.memory_key = 'eg4_standby' if standby else 'eg4'
+        self.phases = PhaseTimer(self.memory_key, scrape_timings)
+        
+        # In-page refresh of the loaded monitor page, using the serial from its runtime requests
+        collector_config = alert_config.get('eg4_collector', {})
+        self.serial_number = collector_config.get('serial_number', '') or os.getenv('EG4_SERIAL', '')
+        self.page_loaded_at = None
+        self.refresh_stats = {'fetches': 0, 'fetch_failures': 0, 'reloads': 0}
+        
+        # Optional direct HTTP collector that reuses the browser session cookies
+        self.http_client = None
+        if collector_config.get('mode') == 'http' and not standby:
+            if EG4_HTTP_CLIENT_AVAILABLE:
+                self.http_client = EG4HttpClient(
+                    base_url=portal_url('eg4', '/WManage'),
+                    serial_number=self.serial_number
+                )
+                logger.info("EG4 HTTP collector mode enabled")
+            else:
+                logger.warning("EG4 HTTP collector requested but aiohttp is not installed - using browser mode")
     
     def update_credentials(self, username, password):
         """Update credentials and reset login state"""
@@ -249,6 +817,37 @@ class EG4Monitor:
         self.password = password
         self.logged_in = False
         self.session_start_time = None
+        clear_session_state('eg4')
+        if self.http_client:
+            self.http_client.invalidate()
+    
+    def capture_runtime_request(self, request):
+        """Learn the inverter serial number from the portal's own runtime requests"""
+        try:
+            if RUNTIME_PATH not in request.url:
+                return
+            if self.serial_number and (not self.http_client or self.http_client.serial_number):
+                return
+            serial = parse_qs(request.post_data or '').get('serialNum', [''])[0]
+            if not serial:
+                return
+            if not self.serial_number:
+                self.serial_number = serial
+                logger.info(f"EG4 monitor using inverter serial {serial}")
+            if self.http_client and not self.http_client.serial_number:
+                self.http_client.serial_number = serial
+                logger.info(f"EG4 HTTP collector using inverter serial {serial}")
+        except Exception as e:
+            logger.debug(f"Could not inspect EG4 runtime request: {e}")
+    
+    async def export_session(self):
+        """Hand the browser's session cookies to the HTTP collector"""
+        if not self.http_client or not self.context:
+            return
+        try:
+            self.http_client.load_cookies(await self.context.cookies())
+        except Exception as e:
+            logger.warning(f"Failed to export EG4 session cookies: {e}")
         
     async def cleanup_browser(self):
         """Aggressively clean up browser resources"""
@@ -292,6 +891,7 @@ class EG4Monitor:
         except Exception as e:
             logger.error(f"Error during browser cleanup: {e}")
         finally:
+            browser_memory.unregister(self.memory_key)
             self.logged_in = False
             self.session_start_time = None
     
@@ -300,7 +900,7 @@ class EG4Monitor:
         await self.cleanup_browser()
         
         try:
-            self.playwright = await async_playwright().start()
+            self.playwright = await start_playwright(self.memory_key)
             self.browser = await self.playwright.chromium.launch(
                 headless=True,
                 args=['--no-sandbox', '--disable-setuid-sandbox', '--disable-dev-shm-usage']
@@ -312,12 +912,21 @@ class EG4Monitor:
             except:
                 pass
                 
-            self.context = await self.browser.new_context()
+            saved_state = load_session_state('eg4')
+            self.context = await self.browser.new_context(storage_state=saved_state)
+            await self.resource_policy.apply(self.context)
             self.page = await self.context.new_page()
             # Set longer default timeout for all page operations (2 minutes)
             self.page.set_default_timeout(120000)
+            self.page.on('request', self.capture_runtime_request)
+            self.page_loaded_at = None
             self.session_start_time = time.time()
             logger.info("EG4 browser started")
+            
+            # Skip the login form when the saved session is still accepted
+            if saved_state and await probe_session(self.context, portal_url('eg4', '/WManage/web/monitor/inverter')):
+                self.logged_in = True
+                logger.info("EG4 session restored from saved state")
         except Exception as e:
             logger.error(f"Failed to start browser: {e}")
             await self.cleanup_browser()
@@ -338,19 +947,22 @@ class EG4Monitor:
         except:
             return False
         
+    @timed_phase('login')
     async def login(self):
         try:
             logger.info("Attempting EG4 login")
-            await self.page.goto('https://monitor.eg4electronics.com/WManage/web/login', wait_until='domcontentloaded')
+            await self.page.goto(portal_url('eg4', '/WManage/web/login'), wait_until='domcontentloaded')
             await self.page.fill('input[name="account"]', self.username)
             await self.page.fill('input[name="password"]', self.password)
             await self.page.press('input[name="password"]', 'Enter')
-            await asyncio.sleep(3)
+            await readiness_waits.wait('eg4_login_redirect', self.page.wait_for_url,
+                                       3, lambda url: 'login' not in url, wait_until='domcontentloaded')
             success = 'login' not in self.page.url
             if success:
                 logger.info("EG4 login successful")
                 self.logged_in = True
                 self.session_start_time = time.time()
+                await save_session_state('eg4', self.context)
             else:
                 logger.warning("EG4 login failed - still on login page")
                 self.logged_in = False
@@ -360,7 +972,61 @@ class EG4Monitor:
             self.logged_in = False
             return False
     
+    async def refresh_in_page(self):
+        """Re-issue the loaded monitor page's runtime request instead of reloading the page
+        
+        Returns None when the page needs a full reload instead: refresh is set to
+        'reload', the inverter serial is not known yet, the page is due for its
+        periodic reload, or the request failed.
+        """
+        collector_config = alert_config.get('eg4_collector', {})
+        if collector_config.get('page_refresh', 'fetch') != 'fetch' or not EG4_RUNTIME_API_AVAILABLE:
+            return None
+        if not self.serial_number or not self.page_loaded_at:
+            return None
+        if time.monotonic() - self.page_loaded_at > collector_config.get('full_reload_interval', 1800):
+            logger.debug("EG4 monitor page due for its periodic full reload")
+            return None
+        
+        self.refresh_stats['fetches'] += 1
+        try:
+            with self.phases.phase('refresh'):
+                result = await asyncio.wait_for(
+                    self.page.evaluate(EG4_RUNTIME_FETCH, {'path': '/WManage' + RUNTIME_PATH, 'serial': self.serial_number}),
+                    timeout=15
+                )
+        except Exception as e:
+            self.refresh_stats['fetch_failures'] += 1
+            logger.warning(f"EG4 in-page refresh failed ({e}), reloading the page")
+            return None
+        
+        payload = result.get('payload')
+        if not payload or not payload.get('success', False):
+            self.refresh_stats['fetch_failures'] += 1
+            logger.info(f"EG4 in-page refresh rejected (HTTP {result.get('status')}), reloading the page")
+            return None
+        data = parse_runtime_payload(payload)
+        data['source'] = 'page_fetch'
+        return data
+    
     async def get_data(self):
+        self.phases.begin()
+        # Poll the runtime endpoint directly while the exported session is valid
+        if self.http_client and self.http_client.ready:
+            try:
+                data = await self.http_client.get_runtime()
+                self.phases.lap('http_poll')
+                if is_valid_eg4_data(data):
+                    return data
+                logger.warning("EG4 HTTP collector returned invalid data, falling back to browser")
+            except SessionExpiredError as e:
+                logger.info(f"EG4 HTTP session expired ({e}), falling back to browser")
+                self.logged_in = False
+            except Exception as e:
+                logger.warning(f"EG4 HTTP poll failed ({e}), falling back to browser")
+            self.phases.lap('http_poll')
+        
+        scrape_started = time.monotonic()
         try:
             # Check if we need to login first
             if not await self.is_logged_in():
@@ -369,29 +1035,35 @@ class EG4Monitor:
                     logger.error("Failed to login to EG4")
                     return None
             
-            # If already on the monitor page, just refresh instead of full navigation
+            # If already on the monitor page, refresh its data in place instead of full navigation
             current_url = self.page.url
             if 'monitor/inverter' in current_url:
-                logger.debug("Already on monitor page, refreshing data")
+                data = await self.refresh_in_page()
+                if data and is_valid_eg4_data(data):
+                    logger.debug(f"EG4 data refreshed in page: SOC={data['battery']['soc']}%, PV Total={data['pv']['total_power']}W")
+                    await self.export_session()
+                    self.resource_policy.record_scrape(time.monotonic() - scrape_started)
+                    return data
+                logger.debug("Already on monitor page, reloading")
+                self.refresh_stats['reloads'] += 1
                 await self.page.reload(wait_until='networkidle')
             else:
                 logger.debug("Navigating to monitor page")
-                await self.page.goto('https://monitor.eg4electronics.com/WManage/web/monitor/inverter', wait_until='networkidle')
-            
-            await asyncio.sleep(2)  # Shorter wait since we're often just refreshing
+                await self.page.goto(portal_url('eg4', '/WManage/web/monitor/inverter'), wait_until='networkidle')
+            self.page_loaded_at = time.monotonic()
+            self.phases.lap('navigate')
             
-            # Wait for data to load with better debugging
-            data_loaded = False
-            for i in range(10):
-                soc = await self.page.evaluate("() => document.querySelector('.socText')?.textContent")
-                if soc and soc != '--':
-                    data_loaded = True
-                    break
-                logger.debug(f"Waiting for EG4 data to load... attempt {i+1}/10, SOC: {soc}")
-                await asyncio.sleep(1)
+            # Wait for the runtime values to be filled in, at most the old 2s settle plus 10 polls
+            data_loaded = await readiness_waits.wait('eg4_data', self.page.wait_for_function, 12, """
+                () => {
+                    const soc = document.querySelector('.socText')?.textContent?.trim();
+                    return soc && soc !== '--';
+                }
+            """, polling=250)
             
             if not data_loaded:
-                logger.warning("EG4 data did not load after 10 seconds")
+                logger.warning("EG4 data did not load after 12 seconds")
+            self.phases.lap('wait')
             
             # Extract data with debug info
             data = await self.page.evaluate("""
@@ -467,15 +1139,18 @@ class EG4Monitor:
                     };
                 }
             """)
+            self.phases.lap('extract')
             
             # Log debug info if all values are zero
             if data and is_valid_eg4_data(data):
                 pv_strings = data['pv']['strings']
                 pv_details = f"PV1:{pv_strings['pv1']['power']}W, PV2:{pv_strings['pv2']['power']}W, PV3:{pv_strings['pv3']['power']}W"
                 logger.debug(f"EG4 data extracted successfully: SOC={data['battery']['soc']}%, PV Total={data['pv']['total_power']}W ({pv_details})")
+                await self.export_session()
             elif data:
                 logger.warning(f"EG4 data all zeros - raw values: {data.get('debug', {})}")
             
+            self.resource_policy.record_scrape(time.monotonic() - scrape_started)
             return data
             
         except Exception as e:
@@ -488,35 +1163,311 @@ class EG4Monitor:
                 logger.error(f"EG4 data extraction error: {e}", exc_info=True)
             return None
     
+    async def recycle(self):
+        """Replace the browser with a fresh one, restoring the saved login session"""
+        await self.start()
+    
+    async def ensure_session(self):
+        """Make sure the browser holds a session the portal accepts, logging in if not"""
+        if self.logged_in and await probe_session(self.context, portal_url('eg4', '/WManage/web/monitor/inverter')):
+            return True
+        return await self.login()
+    
+    async def promote(self, standby):
+        """Take over a warm standby's browser, leaving the standby holding the old one"""
+        swap_browser_state(self, standby, EG4_BROWSER_FIELDS)
+        browser_memory.swap(self.memory_key, standby.memory_key)
+        # The retired browser is no longer tracked, any leftovers are reaped as orphans
+        browser_memory.unregister(standby.memory_key)
+        standby.memory_key = None
+        self.page.on('request', self.capture_runtime_request)
+        if self.http_client:
+            await self.export_session()
+    
+    async def stop(self):
+        """Close the browser, keeping the HTTP collector for the next start"""
+        await self.cleanup_browser()
+    
     async def close(self):
         await self.cleanup_browser()
+        if self.http_client:
+            await self.http_client.close()
+
+def primary_eg4_device():
+    """Device key of the inverter collected by the main EG4 monitor"""
+    return alert_config.get('eg4_fleet', {}).get('primary_device') or 'primary'
+
+class EG4Fleet:
+    """Collects runtime data for additional EG4 inverters, possibly across several accounts
+    
+    One browser is shared by all targets, with one logged-in context per account.
+    Each inverter is read with a runtime request made through its account's
+    context, so no page is rendered per inverter, and a semaphore bounds how many
+    requests are in flight at once.
+    """
+    
+    def __init__(self, targets, concurrency=4):
+        self.targets = []
+        for target in targets:
+            serial = str(target.get('serial_number', '')).strip()
+            if not serial:
+                logger.warning(f"Skipping EG4 target without a serial number: {target.get('device')}")
+                continue
+            self.targets.append({
+                'device': target.get('device') or serial,
+                'serial_number': serial,
+                'username': target.get('username', ''),
+                'password': target.get('password', '')
+            })
+        self.concurrency = max(1, concurrency)
+        self.semaphore = asyncio.Semaphore(self.concurrency)
+        self.playwright = None
+        self.browser = None
+        self.accounts = {}  # username -> shared context and login state
+        self.memory_key = 'eg4_fleet'
+        self.device_status = {
+            target['device']: {'serial_number': target['serial_number'], 'last_success': None,
+                               'consecutive_failures': 0, 'last_error': None}
+            for target in self.targets
+        }
+        self.last_collection_seconds = None
+    
+    def credentials(self, target):
+        """A target's account, defaulting to the main EG4 credentials"""
+        username = target['username'] or alert_config['credentials'].get('eg4_username', '') or os.getenv('EG4_USERNAME', '')
+        password = target['password'] or alert_config['credentials'].get('eg4_password', '') or os.getenv('EG4_PASSWORD', '')
+        return username, password
+    
+    def session_key(self, username):
+        return 'eg4_fleet_' + re.sub(r'[^a-z0-9]+', '_', username.lower()).strip('_')
+    
+    async def start(self):
+        await self.stop()
+        self.playwright = await start_playwright(self.memory_key)
+        self.browser = await self.playwright.chromium.launch(
+            headless=True,
+            args=['--no-sandbox', '--disable-setuid-sandbox', '--disable-dev-shm-usage']
+        )
+        logger.info(f"EG4 fleet browser started for {len(self.targets)} inverters")
+    
+    async def account(self, username, password):
+        """Get the shared context for an account, creating it on first use"""
+        account = self.accounts.get(username)
+        if account is None:
+            saved_state = load_session_state(self.session_key(username))
+            context = await self.browser.new_context(storage_state=saved_state)
+            await ResourcePolicy('eg4').apply(context)
+            account = {
+                'context': context,
+                'password': password,
+                'logged_in': bool(saved_state),
+                'generation': 0,
+                'lock': asyncio.Lock()
+            }
+            self.accounts[username] = account
+        return account
+    
+    async def login(self, username, account):
+        page = await account['context'].new_page()
+        try:
+            page.set_default_timeout(120000)
+            await page.goto(portal_url('eg4', '/WManage/web/login'), wait_until='domcontentloaded')
+            await page.fill('input[name="account"]', username)
+            await page.fill('input[name="password"]', account['password'])
+            await page.press('input[name="password"]', 'Enter')
+            await readiness_waits.wait('eg4_login_redirect', page.wait_for_url,
+                                       3, lambda url: 'login' not in url, wait_until='domcontentloaded')
+            success = 'login' not in page.url
+        finally:
+            await page.close()
+        if success:
+            logger.info(f"EG4 fleet login successful for {username}")
+            await save_session_state(self.session_key(username), account['context'])
+        else:
+            logger.warning(f"EG4 fleet login failed for {username} - still on login page")
+        return success
+    
+    async def ensure_login(self, username, account):
+        """Log an account in once, however many of its inverters are waiting on it
+        
+        Returns the session generation, or None when the login failed.
+        """
+        async with account['lock']:
+            if not account['logged_in']:
+                with scrape_timings.span(self.memory_key, 'login'):
+                    success = await self.login(username, account)
+                if not success:
+                    return None
+                account['logged_in'] = True
+                account['generation'] += 1
+            return account['generation']
+    
+    async def fetch_runtime(self, account, serial):
+        response = await account['context'].request.post(
+            portal_url('eg4', '/WManage' + RUNTIME_PATH),
+            form={'serialNum': serial},
+            headers={'X-Requested-With': 'XMLHttpRequest'},
+            max_redirects=0,
+            timeout=15000
+        )
+        if (response.status in (301, 302, 303, 401, 403) or
+                'json' not in response.headers.get('content-type', '')):
+            raise SessionExpiredError(f"Runtime request rejected (HTTP {response.status})")
+        payload = await response.json()
+        if not payload.get('success', False):
+            raise SessionExpiredError(f"Runtime request unsuccessful: {payload.get('msg', 'unknown')}")
+        return parse_runtime_payload(payload)
+    
+    async def fetch_device(self, target):
+        """Read one inverter, logging its account in again once if the session has lapsed"""
+        async with self.semaphore:
+            username, password = self.credentials(target)
+            account = await self.account(username, password)
+            for attempt in range(2):
+                generation = await self.ensure_login(username, account)
+                if generation is None:
+                    raise RuntimeError(f"login failed for {username}")
+                try:
+                    with scrape_timings.span(self.memory_key, 'runtime_request'):
+                        return await self.fetch_runtime(account, target['serial_number'])
+                except SessionExpiredError as e:
+                    logger.info(f"EG4 fleet session for {username} expired ({e})")
+                    # Only the first target to notice the expiry forces a new login
+                    if account['generation'] == generation:
+                        account['logged_in'] = False
+            raise RuntimeError(f"session for {username} rejected after re-login")
+    
+    async def collect(self):
+        """Read every target concurrently, returning {device: data} for the valid samples"""
+        started = time.monotonic()
+        results = await asyncio.gather(*(self.fetch_device(target) for target in self.targets),
+                                       return_exceptions=True)
+        samples = {}
+        for target, result in zip(self.targets, results):
+            status = self.device_status[target['device']]
+            if isinstance(result, Exception) or not is_valid_eg4_data(result):
+                status['consecutive_failures'] += 1
+                status['last_error'] = str(result) if isinstance(result, Exception) else 'invalid data'
+                logger.warning(f"EG4 fleet: no valid data for {target['device']} ({status['last_error']})")
+                continue
+            status['consecutive_failures'] = 0
+            status['last_error'] = None
+            status['last_success'] = datetime.now().isoformat()
+            samples[target['device']] = result
+        self.last_collection_seconds = round(time.monotonic() - started, 2)
+        scrape_timings.record(self.memory_key, 'collect', time.monotonic() - started)
+        logger.debug(f"EG4 fleet collected {len(samples)}/{len(self.targets)} inverters in {self.last_collection_seconds}s")
+        return samples
+    
+    async def recycle(self):
+        """Replace the browser with a fresh one, restoring each account's saved session"""
+        await self.start()
+    
+    async def stop(self):
+        for account in self.accounts.values():
+            try:
+                await account['context'].close()
+            except Exception:
+                pass
+        self.accounts = {}
+        if self.browser:
+            try:
+                await self.browser.close()
+            except Exception:
+                pass
+            self.browser = None
+        if self.playwright:
+            try:
+                await self.playwright.stop()
+            except Exception:
+                pass
+            self.playwright = None
+        browser_memory.unregister(self.memory_key)
+    
+    async def close(self):
+        await self.stop()
+    
+    def state(self):
+        return {
+            'targets': len(self.targets),
+            'accounts': len({self.credentials(target)[0] for target in self.targets}),
+            'concurrency': self.concurrency,
+            'last_collection_seconds': self.last_collection_seconds,
+            'devices': self.device_status
+        }
+
+def parse_enphase_api_payload(payload):
+    """Map an Enlighten system JSON payload onto the Enphase monitor data fields"""
+    data = {}
+    if not isinstance(payload, dict):
+        return data
+    
+    latest = payload.get('latest_power') or {}
+    if isinstance(latest, dict) and latest.get('value') is not None:
+        try:
+            value = float(latest['value'])
+            units = str(latest.get('units', 'W')).lower()
+            data['latest_power_w'] = value * 1000 if units == 'kw' else value
+            if latest.get('time'):
+                data['latest_power_time'] = datetime.fromtimestamp(latest['time']).strftime('%I:%M %p').lstrip('0')
+        except (TypeError, ValueError):
+            pass
+    
+    stats = payload.get('stats') or []
+    if stats and isinstance(stats[0], dict):
+        production = stats[0].get('totals', {}).get('production')
+        if production is not None:
+            try:
+                data['today_energy_kwh'] = round(float(production) / 1000, 2)  # Reported in Wh
+            except (TypeError, ValueError):
+                pass
+    
+    return data
 
 class EnphaseMonitor:
-    def __init__(self):
+    def __init__(self, standby=False):
         self.username = alert_config['credentials'].get('enphase_username', '') or os.getenv('ENPHASE_USERNAME', '')
         self.password = alert_config['credentials'].get('enphase_password', '') or os.getenv('ENPHASE_PASSWORD', '')
         self.browser = None
+        self.context = None
         self.page = None
         self.playwright = None
         self.logged_in = False
         self.last_login_time = None
-        self.system_url = "https://enlighten.enphaseenergy.com/systems/5815605/"
+        self.system_id = '5815605'
+        self.system_url = portal_url('enphase', f'/systems/{self.system_id}/')
+        self.resource_policy = ResourcePolicy('enphase')
+        self.memory_key = 'enphase_standby' if standby else 'enphase'
+        self.phases = PhaseTimer(self.memory_key, scrape_timings)
+        # Fields from the last full page scrape, merged into API-mode samples
+        self.last_page_data = {}
+        self.last_page_scrape = None
     
     def update_credentials(self, username, password):
         """Update credentials"""
         self.username = username
         self.password = password
         self.logged_in = False  # Force re-login with new credentials
+        clear_session_state('enphase')
         
     async def start(self):
-        self.playwright = await async_playwright().start()
+        self.playwright = await start_playwright(self.memory_key)
         self.browser = await self.playwright.chromium.launch(
             headless=True,
             args=['--no-sandbox', '--disable-setuid-sandbox', '--single-process']
         )
-        self.page = await self.browser.new_page()
+        saved_state = load_session_state('enphase')
+        self.context = await self.browser.new_context(storage_state=saved_state)
+        self.page = await self.context.new_page()
+        await self.resource_policy.apply(self.page)
         self.page.set_default_timeout(120000)  # 2 minute timeout
         
+        # Skip the login flow when the saved session is still accepted
+        if saved_state and await probe_session(self.context, self.system_url):
+            self.logged_in = True
+            self.last_login_time = datetime.now()
+            logger.info("Enphase session restored from saved state")
+        
     async def login_with_retry(self, max_attempts=3):
         """Login with retry logic"""
         for attempt in range(max_attempts):
@@ -552,9 +1503,14 @@ class EnphaseMonitor:
                     self.logged_in = False
                     return False
             
-            # Navigate to the system page to test session
+            # Cheap check: one request to the system page without rendering it
+            if self.logged_in and await probe_session(self.context, self.system_url):
+                return True
+            
+            # Probe failed - navigate to the system page to test session
             await self.page.goto(self.system_url, wait_until='domcontentloaded')
-            await asyncio.sleep(3)
+            await readiness_waits.wait('enphase_session_page', self.page.wait_for_function,
+                                       3, ENPHASE_PAGE_READY, polling=250)
             
             # Check if we can access system data (means we're logged in)
             page_content = await self.page.content()
@@ -578,11 +1534,11 @@ class EnphaseMonitor:
         
         return False
 
+    @timed_phase('login')
     async def login(self):
         try:
             logger.info("Attempting Enphase login...")
-            await self.page.goto('https://enlighten.enphaseenergy.com/', wait_until='networkidle')
-            await asyncio.sleep(3)
+            await self.page.goto(portal_url('enphase', '/'), wait_until='networkidle')
             
             # Log page info for debugging
             page_url = self.page.url
@@ -634,11 +1590,10 @@ class EnphaseMonitor:
                 if '/systems/' not in current_url:
                     logger.error(f"Login redirect failed, current URL: {current_url}")
                     return False
-            await asyncio.sleep(2)
+            await readiness_waits.wait('enphase_login_redirect', self.page.wait_for_load_state, 2, 'domcontentloaded')
             
             # Navigate to our specific system page
             await self.page.goto(self.system_url, wait_until='networkidle')
-            await asyncio.sleep(3)
             
             # Wait for the Energy tab to be visible (indicates successful login)
             try:
@@ -658,6 +1613,7 @@ class EnphaseMonitor:
             if login_success:
                 self.logged_in = True
                 self.last_login_time = datetime.now()
+                await save_session_state('enphase', self.context)
             else:
                 self.logged_in = False
             
@@ -668,15 +1624,70 @@ class EnphaseMonitor:
             self.logged_in = False
             return False
     
+    async def fetch_api_data(self):
+        """Read Enphase's JSON API from inside the already-loaded page, without navigating"""
+        if not self.page.url.startswith(portal_url('enphase', '/')):
+            await self.page.goto(self.system_url, wait_until='domcontentloaded')
+            self.phases.lap('navigate')
+        
+        data = {}
+        api_paths = alert_config.get('enphase_extraction', {}).get('api_paths', ['/pv/systems/{system_id}/today'])
+        for path in api_paths:
+            result = await self.page.evaluate("""
+                async (url) => {
+                    const response = await fetch(url, {credentials: 'include', headers: {'Accept': 'application/json'}});
+                    if (!response.ok || response.redirected) {
+                        return {status: response.status, url: response.url, payload: null};
+                    }
+                    return {status: response.status, url: response.url, payload: await response.json()};
+                }
+            """, path.format(system_id=self.system_id))
+            
+            if not result.get('payload'):
+                if 'login' in (result.get('url') or '') or result.get('status') in (401, 403):
+                    logger.info("Enphase API rejected session - login required")
+                    self.logged_in = False
+                logger.debug(f"Enphase API {path} returned no data (HTTP {result.get('status')})")
+                continue
+            data.update(parse_enphase_api_payload(result['payload']))
+        self.phases.lap('extract')
+        return data
+    
     async def get_data(self):
-        """Extract Enphase system data from the system page"""
+        """Extract Enphase system data, preferring the JSON API over full page scrapes"""
+        self.phases.begin()
+        extraction_config = alert_config.get('enphase_extraction', {})
+        if extraction_config.get('mode', 'api') == 'api':
+            refresh_seconds = extraction_config.get('page_refresh_minutes', 30) * 60
+            page_refresh_due = self.last_page_scrape is None or time.monotonic() - self.last_page_scrape > refresh_seconds
+            if not page_refresh_due:
+                try:
+                    api_data = await self.fetch_api_data()
+                    if api_data:
+                        data = dict(self.last_page_data)
+                        data.update(api_data)
+                        data['last_update'] = datetime.now().isoformat()
+                        if is_valid_enphase_data(data):
+                            logger.debug(f"Enphase data extracted from API: {api_data}")
+                            return data
+                        logger.warning(f"Enphase API data failed validation, falling back to page scrape: {api_data}")
+                except Exception as e:
+                    logger.warning(f"Enphase API extraction failed ({e}), falling back to page scrape")
+        
+        return await self.scrape_page_data()
+    
+    async def scrape_page_data(self):
+        """Extract Enphase system data from the system page text"""
+        scrape_started = time.monotonic()
         try:
             # Make sure we're on the right page and wait for content to load
             await self.page.goto(self.system_url, wait_until='networkidle')
-            await asyncio.sleep(3)
+            self.phases.lap('navigate')
             
-            # Wait for the page to load energy content
-            await asyncio.sleep(5)  # Give the page time to load dynamic content
+            # Wait for the page to render energy content, at most the old 8s of fixed sleeps
+            await readiness_waits.wait('enphase_energy_content', self.page.wait_for_function,
+                                       8, ENPHASE_PAGE_READY, polling=250)
+            self.phases.lap('wait')
             
             data = {}
             
@@ -699,13 +1710,6 @@ class EnphaseMonitor:
                     // Get all text content from the page
                     const pageText = document.body.textContent || '';
                     
-                    // Debug: Store first 500 characters of page text
-                    data.debug_page_text = pageText.substring(0, 500);
-                    data.debug_has_kwh = pageText.includes('kWh');
-                    data.debug_has_peak = pageText.includes('Peak');
-                    data.debug_has_latest = pageText.includes('Latest');
-                    data.debug_has_voltage = pageText.includes('V');
-                    
                     // Simple regex patterns to extract data from page text
                     
                     // Look for today's energy - should be first kWh value we encounter
@@ -786,6 +1790,7 @@ class EnphaseMonitor:
                     return data;
                 }
             """)
+            self.phases.lap('extract')
             
             # Set default values for any missing data
             default_values = {
@@ -807,7 +1812,26 @@ class EnphaseMonitor:
             # Add timestamp
             data['last_update'] = datetime.now().isoformat()
             
+            # Only pull a debug snippet back from the page when the data looks wrong
+            if is_valid_enphase_data(data):
+                self.last_page_data = {key: data[key] for key in default_values}
+                self.last_page_scrape = time.monotonic()
+            else:
+                debug_info = await self.page.evaluate("""
+                    () => {
+                        const pageText = document.body.textContent || '';
+                        return {
+                            page_text: pageText.substring(0, 500),
+                            has_kwh: pageText.includes('kWh'),
+                            has_peak: pageText.includes('Peak'),
+                            has_latest: pageText.includes('Latest')
+                        };
+                    }
+                """)
+                logger.warning(f"Enphase page data failed validation - debug: {debug_info}")
+            
             logger.info(f"Enphase data extracted: {data}")
+            self.resource_policy.record_scrape(time.monotonic() - scrape_started)
             return data
             
         except Exception as e:
@@ -825,32 +1849,94 @@ class EnphaseMonitor:
                 await self.playwright.stop()
         except Exception as e:
             logger.error(f"Error stopping Enphase monitor: {e}")
+        finally:
+            browser_memory.unregister(self.memory_key)
+    
+    async def recycle(self):
+        """Replace the browser with a fresh one, restoring the saved login session"""
+        await self.stop()
+        await self.start()
+    
+    async def ensure_session(self):
+        """Make sure the browser holds a session Enlighten accepts, logging in if not"""
+        if await self.is_logged_in():
+            return True
+        return await self.login_with_retry()
+    
+    async def promote(self, standby):
+        """Take over a warm standby's browser, leaving the standby holding the old one"""
+        swap_browser_state(self, standby, ENPHASE_BROWSER_FIELDS)
+        browser_memory.swap(self.memory_key, standby.memory_key)
+        # The retired browser is no longer tracked, any leftovers are reaped as orphans
+        browser_memory.unregister(standby.memory_key)
+        standby.memory_key = None
+    
+    async def close(self):
+        await self.stop()
 
 class SRPMonitor:
     def __init__(self):
         self.username = alert_config['credentials'].get('srp_username', '') or os.getenv('SRP_USERNAME', '')
         self.password = alert_config['credentials'].get('srp_password', '') or os.getenv('SRP_PASSWORD', '')
         self.browser = None
+        self.context = None
         self.page = None
         self.playwright = None
         self.logged_in = False
         self.last_login_time = None
+        self.session_validated_at = None
+        self.last_csv_report = None
+        self.resource_policy = ResourcePolicy('srp')
+        self.phases = PhaseTimer('srp', scrape_timings)
     
     def update_credentials(self, username, password):
         """Update credentials"""
         self.username = username
         self.password = password
+        self.session_validated_at = None
+        clear_session_state('srp')
         
     async def start(self):
-        self.playwright = await async_playwright().start()
+        self.playwright = await start_playwright('srp')
+        # Not single-process: CSV exports run in several pages at once, which that mode doesn't handle reliably
         self.browser = await self.playwright.chromium.launch(
             headless=True,
-            args=['--no-sandbox', '--disable-setuid-sandbox', '--single-process']
+            args=['--no-sandbox', '--disable-setuid-sandbox']
         )
-        self.page = await self.browser.new_page()
+        saved_state = load_session_state('srp')
+        self.context = await self.browser.new_context(storage_state=saved_state)
+        # Applied to the context so CSV export pages are covered too
+        await self.resource_policy.apply(self.context)
+        self.page = await self.context.new_page()
         # Set longer default timeout for all page operations (2 minutes)
         self.page.set_default_timeout(120000)
         
+        # Skip the login flow when the saved session is still accepted
+        if saved_state and await probe_session(self.context, self.probe_url()):
+            self.logged_in = True
+            self.last_login_time = datetime.now()
+            self.session_validated_at = time.monotonic()
+            logger.info("SRP session restored from saved state")
+    
+    def probe_url(self):
+        return alert_config.get('srp_session', {}).get('probe_url') or portal_url('srp', '/power/myaccount/usage')
+    
+    def invalidate_session_cache(self):
+        """Force the next is_logged_in call to re-probe the session"""
+        self.session_validated_at = None
+    
+    async def has_live_cookies(self):
+        """Check that the context still holds unexpired SRP session cookies
+        
+        Only cookies named in srp_session.auth_cookies count when it is set.
+        Either way this can only rule a session out - only a probe confirms one.
+        """
+        names = set(alert_config.get('srp_session', {}).get('auth_cookies', []))
+        cookies = await self.context.cookies(portal_url('srp'))
+        now = time.time()
+        return any((not names or cookie.get('name') in names) and
+                   (cookie.get('expires', -1) == -1 or cookie['expires'] > now) for cookie in cookies)
+        
     async def is_logged_in(self):
         """Check if currently logged in to SRP"""
         if not self.page:
@@ -863,12 +1949,32 @@ class SRPMonitor:
                 if time_since_login.total_seconds() > 7200:  # 2 hours
                     logger.info("SRP session expired (2+ hours), forcing re-login")
                     self.logged_in = False
+                    self.session_validated_at = None
                     return False
             
-            # Navigate to a protected page to test session
+            # No live cookies means no session - skip straight to login, even within the cache period
+            if not await self.has_live_cookies():
+                logger.info("SRP session cookies missing or expired - login required")
+                self.logged_in = False
+                self.session_validated_at = None
+                return False
+            
+            # Reuse a recent successful probe; once it is older than cache_seconds the session is probed again
+            cache_seconds = alert_config.get('srp_session', {}).get('cache_seconds', 300)
+            if self.session_validated_at and time.monotonic() - self.session_validated_at < cache_seconds:
+                return True
+            
+            # Cheap check: one authenticated request without rendering the page
+            if await probe_session(self.context, self.probe_url()):
+                self.session_validated_at = time.monotonic()
+                logger.debug("SRP session validated by probe request")
+                return True
+            
+            # Probe failed - confirm with a full navigation to a protected page
             current_url = self.page.url
-            await self.page.goto('https://myaccount.srpnet.com/power/myaccount/usage', wait_until='domcontentloaded')
-            await asyncio.sleep(2)
+            await self.page.goto(portal_url('srp', '/power/myaccount/usage'), wait_until='domcontentloaded')
+            await readiness_waits.wait('srp_session_page', self.page.wait_for_function,
+                                       2, SRP_PAGE_READY, polling=250)
             
             # If we're redirected to login page or see login elements, session is invalid
             page_content = await self.page.content()
@@ -879,6 +1985,7 @@ class SRPMonitor:
             
             # If we can access the usage page, we're logged in
             if 'usage' in self.page.url or 'dashboard' in self.page.url:
+                self.session_validated_at = time.monotonic()
                 return True
                 
         except Exception as e:
@@ -888,16 +1995,20 @@ class SRPMonitor:
         
         return False
 
+    @timed_phase('login')
     async def login(self):
         try:
-            await self.page.goto('https://myaccount.srpnet.com/power', wait_until='domcontentloaded')
-            await asyncio.sleep(2)
+            await self.page.goto(portal_url('srp', '/power'), wait_until='domcontentloaded')
+            await readiness_waits.wait('srp_login_form', self.page.wait_for_function,
+                                       2, SRP_PAGE_READY, polling=250)
             
             # Check if already logged in
             if 'dashboard' in self.page.url:
                 self.logged_in = True
                 self.last_login_time = datetime.now()
                 logger.info("SRP already logged in")
+                self.session_validated_at = time.monotonic()
+                await save_session_state('srp', self.context)
                 return True
                 
             # Login
@@ -905,7 +2016,9 @@ class SRPMonitor:
             await self.page.fill('input[name="username"]', self.username)
             await self.page.fill('input[name="password"]', self.password)
             await self.page.press('input[name="password"]', 'Enter')
-            await asyncio.sleep(5)
+            await readiness_waits.wait('srp_login_redirect', self.page.wait_for_url, 5,
+                                       lambda url: 'dashboard' in url or '/myaccount/' in urlparse(url).path,
+                                       wait_until='domcontentloaded')
             
             # Verify login success
             login_success = 'dashboard' in self.page.url or 'myaccount' in self.page.url
@@ -913,6 +2026,8 @@ class SRPMonitor:
                 self.logged_in = True
                 self.last_login_time = datetime.now()
                 logger.info("SRP login successful")
+                self.session_validated_at = time.monotonic()
+                await save_session_state('srp', self.context)
             else:
                 self.logged_in = False
                 logger.error("SRP login failed - incorrect credentials or page structure changed")
@@ -925,9 +2040,14 @@ class SRPMonitor:
             return False
     
     async def get_peak_demand(self):
+        self.phases.begin()
+        scrape_started = time.monotonic()
         try:
-            await self.page.goto('https://myaccount.srpnet.com/power/myaccount/usage', wait_until='networkidle')
-            await asyncio.sleep(2)
+            await self.page.goto(portal_url('srp', '/power/myaccount/usage'), wait_until='networkidle')
+            self.phases.lap('navigate')
+            await readiness_waits.wait('srp_peak_demand', self.page.wait_for_function,
+                                       2, SRP_DEMAND_READY, polling=250)
+            self.phases.lap('wait')
             
             # Extract peak demand
             demand_data = await self.page.evaluate("""
@@ -989,19 +2109,131 @@ class SRPMonitor:
                     };
                 }
             """)
+            self.phases.lap('extract')
             
             # Log debug info if available
             if 'debug' in demand_data and demand_data['debug']:
                 logger.info(f"SRP peak demand debug: {demand_data['debug']}")
             
+            self.resource_policy.record_scrape(time.monotonic() - scrape_started)
             return demand_data
             
         except Exception as e:
             logger.error(f"SRP data error: {e}")
+            self.invalidate_session_cache()
             return {'demand': 0}
     
+    async def export_chart_csv(self, page, chart_key, chart_name, downloads_dir):
+        """Select one chart type on an already-loaded usage page and export it to CSV"""
+        # Look for and click the chart type button using the correct classes
+        # First try the specific button with chart-type-btn class
+        chart_selector = f'button.chart-type-btn:has-text("{chart_name}")'
+        chart_button = await page.query_selector(chart_selector)
+        
+        if not chart_button:
+            # Try alternative selectors
+            alt_selectors = [
+                f'button.chart-type-btn.button-focus:has-text("{chart_name}")',
+                f'button:has-text("{chart_name}")',
+                f'a:has-text("{chart_name}")',
+                f'[title*="{chart_name}"]',
+                f'[data-chart-type="{chart_key}"]',
+                f'[data-view="{chart_key}"]'
+            ]
+            for selector in alt_selectors:
+                chart_button = await page.query_selector(selector)
+                if chart_button:
+                    break
+        
+        if chart_button:
+            # Log which selector worked for debugging
+            button_text = await chart_button.text_content()
+            logger.info(f"Found {chart_name} button with text '{button_text}', clicking...")
+            await chart_button.click()
+            # Wait for the chart's requests to settle
+            await readiness_waits.wait('srp_chart_load', page.wait_for_load_state, 3, 'networkidle')
+            logger.info(f"Successfully clicked {chart_name} button, chart should be loading...")
+        else:
+            logger.warning(f"Could not find {chart_name} button with any selector, trying to export anyway...")
+            # Log available buttons for debugging
+            try:
+                all_buttons = await page.query_selector_all('button')
+                button_texts = []
+                for btn in all_buttons[:10]:  # Just first 10 buttons
+                    text = await btn.text_content()
+                    if text and text.strip():
+                        button_texts.append(text.strip())
+                logger.debug(f"Available buttons on page: {button_texts}")
+            except:
+                pass
+        
+        # Look for the Export to Excel button with multiple selectors
+        export_selectors = [
+            'button:has-text("Export to Excel")',
+            'button.btn.srp-btn.btn-lightblue:has-text("Export")',
+            'button:has-text("Export")',
+            'a:has-text("Export to Excel")',
+            'a:has-text("Export")'
+        ]
+        
+        export_button = None
+        for selector in export_selectors:
+            export_button = await page.query_selector(selector)
+            if export_button:
+                logger.info(f"Found export button using selector: {selector}")
+                break
+        
+        if not export_button:
+            logger.error(f"Export button not found for {chart_name} with any selector! Skipping...")
+            return None
+        
+        # Set up download handler with longer timeout for slow SRP exports
+        async with page.expect_download(timeout=60000) as download_info:
+            await export_button.click()
+            logger.info(f"Clicked export button for {chart_name}, waiting for download...")
+            download = await download_info.value
+        
+        # Save the download with chart type in filename
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        filename = f'srp_{chart_key}_{timestamp}.csv'
+        filepath = os.path.join(downloads_dir, filename)
+        await download.save_as(filepath)
+        
+        logger.info(f"{chart_name} file downloaded successfully: {filepath}")
+        return filepath
+    
+    async def download_chart_in_page(self, chart_key, chart_name, downloads_dir, semaphore):
+        """Export one chart in its own page of the shared authenticated context"""
+        async with semaphore:
+            started = time.monotonic()
+            page = None
+            filepath = None
+            try:
+                logger.info(f"Downloading {chart_name} data...")
+                page = await self.context.new_page()
+                page.set_default_timeout(120000)
+                await page.goto(portal_url('srp', '/power/myaccount/usage'), wait_until='networkidle')
+                await readiness_waits.wait('srp_export_button', page.wait_for_selector, 3, 'button:has-text("Export")')
+                filepath = await self.export_chart_csv(page, chart_key, chart_name, downloads_dir)
+            except Exception as e:
+                logger.error(f"Failed to download {chart_name}: {e}")
+            finally:
+                if page:
+                    try:
+                        await page.close()
+                    except:
+                        pass
+            
+            elapsed = round(time.monotonic() - started, 1)
+            self.last_csv_report['charts'][chart_key] = {
+                'seconds': elapsed,
+                'status': 'downloaded' if filepath else 'failed'
+            }
+            logger.info(f"SRP {chart_name} export finished in {elapsed}s ({'ok' if filepath else 'failed'})")
+            return chart_key, filepath
+    
     async def download_csv_data(self):
-        """Download all CSV chart types from SRP"""
+        """Download all CSV chart types from SRP, exporting charts concurrently in separate pages"""
         chart_types = {
             'net': 'Net energy',
             'generation': 'Generation', 
@@ -1010,117 +2242,77 @@ class SRPMonitor:
         }
         
         downloaded_files = {}
-        downloads_dir = os.path.join(os.path.dirname(__file__), 'downloads')
+        downloads_dir = DOWNLOADS_DIR
         os.makedirs(downloads_dir, exist_ok=True)
+        self.phases.begin()
+        
+        concurrency = max(1, int(alert_config.get('srp_csv', {}).get('concurrency', 4)))
+        semaphore = asyncio.Semaphore(concurrency)
+        started = time.monotonic()
+        self.last_csv_report = {
+            'started': datetime.now().isoformat(),
+            'concurrency': concurrency,
+            'charts': {},
+            'total_seconds': None
+        }
         
         try:
-            # Navigate to the usage page first to ensure we're in the right place
-            logger.info("Navigating to SRP usage page for CSV downloads...")
-            await self.page.goto('https://myaccount.srpnet.com/power/myaccount/usage', wait_until='networkidle')
-            await asyncio.sleep(3)
+            logger.info(f"Starting SRP CSV download for all chart types (concurrency {concurrency})")
+            results = await asyncio.gather(*[
+                self.download_chart_in_page(chart_key, chart_name, downloads_dir, semaphore)
+                for chart_key, chart_name in chart_types.items()
+            ])
+            self.phases.lap('export')
             
-            # Log current page for debugging
-            current_url = self.page.url
-            logger.info(f"Current page: {current_url}")
-            
-            logger.info("Starting SRP CSV download for all chart types")
-            
-            for chart_key, chart_name in chart_types.items():
+            # Drop exports identical to the current ones and note which only added new days
+            export_store = SRPExportStore(downloads_dir)
+            for chart_key, filepath in results:
+                if not filepath:
+                    continue
                 try:
-                    logger.info(f"Downloading {chart_name} data...")
-                    
-                    # Look for and click the chart type button using the correct classes
-                    # First try the specific button with chart-type-btn class
-                    chart_selector = f'button.chart-type-btn:has-text("{chart_name}")'
-                    chart_button = await self.page.query_selector(chart_selector)
-                    
-                    if not chart_button:
-                        # Try alternative selectors
-                        alt_selectors = [
-                            f'button.chart-type-btn.button-focus:has-text("{chart_name}")',
-                            f'button:has-text("{chart_name}")',
-                            f'a:has-text("{chart_name}")',
-                            f'[title*="{chart_name}"]',
-                            f'[data-chart-type="{chart_key}"]',
-                            f'[data-view="{chart_key}"]'
-                        ]
-                        for selector in alt_selectors:
-                            chart_button = await self.page.query_selector(selector)
-                            if chart_button:
-                                break
-                    
-                    if chart_button:
-                        # Log which selector worked for debugging
-                        button_text = await chart_button.text_content()
-                        logger.info(f"Found {chart_name} button with text '{button_text}', clicking...")
-                        await chart_button.click()
-                        await asyncio.sleep(3)  # Wait for chart to load
-                        logger.info(f"Successfully clicked {chart_name} button, chart should be loading...")
-                    else:
-                        logger.warning(f"Could not find {chart_name} button with any selector, trying to export anyway...")
-                        # Log available buttons for debugging
-                        try:
-                            all_buttons = await self.page.query_selector_all('button')
-                            button_texts = []
-                            for btn in all_buttons[:10]:  # Just first 10 buttons
-                                text = await btn.text_content()
-                                if text and text.strip():
-                                    button_texts.append(text.strip())
-                            logger.debug(f"Available buttons on page: {button_texts}")
-                        except:
-                            pass
-                    
-                    # Look for the Export to Excel button with multiple selectors
-                    export_selectors = [
-                        'button:has-text("Export to Excel")',
-                        'button.btn.srp-btn.btn-lightblue:has-text("Export")',
-                        'button:has-text("Export")',
-                        'a:has-text("Export to Excel")',
-                        'a:has-text("Export")'
-                    ]
-                    
-                    export_button = None
-                    for selector in export_selectors:
-                        export_button = await self.page.query_selector(selector)
-                        if export_button:
-                            logger.info(f"Found export button using selector: {selector}")
-                            break
-                    
-                    if not export_button:
-                        logger.error(f"Export button not found for {chart_name} with any selector! Skipping...")
-                        continue
-                    
-                    # Set up download handler with longer timeout for slow SRP exports
-                    async with self.page.expect_download(timeout=60000) as download_info:
-                        await export_button.click()
-                        logger.info(f"Clicked export button for {chart_name}, waiting for download...")
-                        download = await download_info.value
-                    
-                    # Save the download with chart type in filename
-                    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-                    filename = f'srp_{chart_key}_{timestamp}.csv'
-                    filepath = os.path.join(downloads_dir, filename)
-                    await download.save_as(filepath)
-                    
-                    downloaded_files[chart_key] = filepath
-                    logger.info(f"{chart_name} file downloaded successfully: {filepath}")
-                    
-                    # Wait a bit before next download
-                    await asyncio.sleep(2)
-                    
+                    ingested = export_store.ingest(chart_key, filepath)
                 except Exception as e:
-                    logger.error(f"Failed to download {chart_name}: {e}")
-                    continue
-            
-            logger.info(f"SRP CSV download complete. Downloaded {len(downloaded_files)} files")
+                    logger.error(f"Failed to compare SRP {chart_key} export: {e}")
+                    ingested = {'status': 'changed', 'path': filepath}
+                downloaded_files[chart_key] = ingested['path']
+                self.last_csv_report['charts'][chart_key].update(
+                    {key: ingested.get(key) for key in ('status', 'new_rows', 'dropped_rows')})
+            csv_config = alert_config.get('srp_csv', {})
+            export_store.prune(csv_config.get('keep_files', 5), csv_config.get('keep_days', 30))
+            self.phases.lap('ingest')
+            self.last_csv_report['total_seconds'] = round(time.monotonic() - started, 1)
+            logger.info(f"SRP CSV download complete. Downloaded {len(downloaded_files)} files in {self.last_csv_report['total_seconds']}s")
+            if not downloaded_files:
+                self.invalidate_session_cache()
             return downloaded_files
             
         except Exception as e:
             logger.error(f"Error during CSV download: {e}")
+            self.invalidate_session_cache()
             return downloaded_files
     
+    async def stop(self):
+        """Clean up resources"""
+        try:
+            if self.context:
+                await self.context.close()
+            if self.browser:
+                await self.browser.close()
+            if self.playwright:
+                await self.playwright.stop()
+        except Exception as e:
+            logger.error(f"Error stopping SRP monitor: {e}")
+        finally:
+            browser_memory.unregister('srp')
+            self.session_validated_at = None
+    
+    async def recycle(self):
+        """Replace the browser with a fresh one, restoring the saved login session"""
+        await self.stop()
+        await self.start()
+    
     async def close(self):
-        await self.cleanup_browser()
+        await self.stop()
 
 def check_gmail_configured():
     """Check if gmail-send is configured"""
@@ -1317,26 +2509,16 @@ def is_valid_enphase_data(data):
     logger.debug(f"Enphase data validation failed - energy:{today_energy}kWh, power:{latest_power}W, voltage:{ac_voltage}V")
     return False
 
-def retry_with_exponential_backoff(func, max_retries=3, base_delay=1):
-    """Retry function with exponential backoff"""
-    async def wrapper(*args, **kwargs):
-        for attempt in range(max_retries):
-            try:
-                result = await func(*args, **kwargs)
-                if result:  # Success
-                    return result
-            except Exception as e:
-                logger.warning(f"Attempt {attempt + 1} failed: {e}")
-            
-            if attempt < max_retries - 1:  # Don't delay after last attempt
-                delay = base_delay * (2 ** attempt)  # Exponential backoff
-                logger.info(f"Retrying in {delay} seconds...")
-                await asyncio.sleep(delay)
-        
-        logger.error(f"All {max_retries} retry attempts failed")
-        return None
-    
-    return wrapper
+def get_circuit_breaker(source):
+    """Persistent circuit breaker for a source, created from the config on first use"""
+    if source not in circuit_breakers:
+        config = dict(alert_config.get('circuit_breaker', {}))
+        config.update(config.pop('sources', {}).get(source, {}))
+        circuit_breakers[source] = CircuitBreaker(source, **config)
+    return circuit_breakers[source]
+
+def circuit_breaker_states():
+    return {source: breaker.state_dict() for source, breaker in circuit_breakers.items()}
 
 def check_thresholds():
     """Check if any thresholds are exceeded"""
@@ -1425,7 +2607,9 @@ def check_thresholds():
     # Send alerts
     for subject, message in alerts:
         success, _ = send_alert_email(subject, message)
-        socketio.emit('alert', {'subject': subject, 'message': message, 'timestamp': datetime.now().isoformat()})
+        # Not coalesced: each alert is shown
+        socketio.emit('alert', {'subject': subject, 'message': message, 'timestamp': datetime.now().isoformat()},
+                      to='alerts')
 
 def restore_data_on_startup():
     """Restore latest data from database on startup"""
@@ -1433,11 +2617,12 @@ def restore_data_on_startup():
     
     if not data_storage:
         logger.info("No data storage available - starting with empty data")
+        mark_startup('data_restored')
         return
     
     try:
         # Restore latest EG4 data
-        latest_eg4 = data_storage.get_latest_eg4_data()
+        latest_eg4 = data_storage.get_latest_eg4_data(device=primary_eg4_device())
         if latest_eg4:
             logger.info(f"Restored EG4 data from {latest_eg4.get('timestamp')}")
             # Convert database format back to monitor format
@@ -1470,6 +2655,16 @@ def restore_data_on_startup():
                     'last_update': latest_eg4['timestamp']
                 }
         
+        # Restore the latest sample of every other inverter
+        for device in data_storage.get_eg4_devices():
+            if device['device'] == primary_eg4_device():
+                continue
+            latest = data_storage.get_latest_eg4_data(device=device['device'])
+            if latest and latest.get('parsed_data'):
+                monitor_data['eg4_devices'][device['device']] = dict(latest['parsed_data'], last_update=latest['timestamp'])
+        if monitor_data['eg4']:
+            monitor_data['eg4_devices'][primary_eg4_device()] = monitor_data['eg4']
+        
         # Restore latest SRP data
         latest_srp = data_storage.get_latest_srp_data()
         if latest_srp:
@@ -1486,13 +2681,401 @@ def restore_data_on_startup():
         
     except Exception as e:
         logger.error(f"Failed to restore data on startup: {e}")
+    finally:
+        restore_warm_start()
+        mark_startup('data_restored')
+
+# Health fields carried across restarts
+WARM_START_HEALTH_KEYS = ('eg4_last_success', 'srp_last_success', 'enphase_last_success')
+# Connection flags only a sample read by this process may set
+WARM_START_SKIPPED_KEYS = ('eg4_connected', 'enphase_connected')
+
+def restore_warm_start():
+    """Load the warm-start snapshot over what the database restored, and start taking snapshots
+    
+    The database has only the latest EG4 and SRP rows. The snapshot adds
+    Enphase data, health, the scheduler state, the last SRP update date and
+    recent EG4 history.
+    """
+    global last_srp_update_date, warm_start_scheduler
+    config = alert_config.get('warm_start', {})
+    recent_history.max_age_seconds = config.get('history_minutes', 180) * 60
+    if not config.get('enabled', True):
+        return
+    started = time.perf_counter()
+    snapshot = load_snapshot(config.get('path', './data/warm_start.json'), config.get('max_age_minutes', 360) * 60)
+    if snapshot:
+        try:
+            # Fill in what the database could not restore
+            with monitor_data_lock:
+                for key, value in snapshot.get('monitor_data', {}).items():
+                    if value and not monitor_data.get(key) and key not in WARM_START_SKIPPED_KEYS:
+                        monitor_data[key] = value
+            for key in WARM_START_HEALTH_KEYS:
+                monitor_health[key] = monitor_health.get(key) or snapshot.get('health', {}).get(key)
+            if snapshot.get('last_srp_update_date'):
+                last_srp_update_date = datetime.fromisoformat(snapshot['last_srp_update_date']).date()
+            warm_start_scheduler = snapshot.get('scheduler')
+            warm_start_status['history_samples'] = recent_history.load(snapshot.get('history', {}))
+            warm_start_status['restored'] = True
+            warm_start_status['snapshot_age_seconds'] = round(time.time() - snapshot['saved_at'], 1)
+        except Exception as e:
+            logger.warning(f"Failed to apply warm-start snapshot: {e}")
+    
+    # Without a snapshot the restored SRP data still tells when SRP last updated
+    srp_updated = monitor_data.get('srp', {}).get('last_daily_update')
+    if last_srp_update_date is None and srp_updated:
+        try:
+            last_srp_update_date = datetime.fromisoformat(str(srp_updated)).date()
+        except ValueError:
+            pass
+    warm_start_status['load_ms'] = round((time.perf_counter() - started) * 1000, 2)
+    if warm_start_status['restored']:
+        logger.info(f"Warm start from a snapshot taken {warm_start_status['snapshot_age_seconds']}s ago, "
+                    f"loaded in {warm_start_status['load_ms']}ms")
+    # Keep the latest state when the process exits, including on SIGTERM (see handle_shutdown_signal)
+    atexit.register(save_warm_start)
+
+def handle_shutdown_signal(signum, frame):
+    """Exit normally on SIGTERM, as systemd and Docker stop the service with it, so atexit handlers run"""
+    logger.info(f"Received signal {signum}, shutting down")
+    sys.exit(0)
+
+def save_warm_start():
+    """Write the warm-start snapshot, returning the bytes written"""
+    config = alert_config.get('warm_start', {})
+    if not config.get('enabled', True):
+        return 0
+    data = encode_warm_start()
+    write_snapshot(config.get('path', './data/warm_start.json'), data)
+    return len(data)
+
+def encode_warm_start():
+    """Serialize the live state, from a copy of monitor_data taken under its lock
+    
+    The monitor loop, the Modbus poller and ingest requests change it from
+    their own threads while the snapshot is taken.
+    """
+    with monitor_data_lock:
+        data = copy.deepcopy(monitor_data)
+    return encode_snapshot({
+        'monitor_data': data,
+        'health': {key: monitor_health.get(key) for key in WARM_START_HEALTH_KEYS},
+        'scheduler': poll_scheduler.export_state() if poll_scheduler else warm_start_scheduler,
+        'last_srp_update_date': last_srp_update_date.isoformat() if last_srp_update_date else None,
+        'history': recent_history.to_dict()
+    })
+
+def get_local_now():
+    """Current time in the configured timezone"""
+    try:
+        return datetime.now(pytz.timezone(alert_config.get('timezone', 'UTC')))
+    except:
+        return datetime.now(pytz.UTC)
+
+def eg4_schedule_values(data):
+    """Fields the scheduler watches for change in EG4 samples"""
+    return {
+        'battery_soc': data.get('battery', {}).get('soc', 0),
+        'battery_power': data.get('battery', {}).get('power', 0),
+        'pv_power': data.get('pv', {}).get('power', 0),
+        'grid_power': data.get('grid', {}).get('power', 0),
+        'load_power': data.get('load', {}).get('power', 0)
+    }
+
+def grid_import_proximity(data, now):
+    """How close grid import is to the alert threshold (0-1), 0 outside the alert window"""
+    thresholds = alert_config['thresholds']
+    if not (thresholds.get('grid_import_start_hour', 14) <= now.hour < thresholds.get('grid_import_end_hour', 20)):
+        return 0.0
+    grid_import = max(0, -data.get('grid', {}).get('power', 0))  # Negative grid power = importing
+    threshold = thresholds.get('grid_import', 10000)
+    return min(1.0, grid_import / threshold) if threshold else 0.0
+
+# Legacy full-payload event per live state topic
+LIVE_TOPIC_EVENTS = {'eg4': 'eg4_update', 'srp': 'srp_update', 'enphase': 'enphase_update'}
+
+def legacy_event(topic, data):
+    """The full-payload event a topic was sent as before deltas, device topics as eg4_devices_update"""
+    if topic.startswith(DEVICE_ROOM_PREFIX):
+        return 'eg4_devices_update', {topic[len(DEVICE_ROOM_PREFIX):]: strip_debug(data)}
+    return LIVE_TOPIC_EVENTS[topic], strip_debug(data)
+
+def broadcast_state(topic, data):
+    """Queue a topic's new state for clients, coalesced with other updates of the topic until the next flush"""
+    topic_hub.submit(topic, data, lambda latest: send_topic_state(topic, latest))
+
+def send_topic_state(topic, data):
+    """Send a topic's state to the rooms watching it, as a delta of the fields that changed"""
+    config = alert_config.get('live_updates', {})
+    rooms = topic_rooms(topic)
+    if not config.get('enabled', True):
+        if topic_hub.watched(*rooms):
+            socketio.emit(*legacy_event(topic, data), to=rooms)
+        return
+    # Kept current even when nobody watches, for the snapshot of the next subscriber
+    message = live_state.update(topic, data)
+    if not topic_hub.watched(*rooms):
+        return
+    if message:
+        socketio.emit('state_delta', message, to=rooms)
+    if config.get('legacy_events', False):
+        socketio.emit(*legacy_event(topic, data), to=rooms)
+
+def run_topic_flusher():
+    """Send coalesced topic updates once per interval"""
+    while True:
+        socketio.sleep(max(topic_hub.interval, 0.05))
+        topic_hub.flush()
+
+def start_topic_flusher():
+    """Start the flusher with the first client, as updates only need sending once someone watches"""
+    global topic_flusher
+    with monitoring_lock:
+        if topic_flusher is None:
+            topic_flusher = socketio.start_background_task(run_topic_flusher)
+
+def publish_eg4_data(eg4_data):
+    """Publish a validated EG4 sample to clients, the database and health tracking"""
+    # Use timezone-aware timestamp for consistency - only on successful update
+    tz_name = alert_config.get('timezone', 'UTC')
+    try:
+        tz = pytz.timezone(tz_name)
+        current_time = datetime.now(tz)
+    except:
+        current_time = datetime.now(pytz.UTC)
+    with monitor_data_lock:
+        monitor_data['eg4'] = eg4_data
+        monitor_data['eg4']['last_update'] = current_time.isoformat()
+        monitor_data['eg4']['device'] = primary_eg4_device()
+        monitor_data['eg4_devices'][primary_eg4_device()] = eg4_data
+        monitor_data['last_update'] = current_time.isoformat()  # Keep for backward compatibility
+        monitor_data['eg4_connected'] = True
+    recent_history.append(primary_eg4_device(), eg4_data)
+    with scrape_timings.span('eg4', 'emit'):
+        broadcast_state('eg4', eg4_data)
+    
+    # Store data in database
+    if data_storage:
+        try:
+            with scrape_timings.span('eg4', 'store'):
+                success = data_storage.store_eg4_data(eg4_data, device=primary_eg4_device())
+            if success:
+                logger.debug("EG4 data stored to database")
+            else:
+                logger.warning("Failed to store EG4 data to database")
+        except Exception as e:
+            logger.error(f"Error storing EG4 data: {e}")
+    
+    logger.debug(f"EG4 data updated - SOC: {eg4_data.get('battery', {}).get('soc', 0)}%")
+    monitor_health['eg4_last_success'] = datetime.now().isoformat()
+    update_monitor_health('running')
+
+def publish_eg4_fleet_data(samples):
+    """Publish one collection of the additional EG4 inverters, keyed by device"""
+    last_update = get_local_now().isoformat()
+    for device, data in samples.items():
+        data['device'] = device
+        data['last_update'] = last_update
+        recent_history.append(device, data)
+    with monitor_data_lock:
+        monitor_data['eg4_devices'].update(samples)
+    with scrape_timings.span('eg4_fleet', 'emit'):
+        for device, data in samples.items():
+            broadcast_state(f'{DEVICE_ROOM_PREFIX}{device}', data)
+    
+    # One transaction for the whole collection, however many inverters it covers
+    if data_storage:
+        try:
+            with scrape_timings.span('eg4_fleet', 'store'):
+                stored = data_storage.store_eg4_samples(samples)
+            if not stored:
+                logger.warning("Failed to store EG4 fleet data to database")
+        except Exception as e:
+            logger.error(f"Error storing EG4 fleet data: {e}")
+
+def publish_ingested_samples(rows):
+    """Show the newest ingested sample of each additional device to connected clients
+    
+    The primary inverter's live view stays with the monitor's own collectors.
+    """
+    latest = {}
+    for timestamp, device, data in rows:
+        if device != primary_eg4_device() and (device not in latest or timestamp >= latest[device][0]):
+            latest[device] = (timestamp, data)
+    updates = {}
+    for device, (timestamp, data) in latest.items():
+        current = monitor_data['eg4_devices'].get(device, {}).get('last_update')
+        try:
+            current = parse_timestamp(current) if current else None
+        except ValueError:
+            current = None
+        # Backfilled batches don't replace a newer live sample
+        if current is None or timestamp >= current:
+            updates[device] = dict(data, device=device, last_update=timestamp.isoformat())
+    if updates:
+        with monitor_data_lock:
+            monitor_data['eg4_devices'].update(updates)
+        for device, data in updates.items():
+            broadcast_state(f'{DEVICE_ROOM_PREFIX}{device}', data)
+
+def create_eg4_fleet():
+    """Create the collector for the configured additional EG4 inverters, if any"""
+    config = alert_config.get('eg4_fleet', {})
+    if not config.get('targets'):
+        return None
+    if not EG4_RUNTIME_API_AVAILABLE:
+        logger.warning("EG4 fleet targets configured but the runtime parser is not available")
+        return None
+    fleet = EG4Fleet(config['targets'], config.get('concurrency', 4))
+    return fleet if fleet.targets else None
+
+def modbus_covers_eg4():
+    """True while the Modbus/TCP source keeps the primary inverter current, so the EG4 browser can stay down
+    
+    A freshly started source gets stale_after seconds for its first sample.
+    """
+    if not modbus_source:
+        return False
+    stale_after = alert_config.get('eg4_modbus', {}).get('stale_after', 30)
+    return (modbus_source.fresh(stale_after) or
+            (modbus_source.stats['last_success'] is None and
+             time.monotonic() - modbus_source.created_monotonic < stale_after))
+
+async def modbus_loop(source):
+    """Sample the primary inverter over Modbus/TCP every poll_interval seconds"""
+    config = alert_config.get('eg4_modbus', {})
+    poll_interval = max(0.5, config.get('poll_interval', 2))
+    logger.info(f"EG4 Modbus/TCP source polling {source.client.host}:{source.client.port} every {poll_interval}s")
+    
+    failures = 0
+    try:
+        while True:
+            started = time.monotonic()
+            try:
+                with scrape_timings.span('eg4_modbus', 'read'):
+                    eg4_data = await source.get_data()
+                if is_valid_eg4_data(eg4_data):
+                    publish_eg4_data(eg4_data)
+                    mark_startup('first_eg4_sample')
+                    if failures:
+                        logger.info(f"EG4 Modbus/TCP source recovered after {failures} failed reads")
+                    failures = 0
+                else:
+                    logger.debug(f"EG4 Modbus/TCP read returned invalid data: {eg4_data}")
+            except Exception as e:
+                failures += 1
+                # Log the first failure of a run, then only every 30th so an offline inverter doesn't flood the log
+                if failures == 1 or failures % 30 == 0:
+                    logger.warning(f"EG4 Modbus/TCP read failed ({failures} in a row): {e}")
+            await asyncio.sleep(max(0, poll_interval - (time.monotonic() - started)))
+    finally:
+        await source.close()
+
+async def wait_for_next_cycle(eg4, cycle_seconds):
+    """Sleep until the next full cycle, polling EG4 over HTTP in between when enabled"""
+    poll_interval = alert_config.get('eg4_collector', {}).get('http_poll_interval', 15)
+    deadline = time.monotonic() + cycle_seconds
+    
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0 or manual_refresh_requested:
+            return
+        if not (eg4.http_client and eg4.http_client.ready):
+            await asyncio.sleep(remaining)
+            return
+        
+        await asyncio.sleep(min(poll_interval, remaining))
+        if deadline - time.monotonic() <= 0:
+            return
+        
+        try:
+            eg4_data = await eg4.http_client.get_runtime()
+            if is_valid_eg4_data(eg4_data):
+                publish_eg4_data(eg4_data)
+        except SessionExpiredError as e:
+            # The next full cycle falls back to the browser and re-exports the session
+            logger.info(f"EG4 HTTP session expired between cycles: {e}")
+            eg4.logged_in = False
+        except Exception as e:
+            logger.warning(f"EG4 HTTP poll between cycles failed: {e}")
+
+async def launch_browser(name, monitor):
+    """Start one monitor's browser, recording how long the launch took"""
+    started = time.monotonic()
+    try:
+        await monitor.start()
+    except Exception as e:
+        logger.error(f"Failed to start {name.upper()} browser: {e}")
+        raise
+    seconds = round(time.monotonic() - started, 2)
+    startup_timings['browser_launch_seconds'].setdefault(name, seconds)
+    logger.info(f"{name.upper()} browser started in {seconds}s")
+
+async def ensure_srp_login(srp):
+    """Check the SRP session and log in if needed, returning whether SRP is usable"""
+    srp_logged_in = False
+    try:
+        # Check if already logged in
+        if await srp.is_logged_in():
+            srp_logged_in = True
+            logger.debug("SRP session validated - already logged in")
+        else:
+            # Need to login
+            for attempt in range(3):
+                if await srp.login():
+                    srp_logged_in = True
+                    logger.info("SRP login successful")
+                    break
+                logger.warning(f"SRP login attempt {attempt + 1} failed")
+                await asyncio.sleep(5)
+            
+            if not srp_logged_in:
+                logger.error("SRP login failed after 3 attempts - continuing without SRP data")
+    except Exception as e:
+        logger.error(f"Error checking SRP login status: {e}")
+        srp_logged_in = False
+    return srp_logged_in
+
+async def ensure_enphase_login(enphase):
+    """Check the Enphase session and log in if needed, returning whether Enphase is usable"""
+    enphase_logged_in = False
+    try:
+        # Check if already logged in
+        if await enphase.is_logged_in():
+            enphase_logged_in = True
+            logger.debug("Enphase session validated - already logged in")
+        else:
+            # Need to login
+            if await enphase.login_with_retry():
+                enphase_logged_in = True
+                logger.info("Enphase login successful")
+            else:
+                logger.error("Failed to login to Enphase after all retry attempts")
+            
+            if not enphase_logged_in:
+                logger.error("Enphase login failed after 3 attempts - continuing without Enphase data")
+    except Exception as e:
+        logger.error(f"Error checking Enphase login status: {e}")
+        enphase_logged_in = False
+    return enphase_logged_in
 
 async def monitor_loop():
     """Main monitoring loop with automatic recovery"""
-    global eg4_monitor, srp_monitor, enphase_monitor
+    global eg4_monitor, srp_monitor, enphase_monitor, eg4_fleet, poll_scheduler, hot_standbys, last_srp_update_date
     
-    # Restore data from database on startup
-    restore_data_on_startup()
+    # Normally restored before the web server starts, this covers the loop being started on its own
+    if startup_timings['data_restored'] is None:
+        init_data_storage()
+        restore_data_on_startup()
+    mark_startup('monitor_started')
+    
+    scheduler_config = alert_config.get('scheduler', {})
+    poll_scheduler = AdaptiveScheduler(scheduler_config) if scheduler_config.get('enabled', True) else None
+    # Resume the polling schedule of the previous run instead of polling everything at once
+    scheduler_restored = bool(poll_scheduler and warm_start_scheduler and poll_scheduler.restore_state(warm_start_scheduler))
+    if scheduler_restored:
+        logger.info("Polling schedule restored from the warm-start snapshot")
     
     eg4_monitor = EG4Monitor()
     srp_monitor = SRPMonitor()
@@ -1500,160 +3083,204 @@ async def monitor_loop():
     eg4 = eg4_monitor
     srp = srp_monitor
     enphase = enphase_monitor
+    eg4_fleet = create_eg4_fleet()
+    fleet_interval = alert_config.get('eg4_fleet', {}).get('poll_interval', 60)
+    fleet_next_due = 0.0
+    hot_standbys = create_hot_standbys()
+    failover_after = alert_config.get('hot_standby', {}).get('failover_after_failures', 2)
     
     retry_count = 0
     max_retries = 5
+    loop_started = time.monotonic()
+    eg4_first_sample_pending = True
     eg4_started = False
     srp_started = False
     enphase_started = False
+    fleet_started = False
     
     while True:
+        # Sources whose browser failed to launch, so only an EG4 failure swaps EG4 to its standby
+        failed_sources = []
         try:
-            # Start browsers if not already started
-            if not eg4_started:
-                await eg4.start()
-                eg4_started = True
-                logger.info("EG4 browser started")
-            
+            # Launch any browsers that aren't running yet, in parallel
+            launches = {}
+            if not eg4_started and not modbus_covers_eg4():
+                launches['eg4'] = eg4
+            if eg4_fleet and not fleet_started:
+                launches['eg4_fleet'] = eg4_fleet
             if not srp_started:
-                await srp.start()
-                srp_started = True
-                logger.info("SRP browser started")
-            
+                launches['srp'] = srp
             if not enphase_started:
-                await enphase.start()
-                enphase_started = True
-                logger.info("Enphase browser started")
-            
-            # Check SRP login status and login if needed
-            srp_logged_in = False
-            try:
-                # Check if already logged in
-                if await srp.is_logged_in():
-                    srp_logged_in = True
-                    logger.debug("SRP session validated - already logged in")
+                launches['enphase'] = enphase
+            results = await asyncio.gather(*(launch_browser(name, monitor) for name, monitor in launches.items()),
+                                           return_exceptions=True)
+            launch_errors = []
+            for name, result in zip(launches, results):
+                if isinstance(result, Exception):
+                    launch_errors.append(result)
+                    failed_sources.append(name)
+                    continue
+                if name == 'eg4':
+                    eg4_started = True
+                elif name == 'eg4_fleet':
+                    fleet_started = True
+                elif name == 'srp':
+                    srp_started = True
                 else:
-                    # Need to login
-                    for attempt in range(3):
-                        if await srp.login():
-                            srp_logged_in = True
-                            logger.info("SRP login successful")
-                            break
-                        logger.warning(f"SRP login attempt {attempt + 1} failed")
-                        await asyncio.sleep(5)
-                    
-                    if not srp_logged_in:
-                        logger.error("SRP login failed after 3 attempts - continuing without SRP data")
-            except Exception as e:
-                logger.error(f"Error checking SRP login status: {e}")
-                srp_logged_in = False
+                    enphase_started = True
+            if launch_errors:
+                raise launch_errors[0]
+            mark_startup('browsers_ready')
             
-            # Check Enphase login status and login if needed
-            enphase_logged_in = False
-            try:
-                # Check if already logged in
-                if await enphase.is_logged_in():
-                    enphase_logged_in = True
-                    logger.debug("Enphase session validated - already logged in")
-                else:
-                    # Need to login
-                    if await enphase.login_with_retry():
-                        enphase_logged_in = True
-                        logger.info("Enphase login successful")
-                    else:
-                        logger.error("Failed to login to Enphase after all retry attempts")
-                    
-                    if not enphase_logged_in:
-                        logger.error("Enphase login failed after 3 attempts - continuing without Enphase data")
-            except Exception as e:
-                logger.error(f"Error checking Enphase login status: {e}")
-                enphase_logged_in = False
+            # Check SRP and Enphase login status and log in if needed, both at once
+            srp_logged_in, enphase_logged_in = await asyncio.gather(ensure_srp_login(srp),
+                                                                    ensure_enphase_login(enphase))
+            mark_startup('logins_ready')
             
             # Reset retry count on successful connection
             retry_count = 0
             
-            # Track last SRP update date
-            last_srp_update_date = None
-            
             # Main monitoring loop
             consecutive_failures = 0
+            enphase_failures = 0
+            force_poll = not scheduler_restored
+            scheduler_restored = False
+            eg4_retry_now = False
+            last_cleanup_date = None
+            # Where each cycle's time goes, one phase per source plus housekeeping and sleep
+            cycle_phases = PhaseTimer('cycle', scrape_timings)
             while True:
                 try:
-                    # Get EG4 data with retry logic (login handled internally if needed)
-                    retry_eg4_get_data = retry_with_exponential_backoff(eg4.get_data, max_retries=2, base_delay=1)
-                    eg4_data = await retry_eg4_get_data()
+                    cycle_phases.begin()
                     
-                    if eg4_data and is_valid_eg4_data(eg4_data):
-                        monitor_data['eg4'] = eg4_data
-                        # Use timezone-aware timestamp for consistency - only on successful update
-                        tz_name = alert_config.get('timezone', 'UTC')
-                        try:
-                            tz = pytz.timezone(tz_name)
-                            current_time = datetime.now(tz)
-                        except:
-                            current_time = datetime.now(pytz.UTC)
-                        monitor_data['eg4']['last_update'] = current_time.isoformat()
-                        monitor_data['last_update'] = current_time.isoformat()  # Keep for backward compatibility
-                        monitor_data['eg4_connected'] = True
-                        socketio.emit('eg4_update', eg4_data)
-                        consecutive_failures = 0
+                    # Get EG4 data when due (every cycle without the adaptive scheduler)
+                    eg4_due = force_poll or eg4_retry_now or not poll_scheduler or poll_scheduler.is_due('eg4')
+                    eg4_retry_now = False
+                    if modbus_covers_eg4():
+                        # The Modbus/TCP source is publishing the primary inverter, the browser isn't needed
+                        eg4_due = False
+                        if eg4_started:
+                            logger.info("EG4 Modbus/TCP source is current, stopping the EG4 browser")
+                            await eg4.stop()
+                            eg4_started = False
+                    elif modbus_source is not None and eg4_due and not eg4_started:
+                        logger.info("EG4 Modbus/TCP source is stale, starting the EG4 browser")
+                        await launch_browser('eg4', eg4)
+                        eg4_started = True
+                    eg4_breaker = get_circuit_breaker('eg4')
+                    if eg4_due and not eg4_breaker.allow_request():
+                        # Portal keeps failing - skip until the breaker lets a probe through
+                        eg4_due = False
+                        if poll_scheduler:
+                            poll_scheduler.defer('eg4', eg4_breaker.retry_in())
+                    if eg4_due:
+                        # Get EG4 data through its circuit breaker (login handled internally if needed)
+                        scrape_started = time.monotonic()
+                        eg4_data = await eg4_breaker.call(eg4.get_data, validate=is_valid_eg4_data)
+                        scrape_seconds = time.monotonic() - scrape_started
+                        with eg4.phases.phase('validate'):
+                            eg4_valid = bool(eg4_data) and is_valid_eg4_data(eg4_data)
                         
-                        # Store data in database
-                        if data_storage:
+                        if eg4_valid:
+                            publish_eg4_data(eg4_data)
+                            consecutive_failures = 0
+                            if poll_scheduler:
+                                local_now = get_local_now()
+                                poll_scheduler.record_sample('eg4', eg4_schedule_values(eg4_data), local_now.hour,
+                                                             grid_import_proximity(eg4_data, local_now), scrape_seconds)
+                            if eg4_first_sample_pending:
+                                eg4_first_sample_pending = False
+                                monitor_health['eg4_time_to_first_sample'] = round(time.monotonic() - loop_started, 1)
+                                mark_startup('first_eg4_sample')
+                                logger.info(f"First EG4 sample {monitor_health['eg4_time_to_first_sample']}s after monitor start")
+                        elif eg4_data:
+                            consecutive_failures += 1
+                            monitor_data['eg4_connected'] = False
+                            logger.warning(f"EG4 data validation failed - invalid readings (attempt {consecutive_failures})")
+                            logger.debug(f"EG4 invalid data: {eg4_data}")
+                            if poll_scheduler:
+                                poll_scheduler.record_failure('eg4', scrape_seconds)
+                        else:
+                            consecutive_failures += 1
+                            monitor_data['eg4_connected'] = False
+                            logger.error(f"Failed to get EG4 data (attempt {consecutive_failures})")
+                            if poll_scheduler:
+                                poll_scheduler.record_failure('eg4', scrape_seconds)
+                        
+                        # Swap to the warm standby browser and retry right away
+                        if consecutive_failures >= failover_after and 'eg4' in hot_standbys:
+                            if await hot_standbys['eg4'].failover(eg4):
+                                consecutive_failures = 0
+                                eg4_retry_now = True
+                                continue
+                        
+                        # Reset consecutive failures if we've had too many
+                        if consecutive_failures >= 5:
+                            logger.warning(f"Too many consecutive EG4 failures ({consecutive_failures}), forcing reconnection")
                             try:
-                                success = data_storage.store_eg4_data(eg4_data)
-                                if success:
-                                    logger.debug("EG4 data stored to database")
-                                else:
-                                    logger.warning("Failed to store EG4 data to database")
+                                await eg4.stop()
+                                eg4_started = False
+                                consecutive_failures = 0
                             except Exception as e:
-                                logger.error(f"Error storing EG4 data: {e}")
-                        
-                        logger.debug(f"EG4 data updated - SOC: {eg4_data.get('battery', {}).get('soc', 0)}%")
-                        monitor_health['eg4_last_success'] = datetime.now().isoformat()
-                        update_monitor_health('running')
-                    elif eg4_data:
-                        consecutive_failures += 1
-                        monitor_data['eg4_connected'] = False
-                        logger.warning(f"EG4 data validation failed - invalid readings (attempt {consecutive_failures})")
-                        logger.debug(f"EG4 invalid data: {eg4_data}")
-                    else:
-                        consecutive_failures += 1
-                        monitor_data['eg4_connected'] = False
-                        logger.error(f"Failed to get EG4 data after retries (attempt {consecutive_failures})")
+                                logger.error(f"Error stopping EG4 monitor: {e}")
                     
-                    # Reset consecutive failures if we've had too many
-                    if consecutive_failures >= 5:
-                        logger.warning(f"Too many consecutive EG4 failures ({consecutive_failures}), forcing reconnection")
-                        try:
-                            await eg4.stop()
-                            eg4_started = False
-                            consecutive_failures = 0
-                        except Exception as e:
-                            logger.error(f"Error stopping EG4 monitor: {e}")
+                    cycle_phases.lap('eg4')
+                    
+                    # Collect the additional EG4 inverters concurrently over the shared fleet browser
+                    if eg4_fleet and (force_poll or time.monotonic() >= fleet_next_due):
+                        fleet_next_due = time.monotonic() + fleet_interval
+                        fleet_samples = await eg4_fleet.collect()
+                        if fleet_samples:
+                            publish_eg4_fleet_data(fleet_samples)
+                    cycle_phases.lap('eg4_fleet')
                     
-                    # Get Enphase data every cycle (like EG4, every 60 seconds)
-                    if enphase_logged_in:
+                    # Get Enphase data when due (every cycle without the adaptive scheduler)
+                    enphase_due = force_poll or not poll_scheduler or poll_scheduler.is_due('enphase')
+                    force_poll = False
+                    enphase_breaker = get_circuit_breaker('enphase')
+                    if enphase_logged_in and enphase_due and not enphase_breaker.allow_request():
+                        # Portal keeps failing - skip until the breaker lets a probe through
+                        enphase_due = False
+                        if poll_scheduler:
+                            poll_scheduler.defer('enphase', enphase_breaker.retry_in())
+                    if enphase_logged_in and enphase_due:
                         try:
                             # Validate session before attempting data collection
                             if not await enphase.is_logged_in():
                                 logger.warning("Enphase session expired, attempting re-login...")
                                 if await enphase.login_with_retry():
                                     logger.info("Enphase re-login successful")
+                                elif 'enphase' in hot_standbys and await hot_standbys['enphase'].failover(enphase):
+                                    logger.info("Enphase re-login failed, continuing on standby browser")
                                 else:
                                     logger.error("Failed to re-login to Enphase after all retry attempts")
+                                    enphase_breaker.record_failure('login failed')
                                     enphase_logged_in = False
                                     continue
                             
                             if enphase_logged_in:
-                                # Get Enphase data with retry logic
-                                retry_enphase_get_data = retry_with_exponential_backoff(enphase.get_data, max_retries=2, base_delay=1)
-                                enphase_data = await retry_enphase_get_data()
+                                # Get Enphase data through its circuit breaker
+                                scrape_started = time.monotonic()
+                                enphase_data = await enphase_breaker.call(enphase.get_data, validate=is_valid_enphase_data)
+                                scrape_seconds = time.monotonic() - scrape_started
+                                with enphase.phases.phase('validate'):
+                                    enphase_valid = bool(enphase_data) and is_valid_enphase_data(enphase_data)
                                 
-                                if enphase_data and is_valid_enphase_data(enphase_data):
-                                    monitor_data['enphase'] = enphase_data
-                                    monitor_data['enphase_connected'] = True
-                                    socketio.emit('enphase_update', enphase_data)
+                                if poll_scheduler:
+                                    if enphase_valid:
+                                        poll_scheduler.record_sample('enphase', {
+                                            'latest_power_w': enphase_data.get('latest_power_w', 0),
+                                            'today_energy_kwh': enphase_data.get('today_energy_kwh', 0)
+                                        }, get_local_now().hour, scrape_seconds=scrape_seconds)
+                                    else:
+                                        poll_scheduler.record_failure('enphase', scrape_seconds)
+                                
+                                if enphase_valid:
+                                    with monitor_data_lock:
+                                        monitor_data['enphase'] = enphase_data
+                                        monitor_data['enphase_connected'] = True
+                                    with scrape_timings.span('enphase', 'emit'):
+                                        broadcast_state('enphase', enphase_data)
                                     
                                     # Store data in database
                                     if data_storage:
@@ -1666,17 +3293,26 @@ async def monitor_loop():
                                     logger.debug(f"Enphase data updated - Today: {enphase_data.get('today_energy_kwh', 0)}kWh, Latest: {enphase_data.get('latest_power_w', 0)}W")
                                     monitor_health['enphase_last_success'] = datetime.now().isoformat()
                                     update_monitor_health('running')
+                                    enphase_failures = 0
                                 elif enphase_data:
                                     monitor_data['enphase_connected'] = False
+                                    enphase_failures += 1
                                     logger.warning("Enphase data validation failed - invalid readings")
                                     logger.debug(f"Enphase invalid data: {enphase_data}")
                                 else:
                                     monitor_data['enphase_connected'] = False
-                                    logger.error("Failed to get Enphase data after retries")
+                                    enphase_failures += 1
+                                    logger.error("Failed to get Enphase data")
+                                
+                                # Swap to the warm standby browser after repeated failures
+                                if enphase_failures >= failover_after and 'enphase' in hot_standbys:
+                                    if await hot_standbys['enphase'].failover(enphase):
+                                        enphase_failures = 0
                                     
                         except Exception as e:
                             logger.error(f"Error in Enphase data collection: {e}")
                             monitor_data['enphase_connected'] = False
+                    cycle_phases.lap('enphase')
                     
                     # Get SRP data once per day at configured time OR on manual refresh OR if missing
                     if srp_logged_in:
@@ -1714,6 +3350,11 @@ async def monitor_loop():
                             should_update_srp = True
                             logger.info(f"Daily SRP update needed - last update was {last_srp_update_date}, today is {current_date}")
                         
+                        srp_breaker = get_circuit_breaker('srp')
+                        if should_update_srp and not srp_breaker.allow_request():
+                            # Portal keeps failing - skip until the breaker lets a probe through
+                            should_update_srp = False
+                        
                         if should_update_srp:
                             # Validate session before attempting data collection
                             if not await srp.is_logged_in():
@@ -1726,27 +3367,32 @@ async def monitor_loop():
                                     await asyncio.sleep(5)
                                 else:
                                     logger.error("SRP re-login failed - skipping SRP update")
+                                    srp_breaker.record_failure('login failed')
                                     continue
                             
                             logger.info("Updating SRP peak demand data...")
-                            # Use retry logic for SRP data collection
-                            retry_srp_get_data = retry_with_exponential_backoff(srp.get_peak_demand, max_retries=3, base_delay=2)
-                            srp_data = await retry_srp_get_data()
+                            # Get SRP data through its circuit breaker
+                            srp_data = await srp_breaker.call(srp.get_peak_demand, validate=is_valid_srp_data)
+                            with srp.phases.phase('validate'):
+                                srp_valid = bool(srp_data) and is_valid_srp_data(srp_data)
                             
-                            if srp_data and is_valid_srp_data(srp_data):
-                                monitor_data['srp'] = srp_data
-                                monitor_data['srp']['last_daily_update'] = now.isoformat()
-                                socketio.emit('srp_update', srp_data)
+                            if srp_valid:
+                                with monitor_data_lock:
+                                    monitor_data['srp'] = srp_data
+                                    monitor_data['srp']['last_daily_update'] = now.isoformat()
+                                with scrape_timings.span('srp', 'emit'):
+                                    broadcast_state('srp', srp_data)
                                 last_srp_update_date = current_date
                                 
                                 # Store data in database
                                 if data_storage:
                                     try:
-                                        success = data_storage.store_srp_data(
-                                            date=current_date.isoformat(),
-                                            chart_type='demand',
-                                            data=srp_data
-                                        )
+                                        with scrape_timings.span('srp', 'store'):
+                                            success = data_storage.store_srp_data(
+                                                date=current_date.isoformat(),
+                                                chart_type='demand',
+                                                data=srp_data
+                                            )
                                         if success:
                                             logger.debug("SRP data stored to database")
                                         else:
@@ -1764,14 +3410,15 @@ async def monitor_loop():
                                 if csv_files:
                                     logger.info(f"Successfully downloaded {len(csv_files)} CSV files")
                                     # Store CSV download timestamp
-                                    monitor_data['srp']['csv_last_update'] = now.isoformat()
-                                    monitor_data['srp']['csv_files_count'] = len(csv_files)
+                                    with monitor_data_lock:
+                                        monitor_data['srp']['csv_last_update'] = now.isoformat()
+                                        monitor_data['srp']['csv_files_count'] = len(csv_files)
                                 else:
                                     logger.warning("Failed to download some or all CSV files")
                             elif srp_data:
                                 logger.warning(f"SRP data validation failed - received invalid data: {srp_data}")
                             else:
-                                logger.error("Failed to get SRP peak demand data after retries")
+                                logger.error("Failed to get SRP peak demand data")
                     
                     # Check for manual CSV download request
                     global manual_csv_download_requested
@@ -1795,12 +3442,14 @@ async def monitor_loop():
                             csv_files = await srp.download_csv_data()
                             if csv_files:
                                 logger.info(f"Manual download successful: {len(csv_files)} CSV files")
-                                monitor_data['srp']['csv_last_update'] = now.isoformat()
-                                monitor_data['srp']['csv_files_count'] = len(csv_files)
+                                with monitor_data_lock:
+                                    monitor_data['srp']['csv_last_update'] = now.isoformat()
+                                    monitor_data['srp']['csv_files_count'] = len(csv_files)
                             else:
                                 logger.warning("Manual CSV download failed")
                         except Exception as e:
                             logger.error(f"Error in manual CSV download: {e}")
+                    cycle_phases.lap('srp')
                     
                     # Check thresholds
                     try:
@@ -1817,6 +3466,7 @@ async def monitor_loop():
                     global manual_refresh_requested
                     if manual_refresh_requested:
                         manual_refresh_requested = False
+                        force_poll = True
                         logger.info("Manual refresh requested, fetching data immediately")
                         continue  # Skip sleep and fetch data immediately
                     
@@ -1825,15 +3475,31 @@ async def monitor_loop():
                         current_hour = datetime.now().hour
                         current_minute = datetime.now().minute
                         # Run cleanup at 3:00 AM daily
-                        if current_hour == 3 and current_minute == 0:
+                        if current_hour == 3 and current_minute == 0 and last_cleanup_date != datetime.now().date():
+                            last_cleanup_date = datetime.now().date()
                             try:
                                 data_storage.cleanup_old_data()
                                 logger.info("Daily database cleanup completed")
                             except Exception as e:
                                 logger.error(f"Database cleanup failed: {e}")
                     
-                    # Wait 60 seconds
-                    await asyncio.sleep(60)
+                    # Recycle any browser over its memory or age budget while no scrape is running
+                    monitors = {'eg4': eg4, 'srp': srp, 'enphase': enphase}
+                    if eg4_fleet:
+                        monitors[eg4_fleet.memory_key] = eg4_fleet
+                    for standby in hot_standbys.values():
+                        if standby.spare:
+                            monitors[standby.spare.memory_key] = standby.spare
+                    await manage_browser_memory(monitors)
+                    await maintain_hot_standbys()
+                    monitor_health['circuit_breakers'] = circuit_breaker_states()
+                    cycle_phases.lap('housekeeping')
+                    
+                    # Wake when the next source is due (at least once a minute for scheduled checks),
+                    # or after 60 seconds without the scheduler, polling EG4 over HTTP in the meantime when enabled
+                    cycle_seconds = min(60, max(1, poll_scheduler.seconds_until_next())) if poll_scheduler else 60
+                    await wait_for_next_cycle(eg4, cycle_seconds)
+                    cycle_phases.lap('sleep')
                     
                 except Exception as e:
                     logger.error(f"Error in monitoring loop: {e}")
@@ -1851,6 +3517,15 @@ async def monitor_loop():
                 await asyncio.sleep(60)  # Wait before watchdog restarts
                 break
             
+            # Swap EG4 onto its warm standby browser instead of restarting it, when EG4 is what failed;
+            # repeated EG4 scrape failures are failed over in the loop itself
+            eg4_failed_over = False
+            if 'eg4' in failed_sources and 'eg4' in hot_standbys:
+                try:
+                    eg4_failed_over = await hot_standbys['eg4'].failover(eg4)
+                except Exception as failover_error:
+                    logger.error(f"EG4 standby failover failed: {failover_error}")
+            
             # Check if it's a critical error that requires browser restart
             error_msg = str(e).lower()
             if 'browser' in error_msg or 'closed' in error_msg or 'crashed' in error_msg or 'pthread' in error_msg:
@@ -1864,25 +3539,36 @@ async def monitor_loop():
                         logger.info(f"Cleaned up {killed_count} zombie browser processes")
                         await asyncio.sleep(5)  # Give system time to recover
                 # Close browsers for restart
-                try:
-                    await eg4.close()
-                    eg4_started = False
-                    eg4.logged_in = False
-                except:
-                    pass
+                if not eg4_failed_over:
+                    try:
+                        await eg4.close()
+                        eg4_started = False
+                        eg4.logged_in = False
+                    except:
+                        pass
                 try:
                     await srp.close()
                     srp_started = False
                 except:
                     pass
+                if eg4_fleet:
+                    try:
+                        await eg4_fleet.stop()
+                        fleet_started = False
+                    except:
+                        pass
             else:
                 # For other errors, just mark as not logged in to trigger re-login
                 logger.info("Non-browser error, will attempt re-login")
-                eg4.logged_in = False
+                if not eg4_failed_over:
+                    eg4.logged_in = False
                 if hasattr(srp, 'logged_in'):
                     srp.logged_in = False
             
-            wait_time = min(60 * retry_count, 300)  # Max 5 minute wait
+            if eg4_failed_over:
+                wait_time = 5  # EG4 is already running on the standby browser
+            else:
+                wait_time = min(60 * retry_count, 300)  # Max 5 minute wait
             logger.info(f"Retrying in {wait_time} seconds (attempt {retry_count}/{max_retries})")
             await asyncio.sleep(wait_time)
     
@@ -1899,6 +3585,8 @@ monitor_health = {
     'eg4_last_success': None,
     'srp_last_success': None,
     'enphase_last_success': None,
+    'eg4_time_to_first_sample': None,
+    'circuit_breakers': {},
     'current_error': None
 }
 watchdog_thread = None
@@ -1907,6 +3595,7 @@ monitoring_lock = threading.Lock()
 def update_monitor_health(status, error=None):
     """Update monitoring health status"""
     with monitoring_lock:
+        changed = monitor_health['status'] != status or error is not None
         monitor_health['status'] = status
         monitor_health['last_update'] = datetime.now().isoformat()
         if error:
@@ -1915,9 +3604,15 @@ def update_monitor_health(status, error=None):
         else:
             monitor_health['current_error'] = None
         
-        # Emit status update to web clients
-        socketio.emit('monitor_health', monitor_health)
-        logger.info(f"Monitor health updated: {status} (errors: {monitor_health['error_count']})")
+        # Emit status update to web clients, the latest once per coalescing interval
+        if topic_hub.watched('health'):
+            topic_hub.submit('health', dict(monitor_health), send_monitor_health)
+        # Every published sample refreshes the health, only log when it actually changes
+        log = logger.info if changed else logger.debug
+        log(f"Monitor health updated: {status} (errors: {monitor_health['error_count']})")
+
+def send_monitor_health(health):
+    socketio.emit('monitor_health', health, to='health')
 
 def start_monitoring():
     """Start monitoring in background thread with health tracking"""
@@ -1947,6 +3642,54 @@ def start_monitoring():
         monitor_health['restart_count'] += 1
         logger.info(f"Monitor thread started (restart count: {monitor_health['restart_count']})")
 
+def start_modbus_source():
+    """Start Modbus/TCP sampling of the primary inverter in its own thread, independent of the browsers"""
+    global modbus_source
+    config = alert_config.get('eg4_modbus', {})
+    # Created up front so the monitor loop leaves the EG4 browser down while the first sample is read
+    modbus_source = ModbusInverterSource(config['host'], config.get('port', 502), config.get('unit_id', 1),
+                                         config.get('timeout', 2))
+    
+    def run():
+        try:
+            asyncio.run(modbus_loop(modbus_source))
+        except Exception as e:
+            logger.error(f"EG4 Modbus/TCP source stopped: {e}")
+    
+    threading.Thread(target=run, name="ModbusThread", daemon=True).start()
+
+def housekeeping_loop():
+    """Roll up, pack and trim stored samples and write warm-start snapshots on a timer of its own
+    
+    Independent of the browser monitor loop, so Modbus-only and ingest-only
+    setups, and a monitor loop stuck retrying its logins, still keep the raw
+    tables bounded and the snapshot current.
+    """
+    last_rollup_time = time.monotonic()
+    last_snapshot_time = time.monotonic()
+    while True:
+        time.sleep(HOUSEKEEPING_INTERVAL)
+        try:
+            if (data_storage and (data_storage.tiered or data_storage.compact) and time.monotonic() - last_rollup_time
+                    >= alert_config.get('storage_tiers', {}).get('rollup_interval', 300)):
+                last_rollup_time = time.monotonic()
+                data_storage.maintain_tiers()
+        except Exception as e:
+            logger.error(f"Storage housekeeping failed: {e}")
+        
+        # Snapshot live state for the next start
+        if time.monotonic() - last_snapshot_time >= alert_config.get('warm_start', {}).get('interval', 60):
+            last_snapshot_time = time.monotonic()
+            try:
+                save_warm_start()
+            except Exception as e:
+                logger.warning(f"Failed to write warm-start snapshot: {e}")
+
+def start_housekeeping():
+    """Start the housekeeping thread"""
+    threading.Thread(target=housekeeping_loop, name="HousekeepingThread", daemon=True).start()
+    logger.info("Housekeeping thread started")
+
 def watchdog_loop():
     """Watchdog that monitors the health of the monitoring thread and restarts it if needed"""
     logger.info("Watchdog thread started")
@@ -2062,8 +3805,81 @@ def get_status():
     # Add monitor health information
     status['monitor_health'] = monitor_health.copy()
     
+    # Add startup phase timings
+    status['startup'] = copy.deepcopy(startup_timings)
+    
+    # Add per-source resource policy statistics
+    status['resource_policy'] = {
+        name: monitor.resource_policy.summary()
+        for name, monitor in (('eg4', eg4_monitor), ('srp', srp_monitor), ('enphase', enphase_monitor))
+        if monitor
+    }
+    
+    # Add per-source browser memory usage
+    status['browser_memory'] = browser_memory.summary()
+    
+    # Add per-source circuit breaker state
+    status['circuit_breakers'] = circuit_breaker_states()
+    
+    # Add per-inverter state of the additional EG4 targets
+    if eg4_fleet:
+        status['eg4_fleet'] = eg4_fleet.state()
+    
+    # Add readiness wait timings against the fixed sleeps they replaced
+    status['readiness_waits'] = readiness_waits.summary()
+    
+    # Add hot-standby browser state
+    if hot_standbys:
+        status['hot_standby'] = {source: standby.state() for source, standby in hot_standbys.items()}
+    
+    # Add adaptive polling scheduler state
+    if poll_scheduler:
+        status['scheduler'] = poll_scheduler.state()
+    
+    # Live update volume per client, as full payloads (before) and deltas (after)
+    status['live_updates'] = live_state.stats(len(topic_hub.clients))
+    status['live_updates']['topics'] = topic_hub.state()
+    
+    # What the warm-start snapshot restored at boot
+    status['warm_start'] = dict(warm_start_status, last_srp_update_date=(
+        last_srp_update_date.isoformat() if last_srp_update_date else None))
+    
+    # Add per-chart timings of the last SRP CSV export
+    if srp_monitor and srp_monitor.last_csv_report:
+        status['srp_csv_export'] = srp_monitor.last_csv_report
+    
+    # Add EG4 HTTP collector statistics when enabled
+    if eg4_monitor and eg4_monitor.http_client:
+        status['eg4_collector'] = dict(eg4_monitor.http_client.stats, ready=eg4_monitor.http_client.ready)
+    
+    # Modbus/TCP source statistics when enabled
+    if modbus_source:
+        status['eg4_modbus'] = dict(modbus_source.stats, covering=modbus_covers_eg4())
+    
+    # In-page refreshes of the EG4 monitor page against full reloads
+    if eg4_monitor:
+        status['eg4_page_refresh'] = dict(eg4_monitor.refresh_stats,
+                                          mode=alert_config.get('eg4_collector', {}).get('page_refresh', 'fetch'),
+                                          serial_known=bool(eg4_monitor.serial_number))
+    
     return jsonify(status)
 
+@app.route('/api/browser-memory')
+def get_browser_memory():
+    """Get per-source browser RSS timelines"""
+    return jsonify({
+        'summary': browser_memory.summary(),
+        'timelines': browser_memory.timelines()
+    })
+
+@app.route('/api/scrape-timings')
+def get_scrape_timings():
+    """Get rolling per-phase scrape timing percentiles, optionally for one source"""
+    return jsonify({
+        'window': scrape_timings.window,
+        'sources': scrape_timings.summary(request.args.get('source'))
+    })
+
 @app.route('/api/database/stats')
 def get_database_stats():
     """Get database statistics"""
@@ -2085,12 +3901,91 @@ def get_historical_eg4():
     
     try:
         hours = int(request.args.get('hours', 24))
-        data = data_storage.get_historical_eg4_data(hours=hours)
+        # The primary inverter unless a device is named, every inverter with device=all
+        device = request.args.get('device')
+        data = data_storage.get_historical_eg4_data(hours=hours, device=ALL_EG4_DEVICES if device == 'all' else device)
         return jsonify(data)
     except Exception as e:
         logger.error(f"Error getting historical EG4 data: {e}")
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/history/recent')
+def get_recent_history():
+    """Recent EG4 samples per device from memory, kept across restarts, optionally for one device"""
+    return jsonify({
+        'fields': ['timestamp'] + list(HISTORY_FIELDS),
+        'devices': recent_history.rows(request.args.get('device'))
+    })
+
+@app.route('/api/eg4/devices')
+def get_eg4_devices():
+    """Get the latest sample and collection state of every EG4 inverter, keyed by device"""
+    devices = {
+        device: {'data': data, 'status': None}
+        for device, data in monitor_data['eg4_devices'].items()
+    }
+    if eg4_fleet:
+        for device, status in eg4_fleet.device_status.items():
+            devices.setdefault(device, {'data': None})['status'] = status
+    if data_storage:
+        for stored in data_storage.get_eg4_devices():
+            devices.setdefault(stored['device'], {'data': None, 'status': None})['stored'] = {
+                'samples': stored['samples'],
+                'latest': stored['latest']
+            }
+    return jsonify({'primary': primary_eg4_device(), 'devices': devices})
+
+@app.route('/api/ingest', methods=['POST'])
+def ingest_eg4_samples():
+    """Store a batch of timestamped EG4 samples pushed by an external collector
+    
+    The body is JSON lines (application/x-ndjson, one sample per line) or a
+    columnar application/json body. Samples carry their own device, or take it
+    from the body or the device query parameter. An Idempotency-Key header makes
+    retries of the same batch safe. Set INGEST_TOKEN to require a bearer token.
+    """
+    token = os.getenv('INGEST_TOKEN')
+    if token and request.headers.get('Authorization', '') != f'Bearer {token}':
+        return jsonify({'error': 'invalid or missing ingest token'}), 401
+    if not data_storage:
+        return jsonify({'error': 'storage not available'}), 503
+    
+    config = alert_config.get('ingest', {})
+    if (request.content_length or 0) > config.get('max_body_mb', 32) * 1024 * 1024:
+        return jsonify({'error': 'request body too large'}), 413
+    
+    # A retried batch is answered from its key before the body is parsed again
+    idempotency_key = request.headers.get('Idempotency-Key') or request.args.get('idempotency_key')
+    if idempotency_key:
+        previous = data_storage.get_ingest_batch(idempotency_key)
+        if previous:
+            return jsonify({'accepted': previous['samples'], 'duplicate': True,
+                            'received_at': previous['received_at'], 'idempotency_key': idempotency_key})
+    
+    try:
+        with scrape_timings.span('ingest', 'parse'):
+            rows, errors, sample_count = parse_batch(request.get_data(as_text=True), request.content_type,
+                                                     request.args.get('device'), is_valid_eg4_data)
+    except IngestError as e:
+        return jsonify({'error': str(e)}), 400
+    if sample_count > config.get('max_samples', 50000):
+        return jsonify({'error': f"batch of {sample_count} samples exceeds max_samples"}), 413
+    if not rows:
+        return jsonify({'accepted': 0, 'rejected': len(errors), 'errors': errors[:100]}), 422
+    
+    with scrape_timings.span('ingest', 'store'):
+        result = data_storage.store_eg4_batch(rows, idempotency_key)
+    if result is None:
+        return jsonify({'error': 'failed to store samples'}), 500
+    if not result['duplicate']:
+        logger.info(f"Ingested {len(rows)} EG4 samples for {len({device for _, device, _ in rows})} devices"
+                    + (f", rejected {len(errors)}" if errors else ''))
+        publish_ingested_samples(rows)
+    
+    return jsonify({'accepted': result['samples'], 'rejected': len(errors), 'errors': errors[:100],
+                    'duplicate': result['duplicate'], 'received_at': result['received_at'],
+                    'idempotency_key': idempotency_key})
+
 @app.route('/api/config', methods=['GET', 'POST'])
 def config():
     global alert_config
@@ -2115,6 +4010,39 @@ def config():
         if 'timezone' in data:
             alert_config['timezone'] = data['timezone']
         
+        # Update EG4 collector settings (mode changes apply on the next monitor restart)
+        if 'eg4_collector' in data:
+            alert_config.setdefault('eg4_collector', {}).update(data['eg4_collector'])
+        
+        # Update per-source resource policies (applied when each browser next starts)
+        if 'resource_policy' in data:
+            for source, policy in data['resource_policy'].items():
+                alert_config.setdefault('resource_policy', {}).setdefault(source, {}).update(policy)
+        
+        # Update additional EG4 inverter targets (applied when the monitor loop next starts)
+        if 'eg4_fleet' in data:
+            alert_config.setdefault('eg4_fleet', {}).update(data['eg4_fleet'])
+        
+        # Update Modbus/TCP source settings (applied on the next start)
+        if 'eg4_modbus' in data:
+            alert_config.setdefault('eg4_modbus', {}).update(data['eg4_modbus'])
+        
+        # Update portal base URLs (used by monitors created after the change)
+        if 'portal_urls' in data:
+            alert_config.setdefault('portal_urls', {}).update(data['portal_urls'])
+        
+        # Update circuit breaker settings (used when each source's breaker is first created)
+        if 'circuit_breaker' in data:
+            alert_config.setdefault('circuit_breaker', {}).update(data['circuit_breaker'])
+        
+        # Update hot-standby settings (applied when the monitor loop next starts)
+        if 'hot_standby' in data:
+            alert_config.setdefault('hot_standby', {}).update(data['hot_standby'])
+        
+        # Update browser memory budgets (checked between scrapes)
+        if 'browser_memory' in data:
+            alert_config.setdefault('browser_memory', {}).update(data['browser_memory'])
+        
         # Update credentials
         if 'credentials' in data:
             alert_config['credentials'].update(data['credentials'])
@@ -2368,6 +4296,77 @@ def clear_logs():
         logger.error(f"Failed to clear logs: {e}")
         return jsonify({'error': str(e)}), 500
 
+# Parsed rows of the most recently read export per chart type
+srp_chart_cache = {}
+
+# Series in each chart type's response, besides the date labels
+SRP_CHART_SERIES = {
+    'net': ('offPeak', 'onPeak', 'highTemp', 'lowTemp'),
+    'usage': ('offPeak', 'onPeak', 'highTemp', 'lowTemp'),
+    'generation': ('generation', 'consumption', 'highTemp', 'lowTemp'),
+    'demand': ('demand', 'peakTime', 'highTemp', 'lowTemp')
+}
+
+def csv_float(row, column):
+    """Float value of a CSV cell, 0 when missing or not numeric"""
+    value = (row.get(column) or '0').replace('"', '')
+    try:
+        return float(value) if value else 0
+    except ValueError:
+        return 0
+
+def parse_srp_chart_row(chart_type, row):
+    """One chart point from an SRP export row, None for rows without a date"""
+    date_str = row.get('Usage date') or row.get('Date') or row.get('Meter read date', '')
+    if not date_str:
+        return None
+    
+    # Try different date formats
+    label = date_str
+    for fmt in ['%m/%d/%Y', '%Y-%m-%d', '%m/%d/%y']:
+        try:
+            label = datetime.strptime(date_str, fmt).strftime('%b %d')
+            break
+        except ValueError:
+            continue
+    
+    point = {
+        'label': label,
+        'highTemp': csv_float(row, 'High temperature (F)'),
+        'lowTemp': csv_float(row, 'Low temperature (F)')
+    }
+    if chart_type in ['net', 'usage']:
+        # Net energy and Usage have off-peak/on-peak structure
+        point['offPeak'] = csv_float(row, 'Off-peak kWh')
+        point['onPeak'] = csv_float(row, 'On-peak kWh')
+    elif chart_type == 'generation':
+        # Generation CSV has the same off-peak/on-peak columns, shown as total solar generation
+        point['generation'] = csv_float(row, 'Off-peak kWh') + csv_float(row, 'On-peak kWh')
+        point['consumption'] = 0  # Generation chart doesn't show consumption
+    elif chart_type == 'demand':
+        # Demand CSV has On-peak kW column for peak demand
+        point['demand'] = csv_float(row, 'On-peak kW')
+        point['peakTime'] = ''  # Time not available in this CSV format
+    return point
+
+def build_srp_chart_data(chart_type, points):
+    """Chart response for a chart type from its parsed points"""
+    data = {
+        'labels': [],
+        'datasets': [],
+        'chartType': chart_type
+    }
+    series = SRP_CHART_SERIES[chart_type]
+    for name in series:
+        data[name] = []
+    for point in points:
+        if point is None:
+            continue
+        data['labels'].append(point['label'])
+        for name in series:
+            data[name].append(point[name])
+    return data
+
 @app.route('/api/srp-chart-data')
 def get_srp_chart_data():
     """Get SRP CSV data for charting"""
@@ -2380,7 +4379,7 @@ def get_srp_chart_data():
             return jsonify({'error': 'Invalid chart type'}), 400
         
         # Look for the most recent CSV file in downloads directory
-        downloads_dir = os.path.join(os.path.dirname(__file__), 'downloads')
+        downloads_dir = DOWNLOADS_DIR
         if not os.path.exists(downloads_dir):
             os.makedirs(downloads_dir, exist_ok=True)
         
@@ -2436,127 +4435,32 @@ def get_srp_chart_data():
             # Sort by timestamp and get the newest
             valid_files.sort(key=lambda x: x[0], reverse=True)
             latest_csv = valid_files[0][1]
-        logger.info(f"Reading SRP {chart_type} CSV data from: {latest_csv}")
         
-        # Read CSV data - structure depends on chart type
-        data = {
-            'labels': [],
-            'datasets': [],
-            'chartType': chart_type
-        }
+        # Unchanged exports are discarded on download, so the same file means the same data
+        export_file = os.path.basename(latest_csv)
+        cached = srp_chart_cache.get(chart_type)
+        if cached and cached['file'] == export_file:
+            return jsonify(build_srp_chart_data(chart_type, cached['points']))
+        logger.info(f"Reading SRP {chart_type} CSV data from: {latest_csv}")
         
         with open(latest_csv, 'r', encoding='utf-8-sig') as f:
             reader = csv.DictReader(f)
-            headers = reader.fieldnames
-            logger.info(f"CSV headers for {chart_type}: {headers}")
-            
-            # Initialize data arrays based on chart type
-            if chart_type in ['net', 'usage']:
-                # Net energy and Usage have off-peak/on-peak structure
-                data['offPeak'] = []
-                data['onPeak'] = []
-                data['highTemp'] = []
-                data['lowTemp'] = []
-            elif chart_type == 'generation':
-                # Generation shows total solar generation
-                data['generation'] = []
-                data['consumption'] = []
-                data['highTemp'] = []
-                data['lowTemp'] = []
-            elif chart_type == 'demand':
-                # Demand shows peak demand values
-                data['demand'] = []
-                data['peakTime'] = []
-                data['highTemp'] = []
-                data['lowTemp'] = []
-            
-            for row in reader:
-                # Skip the combined total row
-                if any('Combined total' in str(val) for val in row.values()):
-                    continue
-                
-                # Get date - try different date column names
-                date_str = row.get('Usage date') or row.get('Date') or row.get('Meter read date', '')
-                if date_str:
-                    # Parse and format date
-                    try:
-                        # Try different date formats
-                        for fmt in ['%m/%d/%Y', '%Y-%m-%d', '%m/%d/%y']:
-                            try:
-                                date_obj = datetime.strptime(date_str, fmt)
-                                data['labels'].append(date_obj.strftime('%b %d'))
-                                break
-                            except:
-                                continue
-                        else:
-                            data['labels'].append(date_str)
-                    except:
-                        data['labels'].append(date_str)
-                    
-                    # Parse data based on chart type
-                    if chart_type in ['net', 'usage']:
-                        # Get energy values (remove quotes and convert to float)
-                        off_peak = row.get('Off-peak kWh', '0').replace('"', '')
-                        on_peak = row.get('On-peak kWh', '0').replace('"', '')
-                        
-                        try:
-                            data['offPeak'].append(float(off_peak))
-                            data['onPeak'].append(float(on_peak))
-                        except ValueError:
-                            data['offPeak'].append(0)
-                            data['onPeak'].append(0)
-                        
-                        # Get temperature values if available
-                        try:
-                            data['highTemp'].append(float(row.get('High temperature (F)', '0')))
-                            data['lowTemp'].append(float(row.get('Low temperature (F)', '0')))
-                        except ValueError:
-                            data['highTemp'].append(0)
-                            data['lowTemp'].append(0)
-                    
-                    elif chart_type == 'generation':
-                        # Generation CSV has same structure as net/usage: Off-peak kWh, On-peak kWh
-                        # For solar generation, we typically want to show total generation (off+on peak)
-                        off_peak = row.get('Off-peak kWh', '0').replace('"', '')
-                        on_peak = row.get('On-peak kWh', '0').replace('"', '')
-                        
-                        try:
-                            off_val = float(off_peak) if off_peak else 0
-                            on_val = float(on_peak) if on_peak else 0
-                            total_gen = off_val + on_val
-                            
-                            data['generation'].append(total_gen)
-                            data['consumption'].append(0)  # Generation chart doesn't show consumption
-                        except ValueError:
-                            data['generation'].append(0)
-                            data['consumption'].append(0)
-                        
-                        # Get temperature values
-                        try:
-                            data['highTemp'].append(float(row.get('High temperature (F)', '0')))
-                            data['lowTemp'].append(float(row.get('Low temperature (F)', '0')))
-                        except ValueError:
-                            data['highTemp'].append(0)
-                            data['lowTemp'].append(0)
-                    
-                    elif chart_type == 'demand':
-                        # Demand CSV has On-peak kW column for peak demand
-                        demand_val = row.get('On-peak kW', '0').replace('"', '')
-                        
-                        try:
-                            data['demand'].append(float(demand_val) if demand_val else 0)
-                            data['peakTime'].append('')  # Time not available in this CSV format
-                        except ValueError:
-                            data['demand'].append(0)
-                            data['peakTime'].append('')
-                        
-                        # Get temperature values
-                        try:
-                            data['highTemp'].append(float(row.get('High temperature (F)', '0')))
-                            data['lowTemp'].append(float(row.get('Low temperature (F)', '0')))
-                        except ValueError:
-                            data['highTemp'].append(0)
-                            data['lowTemp'].append(0)
+            logger.debug(f"CSV headers for {chart_type}: {reader.fieldnames}")
+            # Skip the combined total row
+            rows = [row for row in reader if not any('Combined total' in str(val) for val in row.values())]
+        
+        # When the export only added days to the one already parsed, parse just the new rows
+        export = SRPExportStore(downloads_dir).manifest.get(chart_type) or {}
+        if (cached and export.get('file') == export_file and export.get('status') == APPENDED
+                and export.get('previous_file') == cached['file']):
+            new_count = max(0, len(rows) - (len(cached['points']) - export.get('dropped_rows', 0)))
+            points = cached['points'][export.get('dropped_rows', 0):]
+            points += [parse_srp_chart_row(chart_type, row) for row in rows[len(rows) - new_count:]]
+            logger.debug(f"Parsed {new_count} new SRP {chart_type} rows")
+        else:
+            points = [parse_srp_chart_row(chart_type, row) for row in rows]
+        srp_chart_cache[chart_type] = {'file': export_file, 'points': points}
+        data = build_srp_chart_data(chart_type, points)
         
         return jsonify(data)
         
@@ -2565,21 +4469,129 @@ def get_srp_chart_data():
         return jsonify({'error': str(e)}), 500
 
 @socketio.on('connect')
-def handle_connect():
+def handle_connect(auth=None):
+    auth = auth if isinstance(auth, dict) else {}
+    start_topic_flusher()
     emit('connected', {'data': 'Connected to EG4-SRP Monitor'})
+    # Join the topics the client asked for, rooms are rejoined on every reconnect
+    topics = auth.get('topics')
+    if not isinstance(topics, list):
+        topics = alert_config.get('live_updates', {}).get('default_topics', [])
+    join_topics(topics)
     # Send current data
-    if monitor_data['eg4']:
-        emit('eg4_update', monitor_data['eg4'])
-    if monitor_data['srp']:
-        emit('srp_update', monitor_data['srp'])
+    if alert_config.get('live_updates', {}).get('enabled', True):
+        send_live_state(auth)
+        return
+    watching = topic_hub.rooms_of(request.sid)
+    for topic, event in LIVE_TOPIC_EVENTS.items():
+        if monitor_data[topic] and topic in watching:
+            emit(event, strip_debug(monitor_data[topic]))
+    devices = {device: data for device, data in monitor_data['eg4_devices'].items()
+               if watching & set(topic_rooms(f'{DEVICE_ROOM_PREFIX}{device}'))}
+    if devices:
+        emit('eg4_devices_update', strip_debug(devices))
+
+@socketio.on('disconnect')
+def handle_disconnect():
+    topic_hub.drop(request.sid)
+
+@socketio.on('subscribe')
+def handle_subscribe(data):
+    """Join topics, e.g. {'topics': ['logs', 'device:garage']}, and get their current state"""
+    joined = join_topics((data or {}).get('topics', []) if isinstance(data, dict) else [])
+    if joined and alert_config.get('live_updates', {}).get('enabled', True):
+        emit('state_snapshot', live_state.snapshot(
+            lambda topic: bool(set(topic_rooms(topic)) & set(joined)) and not is_watching(topic, exclude=joined)))
+
+@socketio.on('unsubscribe')
+def handle_unsubscribe(data):
+    topics = (data or {}).get('topics', []) if isinstance(data, dict) else []
+    for room in topic_hub.unsubscribe(request.sid, topics):
+        leave_room(room)
+
+@socketio.on('resume')
+def handle_resume(data):
+    """A client that missed deltas asks for everything after the last sequence it applied"""
+    send_live_state(data if isinstance(data, dict) else {})
+
+def join_topics(topics):
+    """Put the current client in the rooms of the given topics, returning those newly joined"""
+    joined = topic_hub.subscribe(request.sid, [topic for topic in topics if is_topic_room(topic)])
+    for room in joined:
+        join_room(room)
+    return joined
+
+def is_watching(topic, exclude=()):
+    """Whether the current client receives a topic through a room other than those excluded"""
+    return bool(set(topic_rooms(topic)) & (topic_hub.rooms_of(request.sid) - set(exclude)))
+
+def send_live_state(resume):
+    """Send a client the deltas of its topics after the epoch and seq it last applied, or a snapshot
+    
+    A snapshot is sent to new clients, when the deltas are no longer kept and
+    after a server restart.
+    """
+    # Restored or freshly collected data that has not been broadcast yet
+    for topic in LIVE_TOPIC_EVENTS:
+        if monitor_data.get(topic) and topic not in live_state.topics:
+            live_state.update(topic, monitor_data[topic])
+    for device, data in list(monitor_data['eg4_devices'].items()):
+        topic = f'{DEVICE_ROOM_PREFIX}{device}'
+        if device != primary_eg4_device() and data and topic not in live_state.topics:
+            live_state.update(topic, data)
+    seq = resume.get('seq')
+    missed = live_state.since(seq, resume.get('epoch'), is_watching) if isinstance(seq, int) else None
+    if missed is None:
+        emit('state_snapshot', live_state.snapshot(is_watching))
+        return
+    for message in missed:
+        emit('state_delta', message)
+
+def start_background_services(port):
+    """Start monitoring once the web server accepts connections, so the UI comes up first"""
+    def run():
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            try:
+                with socket.create_connection(('127.0.0.1', port), timeout=0.5):
+                    break
+            except OSError:
+                time.sleep(0.02)
+        mark_startup('server_ready')
+        logger.info(f"Web server ready {startup_timings['server_ready']}s after start")
+        
+        # Storage maintenance and snapshots run whichever sources collect
+        if ((data_storage and (data_storage.tiered or data_storage.compact)) or
+                alert_config.get('warm_start', {}).get('enabled', True)):
+            start_housekeeping()
+        
+        # The LAN source needs no portal credentials
+        modbus_config = alert_config.get('eg4_modbus', {})
+        if modbus_config.get('enabled') and modbus_config.get('host'):
+            start_modbus_source()
+        
+        # Start monitoring if credentials exist
+        if os.getenv('EG4_USERNAME') and os.getenv('EG4_PASSWORD'):
+            logger.info("Credentials found, starting monitoring thread")
+            start_monitoring()
+            start_watchdog()
+        else:
+            logger.warning("No EG4 credentials found in environment")
+    
+    threading.Thread(target=run, name="StartupThread", daemon=True).start()
+
+mark_startup('module_loaded')
 
 if __name__ == '__main__':
+    setup_logging()
     logger.info("=== EG4-SRP Monitor Starting ===")
     logger.info(f"Log file: {LOG_FILE}")
     logger.info(f"Max log size: {LOG_MAX_SIZE / 1024 / 1024}MB with {LOG_BACKUP_COUNT} rotations")
     
     # Load saved configuration
     load_config()
+    live_state.set_history(alert_config.get('live_updates', {}).get('history', 500))
+    topic_hub.interval = alert_config.get('live_updates', {}).get('coalesce_interval', 1.0)
     
     # Set timezone from configuration
     if alert_config.get('timezone'):
@@ -2590,21 +4602,22 @@ if __name__ == '__main__':
         except Exception as e:
             logger.warning(f"Failed to set timezone: {e}")
     
-    # Start monitoring on startup if credentials exist
-    if os.getenv('EG4_USERNAME') and os.getenv('EG4_PASSWORD'):
-        logger.info("Credentials found, starting monitoring thread")
-        start_monitoring()
-        start_watchdog()
-    else:
-        logger.warning("No EG4 credentials found in environment")
+    signal.signal(signal.SIGTERM, handle_shutdown_signal)
+    
+    # Open the database and restore the last readings so the UI has data from its first request
+    init_data_storage()
+    restore_data_on_startup()
+    
+    # Browsers launch in the background once the server is accepting connections
+    start_background_services(PORT)
     
     # Check if we're in development mode
     debug_mode = os.getenv('FLASK_ENV') == 'development'
     if debug_mode:
-        logger.info("Starting Flask application in DEVELOPMENT mode on port 5002 (auto-reload enabled)")
+        logger.info(f"Starting Flask application in DEVELOPMENT mode on port {PORT} (auto-reload enabled)")
     else:
-        logger.info("Starting Flask application in PRODUCTION mode on port 5002")
+        logger.info(f"Starting Flask application in PRODUCTION mode on port {PORT}")
     
     # Run with allow_unsafe_werkzeug=True to suppress production warnings
     # For a monitoring tool like this, Werkzeug is acceptable
-    socketio.run(app, host='0.0.0.0', port=5002, debug=debug_mode, allow_unsafe_werkzeug=True)
\ No newline at end of file
+    socketio.run(app, host='0.0.0.0', port=PORT, debug=debug_mode, allow_unsafe_werkzeug=True)
\ No newline at end of file
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Scraper Benchmark for EG4-SRP Monitor
+Runs the EG4, SRP and Enphase scrapers against local fixture servers and reports
+per-phase latency (login, navigate, wait, extract) with browser CPU and RSS per scrape
+
+Usage:
+    python benchmark_scrapers.py --iterations 5
+    python benchmark_scrapers.py --sources eg4 --eg4-mode http --latency-ms 80 --jitter-ms 40
+    python benchmark_scrapers.py --failure-rate 0.1 --seed 1 --json results.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+FIXTURES_DIR = os.path.join(REPO_DIR, 'fixtures', 'portals')
+SOURCES = ('eg4', 'srp', 'enphase')
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile, None for an empty list"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(fraction * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def summarize(samples):
+    """Aggregate per-scrape samples into latency, phase, CPU and RSS figures"""
+    walls = [sample['seconds'] for sample in samples]
+    phases = {}
+    for sample in samples:
+        for name, seconds in sample['phases'].items():
+            phases.setdefault(name, []).append(seconds)
+    cpu = [sample['browser_cpu_seconds'] for sample in samples]
+    rss = [sample['rss_mb'] for sample in samples if sample['rss_mb'] is not None]
+    return {
+        'scrapes': len(samples),
+        'valid': sum(1 for sample in samples if sample['valid']),
+        'seconds': {'p50': percentile(walls, 0.5), 'p95': percentile(walls, 0.95), 'max': max(walls, default=None)},
+        'phases': {
+            name: {'p50': percentile(values, 0.5), 'p95': percentile(values, 0.95)}
+            for name, values in phases.items()
+        },
+        'browser_cpu_seconds_mean': round(sum(cpu) / len(cpu), 3) if cpu else None,
+        'python_cpu_seconds_mean': round(sum(s['python_cpu_seconds'] for s in samples) / len(samples), 3) if samples else None,
+        'rss_mb_last': rss[-1] if rss else None,
+        'rss_mb_peak': max(rss, default=None)
+    }
+
+
+async def measure(app, monitor, scrape, validate):
+    """Run one scrape, recording wall time, phases, CPU and RSS of the monitor's browser tree"""
+    browser_cpu_before = app.browser_memory.tree_cpu_seconds(monitor.memory_key)
+    python_cpu_before = time.process_time()
+    started = time.perf_counter()
+    result = await scrape()
+    seconds = time.perf_counter() - started
+    return {
+        'seconds': round(seconds, 3),
+        'phases': monitor.phases.last_scrape(),
+        'valid': bool(result) and validate(result),
+        'browser_cpu_seconds': round(app.browser_memory.tree_cpu_seconds(monitor.memory_key) - browser_cpu_before, 3),
+        'python_cpu_seconds': round(time.process_time() - python_cpu_before, 3),
+        'rss_mb': app.browser_memory.sample(monitor.memory_key)
+    }
+
+
+async def benchmark_source(app, source, iterations):
+    """Benchmark one source's scrapes, returning {scrape name: samples}"""
+    results = {}
+    if source == 'eg4':
+        monitor = app.EG4Monitor()
+        scrapes = {'eg4': (monitor.get_data, app.is_valid_eg4_data)}
+    elif source == 'srp':
+        monitor = app.SRPMonitor()
+        scrapes = {
+            'srp_peak_demand': (monitor.get_peak_demand, app.is_valid_srp_data),
+            'srp_csv': (monitor.download_csv_data, lambda files: len(files) == 4)
+        }
+    else:
+        monitor = app.EnphaseMonitor()
+        scrapes = {'enphase': (monitor.get_data, app.is_valid_enphase_data)}
+
+    await monitor.start()
+    try:
+        # EG4 logs in inside get_data, SRP and Enphase are logged in by the monitor loop
+        if source in ('srp', 'enphase'):
+            results[f'{source}_login'] = [await measure(app, monitor, monitor.login, bool)]
+        for name, (scrape, validate) in scrapes.items():
+            results[name] = []
+            for _ in range(iterations):
+                results[name].append(await measure(app, monitor, scrape, validate))
+    finally:
+        await monitor.close()
+    return results
+
+
+def print_report(report):
+    print()
+    print(f"{'scrape':<18}{'ok':>7}{'p50 s':>9}{'p95 s':>9}{'cpu s':>8}{'rss MB':>9}  phases p50/p95 (s)")
+    for name, summary in report['scrapes'].items():
+        phases = ', '.join(
+            f"{phase} {values['p50']:.2f}/{values['p95']:.2f}" for phase, values in summary['phases'].items()
+        )
+        print(f"{name:<18}{summary['valid']:>3}/{summary['scrapes']:<3}"
+              f"{summary['seconds']['p50'] or 0:>9.2f}{summary['seconds']['p95'] or 0:>9.2f}"
+              f"{summary['browser_cpu_seconds_mean'] or 0:>8.2f}{summary['rss_mb_last'] or 0:>9.1f}  {phases}")
+    for name, wait in report['readiness_waits'].items():
+        print(f"wait {name}: {wait['ready']}/{wait['waits']} ready, avg {wait['average_seconds']:.2f}s "
+              f"of {wait['ceiling']:.0f}s ceiling, {wait['seconds_saved']:.1f}s saved")
+    for source, stats in report['fixture_servers'].items():
+        unmatched = f", unmatched: {', '.join(stats['unmatched'])}" if stats['unmatched'] else ''
+        print(f"{source} fixture server: {stats['requests']} requests, "
+              f"{stats['failures_injected']} injected failures{unmatched}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the portal scrapers against local fixture servers')
+    parser.add_argument('--sources', default=','.join(SOURCES), help='Comma-separated sources to benchmark')
+    parser.add_argument('--iterations', type=int, default=5, help='Scrapes per source')
+    parser.add_argument('--fixtures', default=FIXTURES_DIR, help='Directory with one fixture directory per source')
+    parser.add_argument('--eg4-mode', choices=['browser', 'http'], default='browser', help='EG4 collector mode')
+    parser.add_argument('--no-resource-policy', action='store_true', help='Let browsers load every resource')
+    parser.add_argument('--latency-ms', type=float, default=0, help='Delay added to every fixture response')
+    parser.add_argument('--jitter-ms', type=float, default=0, help='Random extra delay up to this many ms')
+    parser.add_argument('--failure-rate', type=float, default=0.0, help='Fraction of fixture requests that fail')
+    parser.add_argument('--failure-mode', choices=['status', 'drop'], default='status')
+    parser.add_argument('--seed', type=int, help='Random seed for reproducible failure injection')
+    parser.add_argument('--json', help='Write the full report to this file')
+    args = parser.parse_args()
+
+    sources = [source.strip() for source in args.sources.split(',') if source.strip()]
+    unknown = set(sources) - set(SOURCES)
+    if unknown:
+        parser.error(f"unknown sources: {', '.join(sorted(unknown))}")
+
+    # Run from a scratch directory so sessions, the database and downloads stay out of the real ones
+    json_path = os.path.abspath(args.json) if args.json else None
+    fixtures_dir = os.path.abspath(args.fixtures)
+    workdir = tempfile.mkdtemp(prefix='eg4_srp_benchmark_')
+    os.makedirs(os.path.join(workdir, 'logs'))
+    os.chdir(workdir)
+    sys.path.insert(0, REPO_DIR)
+
+    from fixture_server import FixtureServer
+    import app
+
+    servers = {
+        source: FixtureServer(os.path.join(fixtures_dir, source), latency_ms=args.latency_ms,
+                              jitter_ms=args.jitter_ms, failure_rate=args.failure_rate,
+                              failure_mode=args.failure_mode, seed=args.seed).start()
+        for source in sources
+    }
+    app.DOWNLOADS_DIR = os.path.join(workdir, 'downloads')
+    app.alert_config['portal_urls'].update({source: server.base_url for source, server in servers.items()})
+    app.alert_config['srp_session']['probe_url'] = None
+    app.alert_config['eg4_collector'].update({'mode': args.eg4_mode, 'serial_number': ''})
+    for source in SOURCES:
+        app.alert_config['credentials'][f'{source}_username'] = 'fixture'
+        app.alert_config['credentials'][f'{source}_password'] = 'fixture'
+        app.alert_config['resource_policy'][source]['enabled'] = not args.no_resource_policy
+
+    errors = {}
+
+    async def run():
+        samples = {}
+        for source in sources:
+            try:
+                samples.update(await benchmark_source(app, source, args.iterations))
+            except Exception as e:
+                errors[source] = str(e)
+                print(f"{source} benchmark failed: {e}", file=sys.stderr)
+        return samples
+
+    try:
+        samples = asyncio.run(run())
+    finally:
+        for server in servers.values():
+            server.stop()
+        os.chdir(REPO_DIR)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        'settings': vars(args),
+        'scrapes': {name: summarize(items) for name, items in samples.items()},
+        'samples': samples,
+        'errors': errors,
+        'fixture_servers': {source: server.stats for source, server in servers.items()},
+        'readiness_waits': app.readiness_waits.summary()
+    }
+    print_report(report)
+    if json_path:
+        with open(json_path, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {json_path}")
+
+
+if __name__ == '__main__':
+    main()
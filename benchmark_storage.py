@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Storage Benchmark for EG4-SRP Monitor
+Writes the same synthetic EG4 history to the eg4_data table (with and without
+each sample's JSON document) and to the compact series store, then reports
+bytes per sample and history query latency for each layout. Also replays
+samples through change detection, synthetic ones or those of an existing
+database, and reports how many row writes it saves
+
+Usage:
+    python benchmark_storage.py --hours 24
+    python benchmark_storage.py --hours 48 --interval 1 --queries 1,24 --json results.json
+    python benchmark_storage.py --replay-db data/monitor.db --hours 72 --night-only
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, REPO_DIR)
+
+from data_storage import ALL_EG4_DEVICES, DataStorage  # noqa: E402
+
+LAYOUTS = {
+    'rows_json': {'tiers': None, 'series': None},
+    'rows': {'tiers': {'enabled': True, 'raw_hours': 24 * 365}, 'series': None},
+    'series': {'tiers': None, 'series': {'enabled': True}}
+}
+
+
+def synthetic_samples(count, interval, seed):
+    """An inverter's day: SOC and voltages drift slowly, PV follows the sun, load and grid jitter"""
+    rng = random.Random(seed)
+    soc, battery_voltage, grid_voltage = 60.0, 52.4, 241.0
+    end = datetime.now().replace(microsecond=0)
+    for index in range(count):
+        timestamp = end - timedelta(seconds=(count - index) * interval)
+        daylight = max(0.0, math.sin((timestamp.hour * 3600 + timestamp.minute * 60 - 6 * 3600) / 43200 * math.pi))
+        pv1 = round(3200 * daylight + rng.randint(-15, 15)) if daylight else 0
+        pv2 = round(2800 * daylight + rng.randint(-15, 15)) if daylight else 0
+        load = 450 + rng.randint(0, 60) + (1800 if rng.random() < 0.1 else 0)
+        battery = max(-5000, min(5000, pv1 + pv2 - load))
+        soc = max(10.0, min(100.0, soc + battery * interval / 3600 / 150))
+        if rng.random() < 0.05:
+            battery_voltage = round(battery_voltage + rng.choice((-0.1, 0.1)), 1)
+        if rng.random() < 0.2:
+            grid_voltage = round(grid_voltage + rng.choice((-0.1, 0.1)), 1)
+        yield timestamp, 'primary', {
+            'battery': {'soc': round(soc), 'power': battery, 'voltage': battery_voltage},
+            'pv': {
+                'power': pv1 + pv2,
+                'total_power': pv1 + pv2,
+                'strings': {
+                    'pv1': {'power': pv1, 'voltage': 380.5 if pv1 else 0},
+                    'pv2': {'power': pv2, 'voltage': 371.2 if pv2 else 0},
+                    'pv3': {'power': 0, 'voltage': 0}
+                }
+            },
+            'grid': {'power': 0 if battery < 5000 else load, 'voltage': grid_voltage},
+            'load': {'power': load}
+        }
+
+
+def replay_samples(workdir, path, hours, night_only):
+    """Samples of an existing database's last hours, read from a copy so the original is untouched"""
+    copy_path = os.path.join(workdir, 'replay.db')
+    shutil.copyfile(path, copy_path)
+    storage = DataStorage(copy_path)
+    with storage.get_connection() as conn:
+        latest = conn.execute('SELECT MAX(timestamp) FROM eg4_data').fetchone()[0]
+        if latest is None:
+            return []
+        since = datetime.fromisoformat(str(latest)) - timedelta(hours=hours)
+        rows = [dict(row) for row in conn.execute('''
+            SELECT * FROM eg4_data WHERE timestamp > ? ORDER BY timestamp
+        ''', (since,))]
+    samples = []
+    for row in storage.expand_runs(rows):
+        timestamp = datetime.fromisoformat(str(row['timestamp']))
+        if night_only and 6 <= timestamp.hour < 22:
+            continue
+        data = json.loads(row['raw_data']) if row.get('raw_data') else storage.eg4_data_from_row(row)
+        samples.append((timestamp, row['device'], data))
+    return samples
+
+
+def benchmark_change_detection(workdir, samples):
+    """Store samples one at a time as the monitor does, with change detection, and read them back"""
+    storage = DataStorage(os.path.join(workdir, 'changes.db'), change_detection={'enabled': True})
+    started = time.perf_counter()
+    for timestamp, device, data in samples:
+        storage.store_eg4_samples({device: data}, timestamp)
+    write_seconds = time.perf_counter() - started
+    rows = storage.get_database_stats()['eg4_data_count']
+    oldest = min(timestamp for timestamp, _, _ in samples)
+    read_back = storage.get_historical_eg4_data(hours=(datetime.now() - oldest).total_seconds() / 3600 + 1,
+                                                device=ALL_EG4_DEVICES)
+    return {
+        'samples': len(samples),
+        'rows_written': rows,
+        'write_reduction': round(1 - rows / len(samples), 3),
+        'samples_read_back': len(read_back),
+        'write_seconds': round(write_seconds, 2)
+    }
+
+
+def timed(function, repeats):
+    """Median seconds of repeated calls, with the last result"""
+    durations = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        result = function()
+        durations.append(time.perf_counter() - started)
+    return sorted(durations)[len(durations) // 2], result
+
+
+def benchmark_layout(workdir, name, samples, args, query_hours):
+    path = os.path.join(workdir, f'{name}.db')
+    storage = DataStorage(path, **LAYOUTS[name])
+    started = time.perf_counter()
+    for offset in range(0, len(samples), 50000):
+        storage.store_eg4_batch(samples[offset:offset + 50000])
+    if storage.compact:
+        storage.pack_series_chunks(datetime.now() + timedelta(days=1))
+    write_seconds = time.perf_counter() - started
+    with storage.get_connection() as conn:
+        conn.execute('VACUUM')
+    size = os.path.getsize(path)
+
+    result = {
+        'db_bytes': size,
+        'bytes_per_sample': round(size / len(samples), 1),
+        'write_seconds': round(write_seconds, 2),
+        'queries': {}
+    }
+    if storage.compact:
+        result['chunk_bytes_per_sample'] = round(storage.get_database_stats()['eg4_series']['bytes'] / len(samples), 1)
+    for hours in query_hours:
+        seconds, rows = timed(lambda: storage.get_historical_eg4_data(hours=hours), args.repeats)
+        result['queries'][f'{hours}h_rows'] = {'ms': round(seconds * 1000, 1), 'samples': len(rows)}
+        if storage.compact:
+            since = datetime.now() - timedelta(hours=hours)
+            seconds, series = timed(lambda: storage.get_eg4_series(since, metrics=['battery_soc']), args.repeats)
+            result['queries'][f'{hours}h_columns'] = {
+                'ms': round(seconds * 1000, 1),
+                'samples': sum(len(columns['timestamp']) for columns in series.values())
+            }
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare EG4 sample storage layouts')
+    parser.add_argument('--hours', type=float, default=24, help='Hours of synthetic history, or of the replayed database')
+    parser.add_argument('--interval', type=float, default=1, help='Seconds between samples')
+    parser.add_argument('--queries', default='1,24', help='Comma-separated history windows to query, in hours')
+    parser.add_argument('--repeats', type=int, default=5, help='Runs per query, the median is reported')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--replay-db', help='Measure change detection on the samples of this database instead')
+    parser.add_argument('--night-only', action='store_true',
+                        help='Only use samples between 22:00 and 06:00 for change detection')
+    parser.add_argument('--change-interval', type=float, default=60,
+                        help='Seconds between synthetic samples for the change detection run')
+    parser.add_argument('--portal-refresh', type=float, default=0,
+                        help='Seconds the synthetic portal keeps serving the same values')
+    parser.add_argument('--json', help='Write the full report to this file')
+    args = parser.parse_args()
+
+    query_hours = [float(hours) for hours in args.queries.split(',') if hours.strip()]
+    workdir = tempfile.mkdtemp(prefix='eg4_srp_storage_benchmark_')
+    report = {}
+    try:
+        if args.replay_db:
+            change_samples = replay_samples(workdir, args.replay_db, args.hours, args.night_only)
+            if not change_samples:
+                parser.error(f"no EG4 samples to replay in {args.replay_db}")
+        else:
+            samples = list(synthetic_samples(int(args.hours * 3600 / args.interval), args.interval, args.seed))
+            report.update({
+                'samples': len(samples),
+                'interval_seconds': args.interval,
+                'layouts': {name: benchmark_layout(workdir, name, samples, args, query_hours) for name in LAYOUTS}
+            })
+            change_samples = []
+            served = None
+            for timestamp, device, data in synthetic_samples(int(args.hours * 3600 / args.change_interval),
+                                                             args.change_interval, args.seed):
+                # A portal that refreshes slowly keeps returning the values it last computed
+                if served is None or (timestamp - served[0]).total_seconds() >= args.portal_refresh:
+                    served = (timestamp, data)
+                if not args.night_only or not 6 <= timestamp.hour < 22:
+                    change_samples.append((timestamp, device, served[1]))
+        report['change_detection'] = benchmark_change_detection(workdir, change_samples)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if 'layouts' in report:
+        print(f"{report['samples']} samples at {args.interval:g}s")
+        print(f"{'layout':<10} {'bytes/sample':>12} {'write s':>8}  queries (median ms)")
+        for name, result in report['layouts'].items():
+            queries = ', '.join(f"{query} {figures['ms']}" for query, figures in result['queries'].items())
+            print(f"{name:<10} {result['bytes_per_sample']:>12} {result['write_seconds']:>8}  {queries}")
+    changes = report['change_detection']
+    print(f"change detection: {changes['samples']} samples stored as {changes['rows_written']} rows "
+          f"({changes['write_reduction']:.1%} fewer writes), {changes['samples_read_back']} read back")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
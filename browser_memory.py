@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+Browser Memory Tracking for EG4-SRP Monitor
+Tracks the process tree of each source's own Playwright browser, samples the
+proportional set size (PSS) of its browser processes from /proc and decides
+when a browser should be recycled
+"""
+
+import logging
+import os
+import signal
+import time
+from collections import deque
+from typing import Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+PROC_AVAILABLE = os.path.isdir('/proc')
+PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+CLOCK_TICKS = os.sysconf('SC_CLK_TCK') if hasattr(os, 'sysconf') else 100
+
+
+def read_process_table() -> Dict[int, Tuple[int, str]]:
+    """Map every visible PID to (parent PID, start time) from /proc/<pid>/stat"""
+    table = {}
+    if not PROC_AVAILABLE:
+        return table
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat', 'r') as f:
+                stat = f.read()
+            # The command name may contain spaces, so split after its closing parenthesis
+            fields = stat[stat.rindex(')') + 2:].split()
+            table[int(entry)] = (int(fields[1]), fields[19])
+        except (OSError, ValueError, IndexError):
+            continue
+    return table
+
+
+def descendants(root_pid: int, table: Dict[int, Tuple[int, str]]) -> List[int]:
+    """All PIDs below root_pid in the process tree"""
+    children = {}
+    for pid, (ppid, _) in table.items():
+        children.setdefault(ppid, []).append(pid)
+    found = []
+    stack = list(children.get(root_pid, []))
+    while stack:
+        pid = stack.pop()
+        found.append(pid)
+        stack.extend(children.get(pid, []))
+    return found
+
+
+def child_pids(pid: int) -> Set[int]:
+    """Direct children of a process"""
+    return {child for child, (ppid, _) in read_process_table().items() if ppid == pid}
+
+
+def rss_bytes(pid: int) -> int:
+    """Resident set size of one process, 0 if it has exited"""
+    try:
+        with open(f'/proc/{pid}/statm', 'r') as f:
+            return int(f.read().split()[1]) * PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def pss_bytes(pid: int) -> int:
+    """Proportional set size of one process, counting each shared page once across the processes sharing it
+
+    Falls back to RSS on kernels without /proc/<pid>/smaps_rollup.
+    """
+    try:
+        with open(f'/proc/{pid}/smaps_rollup', 'r') as f:
+            for line in f:
+                if line.startswith('Pss:'):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return rss_bytes(pid)
+
+
+def cpu_seconds(pid: int) -> float:
+    """User plus system CPU time consumed by one process, 0 if it has exited"""
+    try:
+        with open(f'/proc/{pid}/stat', 'r') as f:
+            stat = f.read()
+        fields = stat[stat.rindex(')') + 2:].split()
+        return (int(fields[11]) + int(fields[12])) / CLOCK_TICKS
+    except (OSError, ValueError, IndexError):
+        return 0.0
+
+
+def is_browser_process(pid: int) -> bool:
+    try:
+        with open(f'/proc/{pid}/cmdline', 'rb') as f:
+            cmdline = f.read().decode('utf-8', 'replace').lower()
+        return 'chrom' in cmdline or 'headless_shell' in cmdline
+    except OSError:
+        return False
+
+
+class SourceMemory:
+    """Memory timeline and budget state for one source's browser tree"""
+
+    def __init__(self, source: str, root_pid: int, timeline_length: int):
+        self.source = source
+        self.root_pid = root_pid
+        self.started_at = time.time()
+        self.timeline = deque(maxlen=timeline_length)
+        self.pids = []
+        self.recycle_count = 0
+
+    def age_minutes(self) -> float:
+        return (time.time() - self.started_at) / 60
+
+
+class BrowserMemoryTracker:
+    """Tracks PSS of each source's own browser processes and flags recycle candidates"""
+
+    def __init__(self, timeline_length: int = 720):
+        self.timeline_length = timeline_length
+        self.sources = {}
+        # PID -> start time of every browser process we have seen, so orphans can be
+        # cleaned up later without touching unrelated processes that reuse the PID
+        self.known_pids = {}
+        self.recycle_counts = {}
+
+    def register(self, source: str, root_pid: Optional[int]):
+        """Start tracking the process tree rooted at a source's Playwright driver"""
+        if not PROC_AVAILABLE or not root_pid:
+            return
+        memory = SourceMemory(source, root_pid, self.timeline_length)
+        previous = self.sources.get(source)
+        if previous:
+            memory.timeline.extend(previous.timeline)
+        memory.recycle_count = self.recycle_counts.get(source, 0)
+        self.sources[source] = memory
+        logger.info(f"Tracking {source.upper()} browser process tree (root PID {root_pid})")
+        self.sample(source)
+
+    def unregister(self, source: str):
+        memory = self.sources.get(source)
+        if memory:
+            memory.root_pid = None
+
+    def swap(self, source: str, other: str):
+        """Exchange the process trees tracked for two sources, e.g. after a standby failover"""
+        first = self.sources.setdefault(source, SourceMemory(source, None, self.timeline_length))
+        second = self.sources.setdefault(other, SourceMemory(other, None, self.timeline_length))
+        for field in ('root_pid', 'started_at', 'pids'):
+            value = getattr(first, field)
+            setattr(first, field, getattr(second, field))
+            setattr(second, field, value)
+
+    def sample(self, source: str) -> Optional[float]:
+        """Record the current PSS (MB) of a source's browser processes
+
+        The Playwright driver at the root of the tree is not counted, and
+        pages shared between Chromium processes are only counted once.
+        """
+        memory = self.sources.get(source)
+        if not memory or not memory.root_pid:
+            return None
+        table = read_process_table()
+        if memory.root_pid not in table:
+            return None
+        memory.pids = [memory.root_pid] + descendants(memory.root_pid, table)
+        for pid in memory.pids:
+            self.known_pids[pid] = table[pid][1]
+        pss_mb = round(sum(pss_bytes(pid) for pid in memory.pids if is_browser_process(pid)) / (1024 * 1024), 1)
+        memory.timeline.append((time.time(), pss_mb))
+        return pss_mb
+
+    def tree_cpu_seconds(self, source: str) -> float:
+        """CPU time consumed so far by the live processes of a source's browser tree"""
+        memory = self.sources.get(source)
+        if not memory or not memory.root_pid:
+            return 0.0
+        table = read_process_table()
+        if memory.root_pid not in table:
+            return 0.0
+        return sum(cpu_seconds(pid) for pid in [memory.root_pid] + descendants(memory.root_pid, table))
+
+    def needs_recycle(self, source: str, max_pss_mb: float, max_age_minutes: float,
+                      min_age_minutes: float = 30, over_budget_samples: int = 3) -> Optional[str]:
+        """Reason the source's browser should be recycled, or None while within budget
+
+        A browser younger than min_age_minutes is never recycled, and memory
+        must be over budget for over_budget_samples samples in a row, so one
+        spike or a browser that starts near the budget does not cause a
+        recycle every cycle.
+        """
+        memory = self.sources.get(source)
+        if not memory or not memory.root_pid or not memory.timeline:
+            return None
+        if memory.age_minutes() < (min_age_minutes or 0):
+            return None
+        recent = [pss for timestamp, pss in list(memory.timeline)[-max(1, over_budget_samples):]
+                  if timestamp >= memory.started_at]
+        if max_pss_mb and len(recent) >= max(1, over_budget_samples) and min(recent) > max_pss_mb:
+            return f"PSS {recent[-1]}MB over {max_pss_mb}MB budget for {len(recent)} samples"
+        if max_age_minutes and memory.age_minutes() > max_age_minutes:
+            return f"browser age {memory.age_minutes():.0f}min over {max_age_minutes}min budget"
+        return None
+
+    def record_recycle(self, source: str):
+        self.recycle_counts[source] = self.recycle_counts.get(source, 0) + 1
+        if source in self.sources:
+            self.sources[source].recycle_count = self.recycle_counts[source]
+
+    def own_browser_pids(self) -> List[int]:
+        """Browser processes in currently tracked trees"""
+        pids = []
+        for memory in self.sources.values():
+            if memory.root_pid:
+                pids.extend(pid for pid in memory.pids if is_browser_process(pid))
+        return pids
+
+    def orphaned_pids(self) -> List[int]:
+        """Previously seen browser processes that are no longer in a tracked tree"""
+        table = read_process_table()
+        live = set()
+        for memory in self.sources.values():
+            if memory.root_pid and memory.root_pid in table:
+                live.add(memory.root_pid)
+                live.update(descendants(memory.root_pid, table))
+        orphans = []
+        for pid, start_time in list(self.known_pids.items()):
+            if pid not in table or table[pid][1] != start_time:
+                del self.known_pids[pid]
+            elif pid not in live and is_browser_process(pid):
+                orphans.append(pid)
+        return orphans
+
+    def kill_orphans(self) -> int:
+        """Kill our own orphaned browser processes, leaving other browsers on the host alone"""
+        killed = 0
+        for pid in self.orphaned_pids():
+            try:
+                os.kill(pid, signal.SIGKILL)
+                killed += 1
+            except OSError:
+                pass
+            self.known_pids.pop(pid, None)
+        return killed
+
+    def summary(self) -> Dict:
+        return {
+            source: {
+                'pss_mb': memory.timeline[-1][1] if memory.timeline else None,
+                'peak_pss_mb': max((pss for _, pss in memory.timeline), default=None),
+                'process_count': len(memory.pids),
+                'age_minutes': round(memory.age_minutes(), 1) if memory.root_pid else None,
+                'recycle_count': memory.recycle_count
+            }
+            for source, memory in self.sources.items()
+        }
+
+    def timelines(self) -> Dict:
+        return {
+            source: [{'timestamp': ts, 'pss_mb': pss} for ts, pss in memory.timeline]
+            for source, memory in self.sources.items()
+        }
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Circuit Breaker for EG4-SRP Monitor
+Tracks each data source's failures across polling cycles so an unavailable
+portal fails fast instead of costing retry delays on every cycle
+"""
+
+import logging
+import random
+import time
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+# A half-open probe that never reports back within this many seconds counts as failed
+PROBE_TIMEOUT = 600
+
+
+class CircuitBreaker:
+    """Closed/open/half-open breaker with jittered exponential backoff
+
+    Closed: every call goes through. After failure_threshold consecutive
+    failures the breaker opens and calls fail fast until the backoff expires.
+    Half-open: a single probe call is let through; success closes the breaker,
+    failure reopens it with a longer backoff.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 3, base_delay: float = 60,
+                 max_delay: float = 1800, jitter: float = 0.2):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.trips = 0  # Consecutive openings without a success, drives the backoff
+        self.open_until = 0.0
+        self.opened_at = None
+        self.probe_in_flight = False
+        self.probe_started = 0.0
+        self.last_error = None
+        self.stats = {
+            'calls': 0,
+            'failures': 0,
+            'short_circuited': 0,
+            'times_opened': 0
+        }
+
+    def backoff_delay(self) -> float:
+        """Jittered exponential delay for the current number of trips"""
+        delay = min(self.max_delay, self.base_delay * (2 ** max(0, self.trips - 1)))
+        return delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def retry_in(self) -> float:
+        """Seconds until the next call will be let through"""
+        if self.state == OPEN:
+            return max(0.0, self.open_until - time.monotonic())
+        return 0.0
+
+    def allow_request(self) -> bool:
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN and time.monotonic() >= self.open_until:
+            self.state = HALF_OPEN
+            self.probe_in_flight = False
+            logger.info(f"Circuit {self.name}: half-open, sending probe")
+        if self.state == HALF_OPEN and self.probe_in_flight and time.monotonic() - self.probe_started > PROBE_TIMEOUT:
+            self.record_failure('probe did not complete')
+        if self.state == HALF_OPEN and not self.probe_in_flight:
+            self.probe_in_flight = True
+            self.probe_started = time.monotonic()
+            return True
+        self.stats['short_circuited'] += 1
+        logger.debug(f"Circuit {self.name}: open, skipping call ({self.retry_in():.0f}s until probe)")
+        return False
+
+    def record_success(self):
+        if self.state != CLOSED:
+            logger.info(f"Circuit {self.name}: closed after successful call")
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.trips = 0
+        self.probe_in_flight = False
+        self.opened_at = None
+        self.last_error = None
+
+    def record_failure(self, error: Optional[str] = None):
+        self.stats['failures'] += 1
+        self.consecutive_failures += 1
+        self.last_error = error
+        if self.state == HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            self._open()
+
+    def _open(self):
+        self.trips += 1
+        delay = self.backoff_delay()
+        self.state = OPEN
+        self.probe_in_flight = False
+        self.open_until = time.monotonic() + delay
+        self.opened_at = time.time()
+        self.stats['times_opened'] += 1
+        logger.warning(f"Circuit {self.name}: open for {delay:.0f}s after {self.consecutive_failures} "
+                       f"consecutive failures (last error: {self.last_error})")
+
+    async def call(self, func: Callable, *args, validate: Optional[Callable] = None, **kwargs):
+        """Run func and record the outcome; callers check allow_request() first
+
+        An exception, an empty result or a result rejected by validate counts
+        as a failure. Exceptions return None, other results are returned as-is
+        so callers can log them.
+        """
+        self.stats['calls'] += 1
+        try:
+            result = await func(*args, **kwargs)
+        except Exception as e:
+            logger.warning(f"Circuit {self.name}: call failed: {e}")
+            self.record_failure(str(e))
+            return None
+        if not result:
+            self.record_failure('no data returned')
+        elif validate and not validate(result):
+            self.record_failure('invalid data')
+        else:
+            self.record_success()
+        return result
+
+    def state_dict(self) -> Dict:
+        return dict(
+            self.stats,
+            state=self.state,
+            consecutive_failures=self.consecutive_failures,
+            retry_in=round(self.retry_in(), 1),
+            opened_at=self.opened_at,
+            last_error=self.last_error
+        )
@@ -7,18 +7,112 @@ Provides SQLite-based persistent storage for time-series monitoring data
 import sqlite3
 import json
 import logging
+import threading
+from array import array
 from datetime import datetime, timedelta
 from contextlib import contextmanager
+from bisect import bisect_right
+from itertools import groupby, repeat
 from typing import Dict, List, Optional, Any
 import os
 
+from series_codec import TIME_KEY, encode_chunk, decode_timestamps, decode_values
+
 logger = logging.getLogger(__name__)
 
+# Device key for samples from the main EG4 account's inverter (and rows stored before devices existed)
+DEFAULT_EG4_DEVICE = 'primary'
+# Device argument asking EG4 queries for every device instead of the primary one
+ALL_EG4_DEVICES = '*'
+
+# Numeric eg4_data columns summarized in each rollup bucket
+EG4_METRIC_COLUMNS = (
+    'battery_soc', 'battery_power', 'battery_voltage',
+    'pv_power', 'pv1_power', 'pv1_voltage', 'pv2_power', 'pv2_voltage', 'pv3_power', 'pv3_voltage',
+    'grid_power', 'grid_voltage', 'load_power'
+)
+
+# Rollup resolutions in seconds, with the SQLite format truncating a timestamp to its bucket
+ROLLUP_BUCKETS = {
+    60: '%Y-%m-%d %H:%M:00',
+    3600: '%Y-%m-%d %H:00:00'
+}
+
+# Tiered storage: raw samples for a short window, then 1-minute and 1-hour rollups
+DEFAULT_STORAGE_TIERS = {
+    'enabled': False,
+    'raw_hours': 48,       # Raw samples (hot tier)
+    'minute_days': 30,     # 1-minute rollups (warm tier)
+    'hour_days': 1825,     # 1-hour rollups (cold tier)
+    'keep_raw_json': False  # Also keep each raw sample's JSON document
+}
+
+# rollup_state entry recording how far raw samples have been trimmed
+RAW_TRIMMED = 0
+
+# Compact series store: completed windows of raw samples packed into one compressed BLOB per metric
+DEFAULT_SERIES_STORE = {
+    'enabled': False,
+    'window_minutes': 60   # Samples per chunk, must divide a day
+}
+
+# Change detection: a sample within every deadband of its run's first sample extends the run's row
+DEFAULT_CHANGE_DETECTION = {
+    'enabled': False,
+    'max_run_minutes': 60,    # Start a new row at least this often
+    'max_gap_seconds': 300,   # A longer gap between samples ends the run
+    'deadbands': {
+        'battery_soc': 0,
+        'battery_power': 20,
+        'battery_voltage': 0.1,
+        'pv_power': 20,
+        'pv1_power': 20, 'pv1_voltage': 2,
+        'pv2_power': 20, 'pv2_voltage': 2,
+        'pv3_power': 20, 'pv3_voltage': 2,
+        'grid_power': 20,
+        'grid_voltage': 1,
+        'load_power': 20
+    }
+}
+
+# Insert of one eg4_data row, from (timestamp, device) + eg4_row_values()
+EG4_INSERT = '''
+    INSERT INTO eg4_data (
+        timestamp, device, battery_soc, battery_power, battery_voltage,
+        pv_power, pv1_power, pv1_voltage, pv2_power, pv2_voltage,
+        pv3_power, pv3_voltage, grid_power, grid_voltage,
+        load_power, connection_valid, raw_data
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
 class DataStorage:
     """SQLite-based data storage for monitoring data"""
     
-    def __init__(self, db_path: str = './data/monitor.db'):
+    def __init__(self, db_path: str = './data/monitor.db', tiers: Optional[Dict] = None,
+                 series: Optional[Dict] = None, change_detection: Optional[Dict] = None,
+                 primary_device: str = DEFAULT_EG4_DEVICE):
         self.db_path = db_path
+        # Device of EG4 queries that don't name one
+        self.primary_device = primary_device
+        self.tiers = dict(DEFAULT_STORAGE_TIERS, **(tiers or {}))
+        self.tiered = bool(self.tiers['enabled'])
+        # Without tiers every sample keeps its JSON document, as before
+        self.keep_raw_json = not self.tiered or bool(self.tiers['keep_raw_json'])
+        self.series = dict(DEFAULT_SERIES_STORE, **(series or {}))
+        self.compact = bool(self.series['enabled'])
+        self.series_window = int(self.series['window_minutes'] * 60)
+        if self.series_window <= 0 or 86400 % self.series_window:
+            logger.warning(f"Series window of {self.series['window_minutes']} minutes does not divide a day, using 60")
+            self.series_window = 3600
+        self.change_detection = dict(DEFAULT_CHANGE_DETECTION, **(change_detection or {}))
+        self.change_detection['deadbands'] = dict(DEFAULT_CHANGE_DETECTION['deadbands'],
+                                                  **self.change_detection['deadbands'])
+        self.detect_changes = bool(self.change_detection['enabled'])
+        # Open run per device: row id, first sample's values, start and last sample time
+        self.runs = {}
+        self.write_stats = {'samples': 0, 'rows': 0}
+        # Held while writing EG4 samples, which come from the monitor, Modbus and request threads
+        self.write_lock = threading.Lock()
         self.ensure_data_directory()
         self.init_database()
     
@@ -55,6 +149,7 @@ class DataStorage:
                     CREATE TABLE IF NOT EXISTS eg4_data (
                         id INTEGER PRIMARY KEY AUTOINCREMENT,
                         timestamp DATETIME NOT NULL,
+                        device TEXT NOT NULL DEFAULT 'primary',  -- Inverter the sample came from
                         battery_soc REAL,
                         battery_power REAL,
                         battery_voltage REAL,
@@ -69,6 +164,8 @@ class DataStorage:
                         grid_voltage REAL,
                         load_power REAL,
                         connection_valid BOOLEAN DEFAULT 1,
+                        samples INTEGER NOT NULL DEFAULT 1,  -- Unchanged samples the row stands for
+                        valid_until DATETIME,                -- Time of the run's last sample
                         raw_data TEXT,  -- JSON string of full data
                         created_at DATETIME DEFAULT CURRENT_TIMESTAMP
                     )
@@ -104,8 +201,64 @@ class DataStorage:
                     )
                 ''')
                 
+                # Idempotency keys of ingested batches, so retried batches are not stored twice
+                conn.execute('''
+                    CREATE TABLE IF NOT EXISTS ingest_batches (
+                        idempotency_key TEXT PRIMARY KEY,
+                        samples INTEGER NOT NULL,
+                        received_at DATETIME NOT NULL
+                    )
+                ''')
+                
+                # Rollups of eg4_data: average, minimum and maximum of each metric per bucket
+                metric_columns = ',\n'.join(
+                    f'{column}_avg REAL, {column}_min REAL, {column}_max REAL' for column in EG4_METRIC_COLUMNS
+                )
+                conn.execute(f'''
+                    CREATE TABLE IF NOT EXISTS eg4_rollups (
+                        resolution INTEGER NOT NULL,  -- Bucket length in seconds
+                        device TEXT NOT NULL,
+                        bucket DATETIME NOT NULL,     -- Bucket start, local time
+                        samples INTEGER NOT NULL,
+                        {metric_columns},
+                        PRIMARY KEY (resolution, device, bucket)
+                    ) WITHOUT ROWID
+                ''')
+                
+                # How far each rollup resolution is complete, moved back when older samples arrive,
+                # plus how far raw samples are trimmed (resolution 0)
+                conn.execute('''
+                    CREATE TABLE IF NOT EXISTS rollup_state (
+                        resolution INTEGER PRIMARY KEY,
+                        rolled_until DATETIME NOT NULL
+                    )
+                ''')
+                
+                # Packed windows of raw EG4 samples, one compressed BLOB per metric (see series_codec)
+                conn.execute('''
+                    CREATE TABLE IF NOT EXISTS eg4_series_chunks (
+                        device TEXT NOT NULL,
+                        window_start DATETIME NOT NULL,
+                        metric TEXT NOT NULL,
+                        samples INTEGER NOT NULL,
+                        data BLOB NOT NULL,
+                        PRIMARY KEY (device, window_start, metric)
+                    ) WITHOUT ROWID
+                ''')
+                
+                # Databases created before multi-inverter support have no device column
+                eg4_columns = [row['name'] for row in conn.execute('PRAGMA table_info(eg4_data)')]
+                if 'device' not in eg4_columns:
+                    conn.execute(f"ALTER TABLE eg4_data ADD COLUMN device TEXT NOT NULL DEFAULT '{DEFAULT_EG4_DEVICE}'")
+                    logger.info("Added device column to eg4_data")
+                if 'samples' not in eg4_columns:
+                    conn.execute('ALTER TABLE eg4_data ADD COLUMN samples INTEGER NOT NULL DEFAULT 1')
+                    conn.execute('ALTER TABLE eg4_data ADD COLUMN valid_until DATETIME')
+                    logger.info("Added run columns to eg4_data")
+                
                 # Create indexes for performance
                 conn.execute('CREATE INDEX IF NOT EXISTS idx_eg4_timestamp ON eg4_data(timestamp)')
+                conn.execute('CREATE INDEX IF NOT EXISTS idx_eg4_device_timestamp ON eg4_data(device, timestamp)')
                 conn.execute('CREATE INDEX IF NOT EXISTS idx_srp_date_type ON srp_data(date, chart_type)')
                 conn.execute('CREATE INDEX IF NOT EXISTS idx_events_timestamp ON system_events(timestamp)')
                 conn.execute('CREATE INDEX IF NOT EXISTS idx_events_type ON system_events(event_type, category)')
@@ -117,46 +270,30 @@ class DataStorage:
             logger.error(f"Failed to initialize database: {e}")
             raise
     
-    def store_eg4_data(self, data: Dict) -> bool:
+    def store_eg4_data(self, data: Dict, device: str = DEFAULT_EG4_DEVICE) -> bool:
         """Store EG4 data with automatic retry on connection issues"""
+        return self.store_eg4_samples({device: data})
+    
+    def store_eg4_samples(self, samples: Dict[str, Dict], timestamp: Optional[datetime] = None) -> bool:
+        """Store one EG4 sample per device in a single transaction
+        
+        With change detection, a sample that matches its device's open run
+        only extends that run's row.
+        """
         try:
-            with self.get_connection() as conn:
-                battery = data.get('battery', {})
-                pv = data.get('pv', {})
-                grid = data.get('grid', {})
-                load = data.get('load', {})
-                
-                # Extract PV string data
-                pv_strings = pv.get('strings', {})
-                pv1 = pv_strings.get('pv1', {})
-                pv2 = pv_strings.get('pv2', {})
-                pv3 = pv_strings.get('pv3', {})
-                
-                conn.execute('''
-                    INSERT INTO eg4_data (
-                        timestamp, battery_soc, battery_power, battery_voltage,
-                        pv_power, pv1_power, pv1_voltage, pv2_power, pv2_voltage,
-                        pv3_power, pv3_voltage, grid_power, grid_voltage, 
-                        load_power, connection_valid, raw_data
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    datetime.now(),
-                    battery.get('soc'),
-                    battery.get('power'),
-                    battery.get('voltage'),
-                    pv.get('power'),
-                    pv1.get('power'),
-                    pv1.get('voltage'),
-                    pv2.get('power'),
-                    pv2.get('voltage'),
-                    pv3.get('power'),
-                    pv3.get('voltage'),
-                    grid.get('power'),
-                    grid.get('voltage'),
-                    load.get('power'),
-                    data.get('connection_valid', True),
-                    json.dumps(data)
-                ))
+            with self.write_lock, self.get_connection() as conn:
+                timestamp = timestamp or datetime.now()
+                rows = [(timestamp, device) + self.eg4_row_values(data) for device, data in samples.items()]
+                self.write_stats['samples'] += len(rows)
+                if self.detect_changes:
+                    rows = [row for row in rows if not self.extend_run(conn, row)]
+                    for row in rows:
+                        cursor = conn.execute(EG4_INSERT, row)
+                        self.runs[row[1]] = {'id': cursor.lastrowid, 'values': row[2:16],
+                                             'started': timestamp, 'last': timestamp}
+                else:
+                    conn.executemany(EG4_INSERT, rows)
+                self.write_stats['rows'] += len(rows)
                 conn.commit()
                 return True
                 
@@ -164,6 +301,166 @@ class DataStorage:
             logger.error(f"Failed to store EG4 data: {e}")
             return False
     
+    def store_eg4_batch(self, rows: List[tuple], idempotency_key: Optional[str] = None) -> Optional[Dict]:
+        """Store timestamped (timestamp, device, data) EG4 samples in a single transaction
+        
+        A batch whose idempotency key was already stored is not written again,
+        the result then reports the original batch. Returns None on failure.
+        """
+        try:
+            with self.get_connection() as conn:
+                received_at = datetime.now()
+                if idempotency_key:
+                    # Claiming the key takes the write lock, so a concurrent retry waits and then sees it
+                    claimed = conn.execute('''
+                        INSERT OR IGNORE INTO ingest_batches (idempotency_key, samples, received_at)
+                        VALUES (?, ?, ?)
+                    ''', (idempotency_key, len(rows), received_at)).rowcount
+                    if not claimed:
+                        conn.rollback()
+                        return dict(self.get_ingest_batch(idempotency_key, conn), duplicate=True)
+                conn.executemany(EG4_INSERT, [(timestamp, device) + self.eg4_row_values(data)
+                                              for timestamp, device, data in rows])
+                if self.tiered and rows:
+                    # Backfilled samples reopen the rollup buckets they fall into
+                    self.reopen_rollups(conn, [timestamp for timestamp, _, _ in rows])
+                conn.commit()
+                return {'samples': len(rows), 'received_at': str(received_at), 'duplicate': False}
+        
+        except Exception as e:
+            logger.error(f"Failed to store EG4 batch: {e}")
+            return None
+    
+    def extend_run(self, conn, row: tuple) -> bool:
+        """Extend the device's open run with a sample if nothing changed beyond the deadbands
+        
+        Values are compared with the run's first sample, so slow drift still
+        starts a new row once it adds up to a deadband.
+        """
+        timestamp, device = row[:2]
+        run = self.runs.get(device)
+        if not run:
+            return False
+        if (timestamp - run['last']).total_seconds() > self.change_detection['max_gap_seconds']:
+            return False
+        if timestamp - run['started'] >= timedelta(minutes=self.change_detection['max_run_minutes']):
+            return False
+        # Rollups bucket rows by their start, so runs do not cross a minute
+        if self.tiered and timestamp.replace(second=0, microsecond=0) != run['started'].replace(second=0, microsecond=0):
+            return False
+        deadbands = self.change_detection['deadbands']
+        values = row[2:16]
+        for column, previous, value in zip(EG4_METRIC_COLUMNS + ('connection_valid',), run['values'], values):
+            if isinstance(previous, (int, float)) and isinstance(value, (int, float)):
+                if abs(value - previous) > deadbands.get(column, 0) + 1e-9:
+                    return False
+            elif previous != value:
+                return False
+        
+        updated = conn.execute('''
+            UPDATE eg4_data SET samples = samples + 1, valid_until = ? WHERE id = ?
+        ''', (timestamp, run['id'])).rowcount
+        if not updated:
+            # The row was trimmed or packed meanwhile
+            del self.runs[device]
+            return False
+        run['last'] = timestamp
+        return True
+    
+    def run_timestamps(self, started, valid_until, samples: int) -> List[datetime]:
+        """Sample times of a run's row, evenly spaced between its first and last sample"""
+        started = datetime.fromisoformat(str(started))
+        if samples <= 1 or not valid_until:
+            return [started]
+        step = (datetime.fromisoformat(str(valid_until)) - started) / (samples - 1)
+        return [started + step * index for index in range(samples)]
+    
+    def expand_runs(self, rows: List[Dict], since: Optional[datetime] = None) -> List[Dict]:
+        """Rows with one row per sample again, as stored before change detection"""
+        expanded = []
+        for row in rows:
+            samples = row.pop('samples', 1) or 1
+            valid_until = row.pop('valid_until', None)
+            if samples == 1:
+                expanded.append(row)
+                continue
+            for timestamp in self.run_timestamps(row['timestamp'], valid_until, samples):
+                if since is None or timestamp > since:
+                    expanded.append(dict(row, timestamp=str(timestamp)))
+        return expanded
+    
+    def get_ingest_batch(self, idempotency_key: str, conn=None) -> Optional[Dict]:
+        """The stored batch for an idempotency key, if any"""
+        try:
+            if conn is None:
+                with self.get_connection() as conn:
+                    return self.get_ingest_batch(idempotency_key, conn)
+            row = conn.execute('''
+                SELECT samples, received_at FROM ingest_batches WHERE idempotency_key = ?
+            ''', (idempotency_key,)).fetchone()
+            return dict(row) if row else None
+        
+        except Exception as e:
+            logger.error(f"Failed to look up ingest batch: {e}")
+            return None
+    
+    def eg4_row_values(self, data: Dict) -> tuple:
+        """Column values for one EG4 sample, after timestamp and device"""
+        battery = data.get('battery', {})
+        pv = data.get('pv', {})
+        grid = data.get('grid', {})
+        load = data.get('load', {})
+        
+        # Extract PV string data
+        pv_strings = pv.get('strings', {})
+        pv1 = pv_strings.get('pv1', {})
+        pv2 = pv_strings.get('pv2', {})
+        pv3 = pv_strings.get('pv3', {})
+        
+        return (
+            battery.get('soc'),
+            battery.get('power'),
+            battery.get('voltage'),
+            pv.get('power'),
+            pv1.get('power'),
+            pv1.get('voltage'),
+            pv2.get('power'),
+            pv2.get('voltage'),
+            pv3.get('power'),
+            pv3.get('voltage'),
+            grid.get('power'),
+            grid.get('voltage'),
+            load.get('power'),
+            data.get('connection_valid', True),
+            json.dumps(data) if self.keep_raw_json else None
+        )
+    
+    def eg4_data_from_row(self, row: Dict) -> Dict:
+        """Rebuild the monitor's EG4 data format from a row's columns, for rows stored without JSON"""
+        return {
+            'battery': {
+                'soc': row.get('battery_soc'),
+                'power': row.get('battery_power'),
+                'voltage': row.get('battery_voltage')
+            },
+            'pv': {
+                'total_power': row.get('pv_power'),
+                'power': row.get('pv_power'),
+                'strings': {
+                    'pv1': {'power': row.get('pv1_power'), 'voltage': row.get('pv1_voltage')},
+                    'pv2': {'power': row.get('pv2_power'), 'voltage': row.get('pv2_voltage')},
+                    'pv3': {'power': row.get('pv3_power'), 'voltage': row.get('pv3_voltage')}
+                }
+            },
+            'grid': {
+                'power': row.get('grid_power'),
+                'voltage': row.get('grid_voltage')
+            },
+            'load': {
+                'power': row.get('load_power')
+            }
+        }
+    
     def store_srp_data(self, date: str, chart_type: str, data: Dict, csv_path: str = None) -> bool:
         """Store SRP data with upsert behavior"""
         try:
@@ -208,25 +505,47 @@ class DataStorage:
             logger.error(f"Failed to store system event: {e}")
             return False
     
-    def get_latest_eg4_data(self) -> Optional[Dict]:
-        """Get the most recent EG4 data point"""
+    def resolve_device(self, device: Optional[str]) -> Optional[str]:
+        """The device an EG4 query is for: the primary one by default, None for ALL_EG4_DEVICES"""
+        if device is None:
+            return self.primary_device
+        return None if device == ALL_EG4_DEVICES else device
+    
+    def get_latest_eg4_data(self, device: Optional[str] = None) -> Optional[Dict]:
+        """Get the most recent EG4 data point of the primary device unless another (or ALL_EG4_DEVICES) is given"""
+        device = self.resolve_device(device)
         try:
             with self.get_connection() as conn:
-                row = conn.execute('''
-                    SELECT * FROM eg4_data 
-                    ORDER BY timestamp DESC 
-                    LIMIT 1
-                ''').fetchone()
+                if device is None:
+                    row = conn.execute('''
+                        SELECT * FROM eg4_data 
+                        ORDER BY timestamp DESC 
+                        LIMIT 1
+                    ''').fetchone()
+                else:
+                    row = conn.execute('''
+                        SELECT * FROM eg4_data 
+                        WHERE device = ?
+                        ORDER BY timestamp DESC 
+                        LIMIT 1
+                    ''', (device,)).fetchone()
                 
                 if row:
                     data = dict(row)
+                    # A run's row is as recent as its last sample
+                    if data.get('valid_until'):
+                        data['timestamp'] = data['valid_until']
                     # Parse raw_data if available
                     if data.get('raw_data'):
                         try:
                             data['parsed_data'] = json.loads(data['raw_data'])
                         except:
                             pass
+                    elif self.tiered:
+                        data['parsed_data'] = self.eg4_data_from_row(data)
                     return data
+                if self.compact:
+                    return self.latest_series_sample(conn, device)
                 return None
                 
         except Exception as e:
@@ -257,21 +576,460 @@ class DataStorage:
             logger.error(f"Failed to retrieve latest SRP data: {e}")
             return None
     
-    def get_historical_eg4_data(self, hours: int = 24) -> List[Dict]:
-        """Get historical EG4 data for charts and analysis"""
+    def get_historical_eg4_data(self, hours: int = 24, device: Optional[str] = None) -> List[Dict]:
+        """Get historical EG4 data for charts and analysis, of the primary device unless another is given
+        
+        ALL_EG4_DEVICES returns the samples of every device, interleaved by time.
+        With tiered storage, windows longer than the raw tier are answered from
+        the finest rollup that covers them.
+        """
+        device = self.resolve_device(device)
+        resolution = self.history_resolution(hours)
+        if resolution:
+            return self.get_eg4_rollups(resolution, datetime.now() - timedelta(hours=hours), device)
         try:
             with self.get_connection() as conn:
                 cutoff = datetime.now() - timedelta(hours=hours)
+                # Runs that started before the cutoff can still have samples after it
+                row_cutoff = cutoff
+                if self.detect_changes:
+                    row_cutoff -= timedelta(minutes=self.change_detection['max_run_minutes'])
+                if device is None:
+                    rows = conn.execute('''
+                        SELECT * FROM eg4_data 
+                        WHERE timestamp > ? 
+                        ORDER BY timestamp
+                    ''', (row_cutoff,)).fetchall()
+                else:
+                    rows = conn.execute('''
+                        SELECT * FROM eg4_data 
+                        WHERE device = ? AND timestamp > ? 
+                        ORDER BY timestamp
+                    ''', (device, row_cutoff)).fetchall()
+                
+                rows = self.expand_runs([dict(row) for row in rows], since=cutoff)
+                if self.detect_changes:
+                    rows.sort(key=lambda row: str(row['timestamp']))
+                if self.compact:
+                    rows = self.series_rows(self.get_eg4_series(cutoff, device=device, conn=conn)) + rows
+                    rows.sort(key=lambda row: str(row['timestamp']))
+                return rows
+                
+        except Exception as e:
+            logger.error(f"Failed to retrieve historical EG4 data: {e}")
+            return []
+    
+    def history_resolution(self, hours: float) -> Optional[int]:
+        """Rollup resolution answering a history window, None for raw samples"""
+        if not self.tiered or hours <= self.tiers['raw_hours']:
+            return None
+        if hours <= self.tiers['minute_days'] * 24:
+            return 60
+        return 3600
+    
+    def rollup_select(self, resolution: int, source: str) -> str:
+        """SELECT aggregating rows of a source into buckets of a resolution
+        
+        The source is eg4_data, or the 1-minute rollups for longer resolutions.
+        Averages are weighted by the sample counts of rows and buckets. Both
+        take the bucket range as their two parameters.
+        """
+        bucket_format = ROLLUP_BUCKETS[resolution]
+        if source == 'eg4_data':
+            # Rows of change-detection runs stand for several samples
+            aggregates = ', '.join(
+                f'SUM({column} * samples) / SUM(CASE WHEN {column} IS NOT NULL THEN samples END), '
+                f'MIN({column}), MAX({column})'
+                for column in EG4_METRIC_COLUMNS
+            )
+            return f'''
+                SELECT {resolution}, device, strftime('{bucket_format}', timestamp) AS rollup_bucket,
+                       SUM(samples), {aggregates}
+                FROM eg4_data
+                WHERE timestamp >= ? AND timestamp < ?
+                GROUP BY device, rollup_bucket
+            '''
+        aggregates = ', '.join(
+            f'SUM({column}_avg * samples) / SUM(CASE WHEN {column}_avg IS NOT NULL THEN samples END), '
+            f'MIN({column}_min), MAX({column}_max)'
+            for column in EG4_METRIC_COLUMNS
+        )
+        return f'''
+            SELECT {resolution}, device, strftime('{bucket_format}', bucket) AS rollup_bucket,
+                   SUM(samples), {aggregates}
+            FROM eg4_rollups
+            WHERE resolution = 60 AND bucket >= ? AND bucket < ?
+            GROUP BY device, rollup_bucket
+        '''
+    
+    def rollup_columns(self) -> str:
+        return ', '.join(['resolution', 'device', 'bucket', 'samples'] + [
+            f'{column}_{stat}' for column in EG4_METRIC_COLUMNS for stat in ('avg', 'min', 'max')
+        ])
+    
+    def state_time(self, conn, resolution: int) -> Optional[datetime]:
+        row = conn.execute('''
+            SELECT rolled_until FROM rollup_state WHERE resolution = ?
+        ''', (resolution,)).fetchone()
+        return datetime.fromisoformat(str(row['rolled_until'])) if row else None
+    
+    def set_state(self, conn, resolution: int, until: datetime):
+        conn.execute('''
+            INSERT OR REPLACE INTO rollup_state (resolution, rolled_until) VALUES (?, ?)
+        ''', (resolution, until))
+    
+    def reopen_rollups(self, conn, timestamps: List[datetime]):
+        """Move every resolution's rollup progress back so the buckets of new samples are rebuilt
+        
+        Buckets whose raw samples are already trimmed cannot be rebuilt, samples
+        that old are merged into their buckets by merge_late_samples instead.
+        """
+        trimmed_until = self.state_time(conn, RAW_TRIMMED) or datetime.min
+        since = min((timestamp for timestamp in timestamps if timestamp >= trimmed_until), default=None)
+        if since is None:
+            return
+        conn.execute('''
+            UPDATE rollup_state SET rolled_until = ? WHERE rolled_until > ? AND resolution != ?
+        ''', (since.replace(minute=0, second=0, microsecond=0),) * 2 + (RAW_TRIMMED,))
+    
+    def merge_late_samples(self, conn) -> int:
+        """Fold raw samples older than the trimmed range into existing rollup buckets, then drop them
+        
+        Such samples only come from backfills. Their buckets are combined with
+        what is already there, weighting averages by sample counts. With the
+        series store they are packed into their chunks rather than dropped.
+        """
+        trimmed_until = self.state_time(conn, RAW_TRIMMED)
+        if not trimmed_until:
+            return 0
+        merged = 0
+        for resolution in ROLLUP_BUCKETS:
+            updates = ', '.join(['samples = samples + excluded.samples'] + [
+                f'''{column}_avg = (COALESCE({column}_avg * samples, 0)
+                                   + COALESCE(excluded.{column}_avg * excluded.samples, 0))
+                                  / NULLIF((CASE WHEN {column}_avg IS NOT NULL THEN samples ELSE 0 END)
+                                           + (CASE WHEN excluded.{column}_avg IS NOT NULL
+                                                   THEN excluded.samples ELSE 0 END), 0),
+                    {column}_min = COALESCE(MIN({column}_min, excluded.{column}_min), {column}_min, excluded.{column}_min),
+                    {column}_max = COALESCE(MAX({column}_max, excluded.{column}_max), {column}_max, excluded.{column}_max)'''
+                for column in EG4_METRIC_COLUMNS
+            ])
+            merged += conn.execute(
+                f'INSERT INTO eg4_rollups ({self.rollup_columns()}) '
+                + self.rollup_select(resolution, 'eg4_data')
+                + f'ON CONFLICT (resolution, device, bucket) DO UPDATE SET {updates}',
+                (datetime.min, trimmed_until)
+            ).rowcount
+        if self.compact:
+            self.pack_rows(conn, trimmed_until)
+        else:
+            conn.execute('DELETE FROM eg4_data WHERE timestamp < ?', (trimmed_until,))
+        return merged
+    
+    def rollup_eg4_data(self, now: Optional[datetime] = None) -> Dict[int, int]:
+        """Aggregate completed buckets into the rollup tiers, returning buckets written per resolution
+        
+        1-minute buckets are built from raw samples and 1-hour buckets from the
+        1-minute ones. Each resolution resumes where it left off, so a run
+        only aggregates the samples that arrived since the last one.
+        """
+        now = now or datetime.now()
+        written = {}
+        minute_until = None
+        try:
+            with self.get_connection() as conn:
+                merged = self.merge_late_samples(conn)
+                if merged:
+                    written['merged'] = merged
+                for resolution in ROLLUP_BUCKETS:
+                    if resolution == 3600 and minute_until is None:
+                        break
+                    source = 'eg4_data' if resolution == 60 else 'eg4_rollups'
+                    start = self.state_time(conn, resolution)
+                    if not start:
+                        first = conn.execute(
+                            'SELECT MIN(timestamp) FROM eg4_data' if source == 'eg4_data'
+                            else 'SELECT MIN(bucket) FROM eg4_rollups WHERE resolution = 60'
+                        ).fetchone()[0]
+                        if first is None:
+                            continue
+                        start = first
+                    # Only buckets that have ended, and for hours only what the minutes already cover
+                    end = now.replace(second=0, microsecond=0)
+                    if resolution == 3600:
+                        end = min(end.replace(minute=0), minute_until)
+                    start = datetime.fromisoformat(str(start))
+                    start = start.replace(second=0, microsecond=0, **({'minute': 0} if resolution == 3600 else {}))
+                    if start < end:
+                        cursor = conn.execute(
+                            f'INSERT OR REPLACE INTO eg4_rollups ({self.rollup_columns()}) '
+                            + self.rollup_select(resolution, source),
+                            (start, end) if source == 'eg4_data' else (str(start), str(end))
+                        )
+                        written[resolution] = cursor.rowcount
+                        self.set_state(conn, resolution, end)
+                    if resolution == 60:
+                        minute_until = max(start, end)
+                conn.commit()
+        except Exception as e:
+            logger.error(f"Failed to roll up EG4 data: {e}")
+        return written
+    
+    def get_eg4_rollups(self, resolution: int, since: datetime, device: Optional[str] = None) -> List[Dict]:
+        """Rollup buckets since a time, shaped like eg4_data rows with each metric's average
+        
+        Buckets not rolled up yet are aggregated from the raw samples on the
+        fly, so the newest part of the window is not missing.
+        """
+        try:
+            with self.get_connection() as conn:
+                device_filter = 'AND device = ?' if device else ''
+                params = (resolution, since) + ((device,) if device else ())
+                rows = [dict(row) for row in conn.execute(f'''
+                    SELECT * FROM eg4_rollups
+                    WHERE resolution = ? AND bucket >= ? {device_filter}
+                    ORDER BY bucket
+                ''', params)]
+                
+                tail_start = max(since, self.state_time(conn, resolution) or since)
+                tail = conn.execute(self.rollup_select(resolution, 'eg4_data'),
+                                    (tail_start, datetime.now() + timedelta(days=1))).fetchall()
+                names = self.rollup_columns().split(', ')
+                rows += [dict(zip(names, row)) for row in tail if not device or row[1] == device]
+        except Exception as e:
+            logger.error(f"Failed to retrieve EG4 rollups: {e}")
+            return []
+        
+        for row in rows:
+            row['timestamp'] = row['bucket']
+            for column in EG4_METRIC_COLUMNS:
+                row[column] = row[f'{column}_avg']
+        rows.sort(key=lambda row: (str(row['bucket']), row['device']))
+        return rows
+    
+    def maintain_tiers(self, now: Optional[datetime] = None) -> Dict:
+        """Roll up and pack new samples, then drop what each tier no longer keeps
+        
+        Run every few minutes, so each run deletes only the few thousand raw
+        rows that aged out since the last one.
+        """
+        now = now or datetime.now()
+        written = self.rollup_eg4_data(now) if self.tiered else {}
+        packed = self.pack_series_chunks(now) if self.compact else 0
+        deleted = {}
+        if not self.tiered:
+            return {'rolled_up': written, 'packed': packed, 'deleted': deleted}
+        try:
+            with self.get_connection() as conn:
+                # Never drop raw samples that are not rolled up yet
+                minute_until = self.state_time(conn, 60)
+                raw_cutoff = (now - timedelta(hours=self.tiers['raw_hours'])).replace(second=0, microsecond=0)
+                if minute_until:
+                    raw_cutoff = min(raw_cutoff, minute_until)
+                    deleted['raw'] = conn.execute('DELETE FROM eg4_data WHERE timestamp < ?', (raw_cutoff,)).rowcount
+                    if raw_cutoff > (self.state_time(conn, RAW_TRIMMED) or datetime.min):
+                        self.set_state(conn, RAW_TRIMMED, raw_cutoff)
+                    if self.compact:
+                        deleted['chunks'] = conn.execute('''
+                            DELETE FROM eg4_series_chunks WHERE window_start < ?
+                        ''', (raw_cutoff - timedelta(seconds=self.series_window),)).rowcount
+                for resolution, days in ((60, self.tiers['minute_days']), (3600, self.tiers['hour_days'])):
+                    deleted[resolution] = conn.execute('''
+                        DELETE FROM eg4_rollups WHERE resolution = ? AND bucket < ?
+                    ''', (resolution, str((now - timedelta(days=days)).replace(microsecond=0)))).rowcount
+                conn.commit()
+        except Exception as e:
+            logger.error(f"Failed to trim storage tiers: {e}")
+        if any(deleted.values()) or written or packed:
+            logger.debug(f"Storage tiers: rolled up {written}, packed {packed} samples, deleted {deleted}")
+        return {'rolled_up': written, 'packed': packed, 'deleted': deleted}
+    
+    def series_window_start(self, timestamp: datetime) -> datetime:
+        midnight = timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+        elapsed = int((timestamp - midnight).total_seconds())
+        return midnight + timedelta(seconds=elapsed - elapsed % self.series_window)
+    
+    def pack_series_chunks(self, now: Optional[datetime] = None) -> int:
+        """Pack the raw samples of completed windows into series chunks, returning samples packed
+        
+        With tiered storage only windows already rolled up are packed, as the
+        rollups are built from raw rows.
+        """
+        now = now or datetime.now()
+        try:
+            with self.get_connection() as conn:
+                until = self.series_window_start(now)
+                if self.tiered:
+                    minute_until = self.state_time(conn, 60)
+                    if not minute_until:
+                        return 0
+                    until = min(until, self.series_window_start(minute_until))
+                packed = self.pack_rows(conn, until)
+                # Raw rows before until are gone, later backfills there are merged instead of rebuilt
+                if self.tiered and until > (self.state_time(conn, RAW_TRIMMED) or datetime.min):
+                    self.set_state(conn, RAW_TRIMMED, until)
+                conn.commit()
+                return packed
+        except Exception as e:
+            logger.error(f"Failed to pack EG4 series chunks: {e}")
+            return 0
+    
+    def pack_rows(self, conn, until: datetime) -> int:
+        """Move raw samples before until into the chunks of their windows
+        
+        Samples landing in an already packed window, e.g. from a backfill, are
+        merged with the chunk's samples and the chunk is rewritten.
+        """
+        cursor = conn.execute(f'''
+            SELECT device, timestamp, samples, valid_until, {', '.join(EG4_METRIC_COLUMNS)} FROM eg4_data
+            WHERE timestamp < ?
+            ORDER BY device, timestamp
+        ''', (until,))
+        samples = (
+            (row[0], timestamp, tuple(row)[4:])
+            for row in cursor
+            for timestamp in self.run_timestamps(row[1], row[3], row[2])
+        )
+        packed = 0
+        for (device, window), group in groupby(samples, key=lambda sample: (sample[0], self.series_window_start(sample[1]))):
+            group = list(group)
+            offsets = [round((timestamp - window).total_seconds() * 1000) for _, timestamp, _ in group]
+            columns = [list(values) for values in zip(*(values for _, _, values in group))]
+            existing = self.read_chunks(conn, device, window, window)
+            if existing:
+                chunk = existing[0][2]
+                offsets = list(chunk[TIME_KEY]) + offsets
+                columns = [list(chunk.get(metric, [None] * len(chunk[TIME_KEY]))) + values
+                           for metric, values in zip(EG4_METRIC_COLUMNS, columns)]
+                order = sorted(range(len(offsets)), key=offsets.__getitem__)
+                offsets = [offsets[index] for index in order]
+                columns = [[values[index] for index in order] for values in columns]
+            blobs = encode_chunk(offsets, dict(zip(EG4_METRIC_COLUMNS, columns)))
+            conn.executemany('''
+                INSERT OR REPLACE INTO eg4_series_chunks (device, window_start, metric, samples, data)
+                VALUES (?, ?, ?, ?, ?)
+            ''', [(device, window, metric, len(offsets), blob) for metric, blob in blobs.items()])
+            packed += len(group)
+        conn.execute('DELETE FROM eg4_data WHERE timestamp < ?', (until,))
+        return packed
+    
+    def read_chunks(self, conn, device: Optional[str], first: datetime, last: datetime,
+                    metrics: Optional[List[str]] = None) -> List[tuple]:
+        """Decode the chunks of windows first..last into (device, window_start, {metric: values}) tuples"""
+        params = [first, last]
+        device_filter = ''
+        if device:
+            device_filter = 'AND device = ?'
+            params.append(device)
+        metric_filter = ''
+        if metrics:
+            metric_filter = f"AND metric IN ({', '.join('?' * (len(metrics) + 1))})"
+            params += [TIME_KEY] + list(metrics)
+        rows = conn.execute(f'''
+            SELECT device, window_start, metric, data FROM eg4_series_chunks
+            WHERE window_start >= ? AND window_start <= ? {device_filter} {metric_filter}
+            ORDER BY device, window_start
+        ''', params)
+        chunks = []
+        for (chunk_device, window), group in groupby(rows, key=lambda row: (row[0], row[1])):
+            columns = {
+                metric: decode_timestamps(data) if metric == TIME_KEY else decode_values(data)
+                for _, _, metric, data in group
+            }
+            chunks.append((chunk_device, datetime.fromisoformat(str(window)), columns))
+        return chunks
+    
+    def get_eg4_series(self, since: datetime, until: Optional[datetime] = None, device: Optional[str] = None,
+                       metrics: Optional[List[str]] = None, conn=None) -> Dict[str, Dict]:
+        """Packed samples in since < timestamp <= until as columns, keyed by device
+        
+        Each device maps to {'timestamp': [datetime, ...], metric: array of
+        floats, ...}, with NaN where a sample had no value. Only the metrics
+        asked for are decoded.
+        """
+        if conn is None:
+            try:
+                with self.get_connection() as conn:
+                    return self.get_eg4_series(since, until, device, metrics, conn)
+            except Exception as e:
+                logger.error(f"Failed to read EG4 series chunks: {e}")
+                return {}
+        
+        until = until or datetime.now()
+        series = {}
+        for chunk_device, window, columns in self.read_chunks(conn, device, self.series_window_start(since),
+                                                              until, metrics):
+            offsets = columns.pop(TIME_KEY)
+            timestamps = list(map(window.__add__, map(timedelta, repeat(0), repeat(0), repeat(0), offsets)))
+            # Chunks are whole windows, trim the ones at the edges of the range
+            first = bisect_right(timestamps, since)
+            last = bisect_right(timestamps, until)
+            device_series = series.setdefault(chunk_device, {TIME_KEY: []})
+            device_series[TIME_KEY] += timestamps[first:last]
+            for metric, values in columns.items():
+                device_series.setdefault(metric, array('d')).extend(values[first:last])
+        return series
+    
+    def series_rows(self, series: Dict[str, Dict]) -> List[Dict]:
+        """Columns from get_eg4_series as eg4_data-style rows"""
+        rows = []
+        for device, columns in series.items():
+            metrics = [(metric, columns[metric]) for metric in EG4_METRIC_COLUMNS if metric in columns]
+            for index, timestamp in enumerate(columns[TIME_KEY]):
+                row = {'timestamp': str(timestamp), 'device': device}
+                for metric, values in metrics:
+                    value = values[index]
+                    row[metric] = None if value != value else value
+                rows.append(row)
+        return rows
+    
+    def latest_series_sample(self, conn, device: Optional[str] = None) -> Optional[Dict]:
+        """Newest packed sample, for when no raw samples are left"""
+        device_filter = 'WHERE device = ?' if device else ''
+        latest = conn.execute(f'''
+            SELECT device, window_start FROM eg4_series_chunks {device_filter}
+            ORDER BY window_start DESC LIMIT 1
+        ''', (device,) if device else ()).fetchone()
+        if not latest:
+            return None
+        window = datetime.fromisoformat(str(latest['window_start']))
+        rows = self.series_rows(self.get_eg4_series(window - timedelta(microseconds=1), window + timedelta(days=1),
+                                                    latest['device'], conn=conn))
+        if not rows:
+            return None
+        data = rows[-1]
+        data['parsed_data'] = self.eg4_data_from_row(data)
+        return data
+    
+    def get_eg4_devices(self) -> List[Dict]:
+        """List the devices with stored EG4 data, with sample counts and latest timestamps
+        
+        Samples already packed into series chunks count too, so a device whose
+        raw rows were all packed is still listed (with its last window's start
+        as the latest time when no raw rows are left).
+        """
+        try:
+            with self.get_connection() as conn:
                 rows = conn.execute('''
-                    SELECT * FROM eg4_data 
-                    WHERE timestamp > ? 
-                    ORDER BY timestamp
-                ''', (cutoff,)).fetchall()
+                    SELECT device, SUM(samples) AS samples, MAX(latest) AS latest
+                    FROM (
+                        SELECT device, SUM(samples) AS samples, MAX(COALESCE(valid_until, timestamp)) AS latest
+                        FROM eg4_data
+                        GROUP BY device
+                        UNION ALL
+                        SELECT device, SUM(samples), MAX(window_start)
+                        FROM eg4_series_chunks
+                        WHERE metric = ?
+                        GROUP BY device
+                    )
+                    GROUP BY device
+                    ORDER BY device
+                ''', (TIME_KEY,)).fetchall()
                 
                 return [dict(row) for row in rows]
                 
         except Exception as e:
-            logger.error(f"Failed to retrieve historical EG4 data: {e}")
+            logger.error(f"Failed to list EG4 devices: {e}")
             return []
     
     def get_recent_alerts(self, hours: int = 24) -> List[Dict]:
@@ -297,15 +1055,20 @@ class DataStorage:
             with self.get_connection() as conn:
                 now = datetime.now()
                 
-                # EG4 data: keep 90 days of raw data
-                eg4_cutoff = now - timedelta(days=90)
-                result = conn.execute('''
-                    DELETE FROM eg4_data 
-                    WHERE timestamp < ?
-                ''', (eg4_cutoff,))
-                
-                if result.rowcount > 0:
-                    logger.info(f"Cleaned up {result.rowcount} old EG4 records")
+                # EG4 data: keep 90 days of raw data, unless tiered storage trims it
+                if not self.tiered:
+                    eg4_cutoff = now - timedelta(days=90)
+                    result = conn.execute('''
+                        DELETE FROM eg4_data 
+                        WHERE timestamp < ?
+                    ''', (eg4_cutoff,))
+                    
+                    if result.rowcount > 0:
+                        logger.info(f"Cleaned up {result.rowcount} old EG4 records")
+                    conn.execute('''
+                        DELETE FROM eg4_series_chunks
+                        WHERE window_start < ?
+                    ''', (eg4_cutoff,))
                 
                 # System events: keep 1 year of alerts, 6 months of errors, 30 days of info
                 alert_cutoff = now - timedelta(days=365)
@@ -330,6 +1093,12 @@ class DataStorage:
                     WHERE event_type = 'info' AND timestamp < ?
                 ''', (info_cutoff,))
                 
+                # Ingest idempotency keys: retries come within minutes, keep 7 days
+                conn.execute('''
+                    DELETE FROM ingest_batches
+                    WHERE received_at < ?
+                ''', (now - timedelta(days=7),))
+                
                 conn.commit()
                 logger.info("Database cleanup completed")
                 
@@ -343,10 +1112,16 @@ class DataStorage:
                 stats = {}
                 
                 # Count records in each table
-                for table in ['eg4_data', 'srp_data', 'system_events']:
+                for table in ['eg4_data', 'srp_data', 'system_events', 'ingest_batches']:
                     count = conn.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
                     stats[f'{table}_count'] = count
                 
+                # Samples stored, more than rows when change detection extends runs
+                stats['eg4_data_samples'] = conn.execute('SELECT COALESCE(SUM(samples), 0) FROM eg4_data').fetchone()[0]
+                if self.detect_changes:
+                    with self.write_lock:
+                        stats['eg4_writes'] = dict(self.write_stats)
+                
                 # Get database file size
                 if os.path.exists(self.db_path):
                     stats['db_size_mb'] = round(os.path.getsize(self.db_path) / (1024 * 1024), 2)
@@ -363,6 +1138,29 @@ class DataStorage:
                         'latest': eg4_range['latest']
                     }
                 
+                # Packed series chunks and their compressed size
+                if self.compact:
+                    chunks = conn.execute('''
+                        SELECT COUNT(DISTINCT device || window_start) AS chunks,
+                               SUM(CASE WHEN metric = ? THEN samples ELSE 0 END) AS samples,
+                               SUM(LENGTH(data)) AS bytes
+                        FROM eg4_series_chunks
+                    ''', (TIME_KEY,)).fetchone()
+                    stats['eg4_series'] = dict(chunks)
+                
+                # Rollup buckets per resolution
+                if self.tiered:
+                    stats['eg4_rollups'] = {
+                        {60: 'minute', 3600: 'hour'}[row['resolution']]: {
+                            'count': row['count'], 'earliest': row['earliest'], 'rolled_until': row['rolled_until']
+                        }
+                        for row in conn.execute('''
+                            SELECT r.resolution, COUNT(*) AS count, MIN(r.bucket) AS earliest, s.rolled_until
+                            FROM eg4_rollups r LEFT JOIN rollup_state s ON s.resolution = r.resolution
+                            GROUP BY r.resolution
+                        ''')
+                    }
+                
                 return stats
                 
         except Exception as e:
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+EG4 HTTP Collector for EG4-SRP Monitor
+Polls the EG4 portal's runtime data endpoint directly with a pooled HTTP client,
+reusing the session cookies from a Playwright login instead of reloading the page
+"""
+
+import logging
+import time
+from typing import Dict, List
+
+try:
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+EG4_BASE_URL = 'https://monitor.eg4electronics.com/WManage'
+RUNTIME_PATH = '/api/inverter/getInverterRuntime'
+
+
+class SessionExpiredError(Exception):
+    """Raised when the portal no longer accepts the exported session cookies"""
+
+
+def parse_runtime_payload(payload: Dict) -> Dict:
+    """Convert a getInverterRuntime JSON payload into the monitor data format
+
+    Voltages are reported by the portal in tenths of a volt. Battery power is
+    positive while charging, grid power is positive while exporting.
+    """
+    def num(key, scale=1):
+        try:
+            return float(payload.get(key) or 0) / scale
+        except (TypeError, ValueError):
+            return 0
+
+    pv1_power = int(num('ppv1'))
+    pv2_power = int(num('ppv2'))
+    pv3_power = int(num('ppv3'))
+    total_pv_power = pv1_power + pv2_power + pv3_power
+
+    return {
+        'battery': {
+            'soc': int(num('soc')),
+            'power': int(num('pCharge') - num('pDisCharge')),
+            'voltage': round(num('vBat', 10), 1)
+        },
+        'pv': {
+            'total_power': total_pv_power,
+            'power': total_pv_power,  # Keep for backward compatibility
+            'strings': {
+                'pv1': {'power': pv1_power, 'voltage': round(num('vpv1', 10), 1)},
+                'pv2': {'power': pv2_power, 'voltage': round(num('vpv2', 10), 1)},
+                'pv3': {'power': pv3_power, 'voltage': round(num('vpv3', 10), 1)}
+            }
+        },
+        'grid': {
+            'power': int(num('pToGrid') - num('pToUser')),
+            'voltage': round(num('vacr', 10), 1)
+        },
+        'load': {
+            'power': int(num('consumptionPower'))
+        },
+        'source': 'http'
+    }
+
+
+class EG4HttpClient:
+    """Lightweight runtime-data poller sharing the browser's authenticated session"""
+
+    def __init__(self, base_url: str = EG4_BASE_URL, serial_number: str = '',
+                 pool_size: int = 4, timeout: float = 15):
+        self.base_url = base_url.rstrip('/')
+        self.serial_number = serial_number
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.cookies = {}
+        self.session = None
+        self.stats = {
+            'requests': 0,
+            'failures': 0,
+            'session_expirations': 0,
+            'last_latency_ms': None,
+            'last_success': None
+        }
+
+    @property
+    def ready(self) -> bool:
+        """True when cookies and an inverter serial number are available"""
+        return AIOHTTP_AVAILABLE and bool(self.cookies) and bool(self.serial_number)
+
+    def load_cookies(self, cookies: List[Dict]):
+        """Load cookies exported from a Playwright browser context"""
+        self.cookies = {cookie['name']: cookie['value'] for cookie in cookies if cookie.get('name')}
+        if self.session and not self.session.closed:
+            self.session.cookie_jar.clear()
+            self.session.cookie_jar.update_cookies(self.cookies)
+        logger.debug(f"EG4 HTTP collector loaded {len(self.cookies)} session cookies")
+
+    def invalidate(self):
+        """Forget the exported session so the browser path logs in again"""
+        self.cookies = {}
+        if self.session and not self.session.closed:
+            self.session.cookie_jar.clear()
+
+    async def _get_session(self):
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(limit=self.pool_size, keepalive_timeout=60)
+            self.session = aiohttp.ClientSession(
+                connector=connector,
+                cookies=self.cookies,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                headers={'X-Requested-With': 'XMLHttpRequest'}
+            )
+        return self.session
+
+    async def get_runtime(self) -> Dict:
+        """Fetch and parse current inverter runtime data
+
+        Raises SessionExpiredError when the portal rejects the session.
+        """
+        if not self.ready:
+            raise SessionExpiredError("No exported session available")
+
+        session = await self._get_session()
+        self.stats['requests'] += 1
+        started = time.perf_counter()
+        try:
+            async with session.post(f"{self.base_url}{RUNTIME_PATH}",
+                                    data={'serialNum': self.serial_number},
+                                    allow_redirects=False) as response:
+                content_type = response.headers.get('Content-Type', '')
+                if (response.status in (301, 302, 303, 401, 403) or
+                        'login' in response.headers.get('Location', '') or
+                        'json' not in content_type):
+                    raise SessionExpiredError(f"Runtime request rejected (HTTP {response.status})")
+                response.raise_for_status()
+                payload = await response.json(content_type=None)
+        except SessionExpiredError:
+            self.stats['failures'] += 1
+            self.stats['session_expirations'] += 1
+            self.invalidate()
+            raise
+        except Exception:
+            self.stats['failures'] += 1
+            raise
+
+        if not payload.get('success', False):
+            self.stats['failures'] += 1
+            self.stats['session_expirations'] += 1
+            self.invalidate()
+            raise SessionExpiredError(f"Runtime request unsuccessful: {payload.get('msg', 'unknown')}")
+
+        self.stats['last_latency_ms'] = round((time.perf_counter() - started) * 1000, 1)
+        self.stats['last_success'] = time.time()
+        return parse_runtime_payload(payload)
+
+    async def close(self):
+        """Close the pooled HTTP session"""
+        if self.session and not self.session.closed:
+            await self.session.close()
+        self.session = None
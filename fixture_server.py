@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Portal Fixture Server for EG4-SRP Monitor
+Replays recorded portal pages, XHR responses and CSV downloads from a fixture
+directory, with configurable latency and failure injection, so the scrapers can
+be exercised and benchmarked without live portal accounts
+
+A fixture directory holds a routes.json manifest and/or HAR recordings (*.har,
+e.g. from Playwright's record_har_path). Point a monitor at the server through
+the portal_urls setting.
+"""
+
+import argparse
+import base64
+import json
+import logging
+import mimetypes
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlsplit
+
+logger = logging.getLogger(__name__)
+
+# Response headers from recordings that no longer describe the replayed body
+SKIPPED_HAR_HEADERS = {'content-encoding', 'content-length', 'transfer-encoding', 'connection'}
+
+
+class FixtureRoute:
+    """One replayable response, matched on method, path and optional query values"""
+
+    def __init__(self, spec: Dict, fixture_dir: str):
+        self.method = spec.get('method', 'GET').upper()
+        self.path = spec['path']
+        self.query = spec.get('query', {})
+        self.status = spec.get('status', 200)
+        self.latency_ms = spec.get('latency_ms')
+        self.failure_rate = spec.get('failure_rate')
+
+        headers = spec.get('headers', {})
+        self.headers = list(headers.items()) if isinstance(headers, dict) else [tuple(pair) for pair in headers]
+
+        content_type = spec.get('content_type')
+        if 'file' in spec:
+            with open(os.path.join(fixture_dir, spec['file']), 'rb') as f:
+                self.body = f.read()
+            content_type = content_type or mimetypes.guess_type(spec['file'])[0]
+        elif 'json' in spec:
+            self.body = json.dumps(spec['json']).encode('utf-8')
+            content_type = content_type or 'application/json'
+        elif spec.get('base64'):
+            self.body = base64.b64decode(spec['body'])
+        else:
+            self.body = spec.get('body', '').encode('utf-8')
+        if content_type and not any(name.lower() == 'content-type' for name, _ in self.headers):
+            self.headers.append(('Content-Type', content_type))
+
+    def matches(self, method: str, path: str, query: Dict[str, List[str]]) -> bool:
+        if method != self.method:
+            return False
+        if self.path.endswith('*'):
+            if not path.startswith(self.path[:-1]):
+                return False
+        elif path != self.path:
+            return False
+        return all(query.get(key, [None])[0] == value for key, value in self.query.items())
+
+
+def load_har_routes(har_path: str) -> List[Dict]:
+    """Convert the entries of a HAR recording into route specs"""
+    with open(har_path, 'r') as f:
+        har = json.load(f)
+    specs = []
+    for entry in har.get('log', {}).get('entries', []):
+        request, response = entry['request'], entry['response']
+        url = urlsplit(request['url'])
+        content = response.get('content', {})
+        specs.append({
+            'method': request['method'],
+            'path': url.path or '/',
+            'query': {key: values[0] for key, values in parse_qs(url.query).items()},
+            'status': response['status'],
+            'headers': [(header['name'], header['value']) for header in response.get('headers', [])
+                        if header['name'].lower() not in SKIPPED_HAR_HEADERS],
+            'body': content.get('text', ''),
+            'base64': content.get('encoding') == 'base64'
+        })
+    return specs
+
+
+class FixtureRequestHandler(BaseHTTPRequestHandler):
+    server_version = 'PortalFixture/1.0'
+
+    def do_GET(self):
+        self.respond()
+
+    def do_POST(self):
+        self.respond()
+
+    def respond(self):
+        fixture = self.server.fixture
+        length = int(self.headers.get('Content-Length') or 0)
+        if length:
+            self.rfile.read(length)
+        url = urlsplit(self.path)
+        route = fixture.find_route(self.command, url.path, parse_qs(url.query))
+        fixture.record_request(self.command, url.path, route)
+
+        fixture.apply_latency(route)
+        if fixture.should_fail(route):
+            fixture.stats['failures_injected'] += 1
+            if fixture.failure_mode == 'drop':
+                self.close_connection = True
+                return
+            self.send_error(fixture.failure_status, 'Injected failure')
+            return
+
+        if route is None:
+            self.send_error(404, 'No fixture recorded for this request')
+            return
+
+        self.send_response(route.status)
+        for name, value in route.headers:
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(route.body)))
+        self.end_headers()
+        self.wfile.write(route.body)
+
+    def log_message(self, format, *args):
+        logger.debug(f"Fixture {self.address_string()} {format % args}")
+
+
+class FixtureServer:
+    """Threaded HTTP server replaying one portal's fixtures"""
+
+    def __init__(self, fixture_dir: str, host: str = '127.0.0.1', port: int = 0,
+                 latency_ms: float = 0, jitter_ms: float = 0, failure_rate: float = 0.0,
+                 failure_status: int = 503, failure_mode: str = 'status', seed: Optional[int] = None):
+        self.fixture_dir = fixture_dir
+        self.host = host
+        self.port = port
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.failure_rate = failure_rate
+        self.failure_status = failure_status
+        self.failure_mode = failure_mode
+        self.random = random.Random(seed)
+        self.routes = []
+        self.httpd = None
+        self.thread = None
+        self.lock = threading.Lock()
+        self.stats = {
+            'requests': 0,
+            'failures_injected': 0,
+            'by_path': {},
+            'unmatched': []
+        }
+        self.load()
+
+    def load(self):
+        manifest = os.path.join(self.fixture_dir, 'routes.json')
+        specs = []
+        if os.path.exists(manifest):
+            with open(manifest, 'r') as f:
+                specs.extend(json.load(f).get('routes', []))
+        for name in sorted(os.listdir(self.fixture_dir)):
+            if name.endswith('.har'):
+                specs.extend(load_har_routes(os.path.join(self.fixture_dir, name)))
+        self.routes = [FixtureRoute(spec, self.fixture_dir) for spec in specs]
+        logger.info(f"Loaded {len(self.routes)} fixture routes from {self.fixture_dir}")
+
+    def find_route(self, method: str, path: str, query: Dict[str, List[str]]) -> Optional[FixtureRoute]:
+        for route in self.routes:
+            if route.matches(method, path, query):
+                return route
+        return None
+
+    def record_request(self, method: str, path: str, route: Optional[FixtureRoute]):
+        with self.lock:
+            self.stats['requests'] += 1
+            key = f"{method} {path}"
+            self.stats['by_path'][key] = self.stats['by_path'].get(key, 0) + 1
+            if route is None and key not in self.stats['unmatched']:
+                self.stats['unmatched'].append(key)
+
+    def apply_latency(self, route: Optional[FixtureRoute]):
+        latency = route.latency_ms if route and route.latency_ms is not None else self.latency_ms
+        if self.jitter_ms:
+            latency += self.random.uniform(0, self.jitter_ms)
+        if latency > 0:
+            time.sleep(latency / 1000)
+
+    def should_fail(self, route: Optional[FixtureRoute]) -> bool:
+        rate = route.failure_rate if route and route.failure_rate is not None else self.failure_rate
+        return rate > 0 and self.random.random() < rate
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def start(self):
+        self.httpd = ThreadingHTTPServer((self.host, self.port), FixtureRequestHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.fixture = self
+        self.port = self.httpd.server_address[1]
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        logger.info(f"Fixture server for {self.fixture_dir} listening on {self.base_url}")
+        return self
+
+    def stop(self):
+        if self.httpd:
+            self.httpd.shutdown()
+            self.httpd.server_close()
+            self.httpd = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Replay recorded portal responses for offline scraper runs')
+    parser.add_argument('fixture_dir', help='Directory with routes.json and/or *.har recordings')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8800)
+    parser.add_argument('--latency-ms', type=float, default=0, help='Delay added to every response')
+    parser.add_argument('--jitter-ms', type=float, default=0, help='Random extra delay up to this many ms')
+    parser.add_argument('--failure-rate', type=float, default=0.0, help='Fraction of requests that fail')
+    parser.add_argument('--failure-status', type=int, default=503, help='HTTP status for injected failures')
+    parser.add_argument('--failure-mode', choices=['status', 'drop'], default='status',
+                        help="'status' returns an error response, 'drop' closes the connection")
+    parser.add_argument('--seed', type=int, help='Random seed for reproducible failure injection')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    server = FixtureServer(args.fixture_dir, args.host, args.port, args.latency_ms, args.jitter_ms,
+                           args.failure_rate, args.failure_status, args.failure_mode, args.seed)
+    server.start()
+    print(f"Serving {args.fixture_dir} at {server.base_url} - press Ctrl+C to stop")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+        print(json.dumps(server.stats, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Hot-Standby Browsers for EG4-SRP Monitor
+Keeps a pre-launched, pre-authenticated spare monitor per critical source so a
+failed browser can be swapped out immediately while a new spare is built
+"""
+
+import asyncio
+import logging
+import time
+from typing import Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+# Wait this long before building a new spare after a failed build
+BUILD_RETRY_SECONDS = 300
+
+
+class HotStandby:
+    """Builds, keeps warm and promotes a spare monitor for one source
+
+    The factory returns a new monitor instance. Monitors used here provide
+    start(), ensure_session(), promote(standby) and close().
+    """
+
+    def __init__(self, source: str, factory: Callable, keepalive_seconds: float = 600):
+        self.source = source
+        self.factory = factory
+        self.keepalive_seconds = keepalive_seconds
+        self.spare = None
+        self.build_task = None
+        # Background closes of retired browsers, referenced until done so they are not garbage-collected
+        self.discard_tasks = set()
+        self.retry_after = 0.0
+        self.last_checked = 0.0
+        self.stats = {
+            'builds': 0,
+            'build_failures': 0,
+            'failovers': 0,
+            'last_build_seconds': None,
+            'last_failover_seconds': None,
+            'last_failover': None
+        }
+
+    @property
+    def ready(self) -> bool:
+        return self.spare is not None
+
+    @property
+    def building(self) -> bool:
+        return self.build_task is not None and not self.build_task.done()
+
+    def ensure_building(self):
+        """Start building a spare in the background unless one exists or is on the way"""
+        if self.spare or self.building or time.monotonic() < self.retry_after:
+            return
+        self.build_task = asyncio.create_task(self._build())
+
+    async def _build(self):
+        started = time.monotonic()
+        spare = self.factory()
+        try:
+            await spare.start()
+            if not await spare.ensure_session():
+                raise RuntimeError("standby could not log in")
+        except Exception as e:
+            self.stats['build_failures'] += 1
+            self.retry_after = time.monotonic() + BUILD_RETRY_SECONDS
+            logger.warning(f"{self.source.upper()} standby build failed, retrying in {BUILD_RETRY_SECONDS}s: {e}")
+            await self._discard(spare)
+            return
+        self.spare = spare
+        self.last_checked = time.monotonic()
+        self.stats['builds'] += 1
+        self.stats['last_build_seconds'] = round(time.monotonic() - started, 1)
+        logger.info(f"{self.source.upper()} standby ready in {self.stats['last_build_seconds']}s")
+
+    async def keep_warm(self):
+        """Revalidate the spare's session periodically, rebuilding it if it has lapsed"""
+        if self.spare and time.monotonic() - self.last_checked >= self.keepalive_seconds:
+            self.last_checked = time.monotonic()
+            try:
+                alive = await self.spare.ensure_session()
+            except Exception as e:
+                logger.warning(f"{self.source.upper()} standby keep-alive error: {e}")
+                alive = False
+            if not alive:
+                logger.warning(f"{self.source.upper()} standby session lapsed, rebuilding")
+                spare, self.spare = self.spare, None
+                await self._discard(spare)
+        self.ensure_building()
+
+    async def failover(self, active) -> bool:
+        """Swap the active monitor onto the spare's browser
+
+        The failed browser ends up in the old spare, which is closed in the
+        background while a replacement spare is built. Returns False when no
+        spare is ready.
+        """
+        spare, self.spare = self.spare, None
+        if not spare:
+            self.ensure_building()
+            return False
+        started = time.monotonic()
+        await active.promote(spare)
+        self.stats['failovers'] += 1
+        self.stats['last_failover_seconds'] = round(time.monotonic() - started, 2)
+        self.stats['last_failover'] = time.time()
+        logger.info(f"{self.source.upper()} failed over to standby browser in {self.stats['last_failover_seconds']}s")
+        task = asyncio.create_task(self._discard(spare))
+        self.discard_tasks.add(task)
+        task.add_done_callback(self.discard_tasks.discard)
+        self.retry_after = 0.0
+        self.ensure_building()
+        return True
+
+    def recycled(self):
+        """The spare's browser was relaunched: revalidate its session at the next keep_warm"""
+        self.last_checked = 0.0
+
+    async def _discard(self, monitor):
+        try:
+            await asyncio.wait_for(monitor.close(), timeout=30)
+        except Exception as e:
+            logger.warning(f"Error closing {self.source.upper()} standby browser: {e}")
+
+    async def close(self):
+        if self.building:
+            self.build_task.cancel()
+        if self.discard_tasks:
+            await asyncio.gather(*self.discard_tasks, return_exceptions=True)
+        if self.spare:
+            spare, self.spare = self.spare, None
+            await self._discard(spare)
+
+    def state(self) -> Dict:
+        return dict(self.stats, ready=self.ready, building=self.building)
+
+
+def swap_browser_state(active, standby, fields):
+    """Exchange browser-related attributes between an active monitor and its standby"""
+    for field in fields:
+        current = getattr(active, field)
+        setattr(active, field, getattr(standby, field))
+        setattr(standby, field, current)
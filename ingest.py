@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Bulk Ingest for EG4-SRP Monitor
+Parses batches of timestamped EG4 samples pushed by external collectors, either
+as JSON lines (one sample object per line) or as a compact columnar JSON body
+(one array per field), into rows for the batched storage path
+"""
+
+import json
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+JSONL_TYPES = ('application/x-ndjson', 'application/jsonl', 'application/x-jsonlines', 'text/plain')
+
+# Numeric fields of the monitor's EG4 data format, as dotted paths
+NUMERIC_FIELDS = (
+    'battery.soc', 'battery.power', 'battery.voltage',
+    'pv.power', 'pv.total_power',
+    'pv.strings.pv1.power', 'pv.strings.pv1.voltage',
+    'pv.strings.pv2.power', 'pv.strings.pv2.voltage',
+    'pv.strings.pv3.power', 'pv.strings.pv3.voltage',
+    'grid.power', 'grid.voltage',
+    'load.power'
+)
+# Sections of the EG4 data format, each an object when present
+SECTIONS = ('battery', 'pv', 'grid', 'load')
+
+# Timestamps further ahead than this are rejected as clock errors
+MAX_CLOCK_SKEW = timedelta(minutes=5)
+
+
+class IngestError(ValueError):
+    """Raised when a request body cannot be parsed as a batch at all"""
+
+
+def parse_timestamp(value) -> datetime:
+    """Parse an ISO 8601 string or epoch seconds/milliseconds into a naive local datetime
+
+    Stored EG4 timestamps are naive local time, so aware timestamps are
+    converted to the local timezone.
+    """
+    if isinstance(value, bool):
+        raise ValueError(f"invalid timestamp {value!r}")
+    if isinstance(value, (int, float)):
+        # Epoch milliseconds are beyond any plausible epoch seconds value
+        seconds = value / 1000 if value > 1e11 else value
+        return datetime.fromtimestamp(seconds)
+    if isinstance(value, str) and value:
+        timestamp = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        if timestamp.tzinfo is not None:
+            timestamp = timestamp.astimezone().replace(tzinfo=None)
+        return timestamp
+    raise ValueError(f"invalid timestamp {value!r}")
+
+
+def get_path(data: Dict, path: str):
+    value = data
+    for key in path.split('.'):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+    return value
+
+
+def set_path(data: Dict, path: str, value):
+    keys = path.split('.')
+    for key in keys[:-1]:
+        data = data.setdefault(key, {})
+        if not isinstance(data, dict):
+            raise IngestError(f"column {path} conflicts with column {key}")
+    data[keys[-1]] = value
+
+
+def check_sample(data: Dict) -> Optional[str]:
+    """Reason a sample's known fields are unusable, or None"""
+    for section in SECTIONS:
+        if section in data and not isinstance(data[section], dict):
+            return f"{section} must be an object"
+    pv = data.get('pv', {})
+    if 'strings' in pv:
+        if not isinstance(pv['strings'], dict):
+            return "pv.strings must be an object"
+        for name, string in pv['strings'].items():
+            if not isinstance(string, dict):
+                return f"pv.strings.{name} must be an object"
+    for path in NUMERIC_FIELDS:
+        value = get_path(data, path)
+        if value is not None and (isinstance(value, bool) or not isinstance(value, (int, float))):
+            return f"{path} must be a number"
+    return None
+
+
+def build_row(index: int, sample, default_device: Optional[str], validate: Callable[[Dict], bool],
+              latest_allowed: datetime) -> Tuple[Optional[Tuple], Optional[Dict]]:
+    """Turn one parsed sample into a (timestamp, device, data) row, or an error entry"""
+    if not isinstance(sample, dict):
+        return None, {'index': index, 'error': 'sample must be an object'}
+    data = dict(sample)
+    device = data.pop('device', None) or default_device
+    if not device or not isinstance(device, str):
+        return None, {'index': index, 'error': 'missing device'}
+    try:
+        timestamp = parse_timestamp(data.pop('timestamp', None))
+    except (TypeError, ValueError, OverflowError, OSError) as e:
+        return None, {'index': index, 'error': str(e)}
+    if timestamp > latest_allowed:
+        return None, {'index': index, 'error': 'timestamp is in the future'}
+
+    error = check_sample(data)
+    if error:
+        return None, {'index': index, 'error': error}
+    # Older collectors only send one of the two PV totals
+    pv = data.get('pv')
+    if isinstance(pv, dict):
+        if pv.get('power') is None and pv.get('total_power') is not None:
+            pv['power'] = pv['total_power']
+        elif pv.get('total_power') is None and pv.get('power') is not None:
+            pv['total_power'] = pv['power']
+    try:
+        valid = validate(data)
+    except Exception as e:
+        return None, {'index': index, 'error': f"failed EG4 data validation: {e}"}
+    if not valid:
+        return None, {'index': index, 'error': 'failed EG4 data validation'}
+
+    data.setdefault('source', 'ingest')
+    return (timestamp, device, data), None
+
+
+def parse_jsonl(body: str) -> List:
+    """One JSON sample object per non-empty line"""
+    samples = []
+    for number, line in enumerate(body.splitlines(), 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            samples.append(json.loads(line))
+        except json.JSONDecodeError as e:
+            # Keep the position so the sample is reported rather than failing the batch
+            samples.append(IngestError(f"line {number}: {e.msg}"))
+    return samples
+
+
+def parse_columnar(body: str) -> Tuple[List[Dict], Optional[str]]:
+    """{"device": ..., "columns": {"timestamp": [...], "battery.soc": [...], ...}} into sample objects"""
+    try:
+        document = json.loads(body)
+    except json.JSONDecodeError as e:
+        raise IngestError(f"invalid JSON: {e.msg}")
+    if not isinstance(document, dict) or not isinstance(document.get('columns'), dict):
+        raise IngestError("columnar body needs a 'columns' object of equal-length arrays")
+
+    columns = document['columns']
+    if not columns or not all(isinstance(values, list) for values in columns.values()):
+        raise IngestError("columns must all be arrays")
+    lengths = {len(values) for values in columns.values()}
+    if len(lengths) != 1:
+        raise IngestError("columns must all have the same length")
+
+    count = lengths.pop()
+    fields = list(columns.items())
+    samples = []
+    for index in range(count):
+        sample = {}
+        for path, values in fields:
+            if values[index] is not None:
+                set_path(sample, path, values[index])
+        samples.append(sample)
+    return samples, document.get('device')
+
+
+def parse_batch(body: str, content_type: str, default_device: Optional[str],
+                validate: Callable[[Dict], bool]) -> Tuple[List[Tuple], List[Dict], int]:
+    """Parse a request body into (rows, errors, sample count)
+
+    Raises IngestError when the body as a whole is unusable. Individual
+    samples that fail are reported in errors by their position in the batch.
+    """
+    media_type = (content_type or '').split(';')[0].strip().lower()
+    if media_type in JSONL_TYPES:
+        samples = parse_jsonl(body)
+    elif media_type == 'application/json':
+        samples, body_device = parse_columnar(body)
+        default_device = body_device or default_device
+    else:
+        raise IngestError(f"unsupported content type {media_type or 'none'}, "
+                          f"use application/x-ndjson or columnar application/json")
+
+    latest_allowed = datetime.now() + MAX_CLOCK_SKEW
+    rows, errors = [], []
+    for index, sample in enumerate(samples):
+        if isinstance(sample, IngestError):
+            errors.append({'index': index, 'error': str(sample)})
+            continue
+        row, error = build_row(index, sample, default_device, validate, latest_allowed)
+        if row:
+            rows.append(row)
+        else:
+            errors.append(error)
+    return rows, errors, len(samples)
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Live State Versioning for EG4-SRP Monitor
+Keeps the state pushed to dashboard clients per topic (eg4, srp, enphase and
+one device:<name> per additional inverter) under one increasing sequence number. Clients get a full snapshot when
+they connect and JSON merge patches (RFC 7386) of the fields that changed
+afterwards, and a reconnecting client is sent only the patches it missed
+"""
+
+import json
+import logging
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Keys never sent to clients, at any depth (raw DOM strings kept for log diagnostics)
+WIRE_EXCLUDED_KEYS = frozenset({'debug'})
+
+
+def wire_size(payload) -> int:
+    """Approximate bytes of a payload on the wire, as Socket.IO serializes it to JSON"""
+    return len(json.dumps(payload, separators=(',', ':'), default=str))
+
+
+def strip_debug(data):
+    """A copy of data without WIRE_EXCLUDED_KEYS, with values made JSON-safe"""
+    if isinstance(data, dict):
+        return {key: strip_debug(value) for key, value in data.items() if key not in WIRE_EXCLUDED_KEYS}
+    if isinstance(data, (list, tuple)):
+        return [strip_debug(value) for value in data]
+    if data is None or isinstance(data, (str, int, float, bool)):
+        return data
+    return str(data)
+
+
+def merge_patch(old: Dict, new: Dict) -> Dict:
+    """RFC 7386 merge patch turning old into new: changed leaves, with None for removed keys
+
+    Lists are replaced as a whole. A value that is itself None reads as a removal
+    on the client, which for this state is the same as a missing reading.
+    """
+    patch = {}
+    for key, value in new.items():
+        previous = old.get(key)
+        if isinstance(value, dict) and isinstance(previous, dict):
+            nested = merge_patch(previous, value)
+            if nested:
+                patch[key] = nested
+        elif key not in old or previous != value or type(previous) is not type(value):
+            patch[key] = value
+    for key in old:
+        if key not in new:
+            patch[key] = None
+    return patch
+
+
+def apply_patch(state: Dict, patch: Dict) -> Dict:
+    """Apply a merge patch in place, as the dashboard does"""
+    for key, value in patch.items():
+        if value is None:
+            state.pop(key, None)
+        elif isinstance(value, dict):
+            target = state.get(key)
+            if not isinstance(target, dict):
+                target = state[key] = {}
+            apply_patch(target, value)
+        else:
+            state[key] = value
+    return state
+
+
+class LiveState:
+    """Versioned per-topic state with a bounded log of patches for reconnecting clients"""
+
+    def __init__(self, history: int = 500):
+        self.seq = 0
+        self.topics = {}
+        # Sequence number of each topic's latest delta, sent as prev with the next one
+        self.topic_seq = {}
+        self.log = deque(maxlen=history)
+        self.lock = threading.Lock()
+        self.started = time.time()
+        # Distinguishes this process's sequence numbers from those of a previous run
+        self.epoch = f'{int(self.started * 1000):x}'
+        # Bytes of every broadcast, as the full payloads previously sent and as patches
+        self.wire = {'messages': 0, 'full_bytes': 0, 'delta_bytes': 0, 'debug_bytes': 0}
+
+    def set_history(self, history: int):
+        with self.lock:
+            self.log = deque(self.log, maxlen=history)
+
+    def update(self, topic: str, data: Dict) -> Optional[Dict]:
+        """Record new state for a topic and return the delta message, or None when nothing changed
+
+        A client that only watches some topics sees gaps in seq, so each delta
+        also carries prev, the seq of the topic's previous delta.
+        """
+        new = strip_debug(data)
+        with self.lock:
+            old = self.topics.get(topic, {})
+            patch = merge_patch(old, new)
+            # What was broadcast before: the whole payload, debug block included
+            full_bytes = wire_size(data)
+            self.wire['full_bytes'] += full_bytes
+            self.wire['debug_bytes'] += full_bytes - wire_size(new)
+            self.wire['messages'] += 1
+            if not patch:
+                return None
+            self.seq += 1
+            self.topics[topic] = new
+            message = {'seq': self.seq, 'prev': self.topic_seq.get(topic, 0), 'topic': topic, 'patch': patch}
+            self.topic_seq[topic] = self.seq
+            self.log.append(message)
+            self.wire['delta_bytes'] += wire_size(message)
+            return message
+
+    def snapshot(self, visible: Optional[Callable[[str], bool]] = None) -> Dict:
+        """State of every topic, or of those visible returns True for"""
+        with self.lock:
+            topics = {topic: state for topic, state in self.topics.items() if visible is None or visible(topic)}
+            return {
+                'epoch': self.epoch,
+                'seq': self.seq,
+                'topic_seq': {topic: self.topic_seq[topic] for topic in topics},
+                'topics': json.loads(json.dumps(topics))
+            }
+
+    def since(self, seq: int, epoch: Optional[str] = None,
+              visible: Optional[Callable[[str], bool]] = None) -> Optional[List[Dict]]:
+        """Patches after seq, or None when the log no longer reaches back that far or seq is from another run"""
+        with self.lock:
+            if epoch != self.epoch or seq > self.seq or seq < 0:
+                return None
+            if seq == self.seq:
+                return []
+            if not self.log or self.log[0]['seq'] > seq + 1:
+                return None
+            return [message for message in self.log
+                    if message['seq'] > seq and (visible is None or visible(message['topic']))]
+
+    def stats(self, clients: int = 0) -> Dict:
+        """Broadcast volume per client per hour, before (full payloads) and after (patches)"""
+        hours = max((time.time() - self.started) / 3600, 1 / 60)
+        with self.lock:
+            wire = dict(self.wire)
+        return {
+            'seq': self.seq,
+            'clients': clients,
+            'messages': wire['messages'],
+            'full_bytes_per_client_hour': round(wire['full_bytes'] / hours),
+            'delta_bytes_per_client_hour': round(wire['delta_bytes'] / hours),
+            'debug_bytes_per_client_hour': round(wire['debug_bytes'] / hours),
+            'reduction': round(1 - wire['delta_bytes'] / wire['full_bytes'], 3) if wire['full_bytes'] else None
+        }
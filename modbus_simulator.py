@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Modbus/TCP Inverter Simulator for EG4-SRP Monitor
+Serves an EG4/Luxpower register map over Modbus/TCP so the Modbus data source
+can be exercised and benchmarked without an inverter on the LAN
+
+Usage:
+    python modbus_simulator.py --port 5020
+    python modbus_simulator.py --port 5020 --vary --latency-ms 20
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import struct
+import threading
+import time
+from typing import Dict, Optional
+
+from modbus_source import (LUXPOWER_INPUT_REGISTERS, BYTE_PACKED_REGISTERS, READ_HOLDING_REGISTERS,
+                           READ_INPUT_REGISTERS, MAX_REGISTERS_PER_READ)
+
+logger = logging.getLogger(__name__)
+
+# Runtime values matching the EG4 portal fixture, in register units
+DEFAULT_VALUES = {
+    'soc': 85,
+    'pCharge': 1200,
+    'pDisCharge': 0,
+    'vBat': 532,
+    'ppv1': 1800,
+    'vpv1': 3805,
+    'ppv2': 1500,
+    'vpv2': 3710,
+    'ppv3': 0,
+    'vpv3': 0,
+    'pToGrid': 0,
+    'pToUser': 350,
+    'vacr': 2416,
+    'pinv': 1750,
+    'prec': 0
+}
+REGISTER_SPACE = 256
+STATE_OF_HEALTH = 100
+
+
+class ModbusSimulator:
+    """Threaded asyncio Modbus/TCP server answering register reads from an in-memory map"""
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, unit_id: int = 1,
+                 values: Optional[Dict[str, int]] = None, latency_ms: float = 0,
+                 vary: bool = False, seed: Optional[int] = None):
+        self.host = host
+        self.port = port
+        self.unit_id = unit_id
+        self.latency_ms = latency_ms
+        self.vary = vary
+        self.random = random.Random(seed)
+        self.registers = [0] * REGISTER_SPACE
+        self.lock = threading.Lock()
+        self.loop = None
+        self.server = None
+        self.thread = None
+        self.ready = threading.Event()
+        self.stats = {'connections': 0, 'requests': 0, 'exceptions': 0}
+        self.set_values(dict(DEFAULT_VALUES, **(values or {})))
+
+    def set_values(self, values: Dict[str, int]):
+        """Set registers by their runtime field names"""
+        with self.lock:
+            for name, value in values.items():
+                address = LUXPOWER_INPUT_REGISTERS[name]
+                if name in BYTE_PACKED_REGISTERS:
+                    value = (STATE_OF_HEALTH << 8) | (int(value) & 0xFF)
+                self.registers[address] = int(value) & 0xFFFF
+
+    def drift(self):
+        """Random-walk the PV and load power registers, as a live inverter would"""
+        with self.lock:
+            for name in ('ppv1', 'ppv2', 'pinv'):
+                address = LUXPOWER_INPUT_REGISTERS[name]
+                self.registers[address] = max(0, min(0xFFFF, self.registers[address] + self.random.randint(-50, 50)))
+
+    def answer(self, unit_id: int, pdu: bytes) -> bytes:
+        function = pdu[0]
+        if unit_id != self.unit_id:
+            return bytes([function | 0x80, 11])
+        if function not in (READ_HOLDING_REGISTERS, READ_INPUT_REGISTERS) or len(pdu) != 5:
+            return bytes([function | 0x80, 1])
+        address, count = struct.unpack('>HH', pdu[1:5])
+        if not 1 <= count <= MAX_REGISTERS_PER_READ:
+            return bytes([function | 0x80, 3])
+        if address + count > REGISTER_SPACE:
+            return bytes([function | 0x80, 2])
+        if self.vary:
+            self.drift()
+        with self.lock:
+            values = self.registers[address:address + count]
+        return struct.pack(f'>BB{count}H', function, count * 2, *values)
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.stats['connections'] += 1
+        try:
+            while True:
+                transaction_id, protocol, length, unit_id = struct.unpack('>HHHB', await reader.readexactly(7))
+                pdu = await reader.readexactly(length - 1)
+                self.stats['requests'] += 1
+                if self.latency_ms:
+                    await asyncio.sleep(self.latency_ms / 1000)
+                response = self.answer(unit_id, pdu)
+                if response[0] & 0x80:
+                    self.stats['exceptions'] += 1
+                writer.write(struct.pack('>HHHB', transaction_id, protocol, len(response) + 1, unit_id) + response)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            writer.close()
+
+    def run(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.server = self.loop.run_until_complete(asyncio.start_server(self.handle, self.host, self.port))
+        self.port = self.server.sockets[0].getsockname()[1]
+        self.ready.set()
+        try:
+            self.loop.run_forever()
+        finally:
+            self.server.close()
+            # Drop clients still connected, their handlers would otherwise outlive the loop
+            connections = asyncio.all_tasks(self.loop)
+            for task in connections:
+                task.cancel()
+            self.loop.run_until_complete(asyncio.gather(*connections, return_exceptions=True))
+            self.loop.run_until_complete(self.server.wait_closed())
+            self.loop.close()
+
+    def start(self):
+        self.thread = threading.Thread(target=self.run, name="ModbusSimulator", daemon=True)
+        self.thread.start()
+        self.ready.wait()
+        logger.info(f"Modbus simulator listening on {self.host}:{self.port} (unit {self.unit_id})")
+        return self
+
+    def stop(self):
+        if self.loop and self.thread:
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self.thread.join(timeout=5)
+            self.thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve a simulated EG4/Luxpower inverter over Modbus/TCP')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=5020)
+    parser.add_argument('--unit-id', type=int, default=1)
+    parser.add_argument('--latency-ms', type=float, default=0, help='Delay added to every response')
+    parser.add_argument('--vary', action='store_true', help='Random-walk PV and load power on every read')
+    parser.add_argument('--seed', type=int, help='Random seed for reproducible variation')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    simulator = ModbusSimulator(args.host, args.port, args.unit_id, latency_ms=args.latency_ms,
+                                vary=args.vary, seed=args.seed)
+    simulator.start()
+    print(f"Simulating an inverter at {args.host}:{simulator.port} - press Ctrl+C to stop")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        simulator.stop()
+        print(json.dumps(simulator.stats, indent=2))
+
+
+if __name__ == '__main__':
+    main()
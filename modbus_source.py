@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Modbus/TCP Inverter Source for EG4-SRP Monitor
+Reads EG4/Luxpower inverter input registers over Modbus/TCP on the LAN, either
+from the inverter itself or through the WiFi dongle's TCP port, with a small
+asyncio client. Samples take milliseconds and need no browser or portal login.
+"""
+
+import asyncio
+import logging
+import struct
+import time
+from typing import Dict, List, Optional
+
+from eg4_http_client import parse_runtime_payload
+
+logger = logging.getLogger(__name__)
+
+READ_HOLDING_REGISTERS = 0x03
+READ_INPUT_REGISTERS = 0x04
+MAX_REGISTERS_PER_READ = 125
+
+# Input register addresses of the EG4/Luxpower runtime block, named after the
+# matching getInverterRuntime fields so the portal parser can be reused. Voltages
+# are in tenths of a volt, as in the portal's payload.
+LUXPOWER_INPUT_REGISTERS = {
+    'vpv1': 1,
+    'vpv2': 2,
+    'vpv3': 3,
+    'vBat': 4,
+    'soc': 5,          # Low byte SOC, high byte SOH
+    'ppv1': 7,
+    'ppv2': 8,
+    'ppv3': 9,
+    'pCharge': 10,
+    'pDisCharge': 11,
+    'vacr': 12,
+    'pinv': 16,        # Inverter output power
+    'prec': 17,        # Power rectified from the grid into the battery
+    'pToGrid': 26,
+    'pToUser': 27
+}
+BYTE_PACKED_REGISTERS = {'soc'}
+
+EXCEPTION_CODES = {
+    1: 'illegal function',
+    2: 'illegal data address',
+    3: 'illegal data value',
+    4: 'server device failure',
+    6: 'server device busy',
+    10: 'gateway path unavailable',
+    11: 'gateway target device failed to respond'
+}
+
+
+class ModbusError(Exception):
+    """Raised when the device answers with a Modbus exception or a malformed response"""
+
+
+class ModbusTCPClient:
+    """Minimal asyncio Modbus/TCP client for register reads over one persistent connection
+
+    Requests are serialized on the connection. Any error closes it, and the
+    next request reconnects.
+    """
+
+    def __init__(self, host: str, port: int = 502, unit_id: int = 1, timeout: float = 2.0):
+        self.host = host
+        self.port = port
+        self.unit_id = unit_id
+        self.timeout = timeout
+        self.reader = None
+        self.writer = None
+        self.transaction_id = 0
+        self.lock = asyncio.Lock()
+
+    @property
+    def connected(self) -> bool:
+        return self.writer is not None and not self.writer.is_closing()
+
+    async def connect(self):
+        self.reader, self.writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port), timeout=self.timeout
+        )
+        logger.info(f"Modbus/TCP connected to {self.host}:{self.port} (unit {self.unit_id})")
+
+    async def close(self):
+        if self.writer:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except Exception:
+                pass
+        self.reader = None
+        self.writer = None
+
+    async def read_registers(self, address: int, count: int, function: int = READ_INPUT_REGISTERS) -> List[int]:
+        """Read count 16-bit registers starting at address"""
+        if not 1 <= count <= MAX_REGISTERS_PER_READ:
+            raise ValueError(f"Can read 1-{MAX_REGISTERS_PER_READ} registers at once, not {count}")
+        async with self.lock:
+            try:
+                if not self.connected:
+                    await self.connect()
+                return await asyncio.wait_for(self._request(address, count, function), timeout=self.timeout)
+            except Exception:
+                await self.close()
+                raise
+
+    async def _request(self, address: int, count: int, function: int) -> List[int]:
+        self.transaction_id = (self.transaction_id + 1) % 0x10000
+        pdu = struct.pack('>BHH', function, address, count)
+        self.writer.write(struct.pack('>HHHB', self.transaction_id, 0, len(pdu) + 1, self.unit_id) + pdu)
+        await self.writer.drain()
+
+        transaction_id, protocol, length, _ = struct.unpack('>HHHB', await self.reader.readexactly(7))
+        response = await self.reader.readexactly(length - 1)
+        if transaction_id != self.transaction_id or protocol != 0:
+            raise ModbusError(f"Unexpected response (transaction {transaction_id}, protocol {protocol})")
+        if response[0] == function | 0x80:
+            code = response[1]
+            raise ModbusError(f"Modbus exception {code}: {EXCEPTION_CODES.get(code, 'unknown')}")
+        if response[0] != function or len(response) < 2 or response[1] != count * 2:
+            raise ModbusError(f"Malformed response to function {function}")
+        return list(struct.unpack(f'>{count}H', response[2:2 + count * 2]))
+
+
+def decode_runtime_registers(registers: List[int], register_map: Dict[str, int] = None) -> Dict:
+    """Turn a register block starting at address 0 into a getInverterRuntime-style payload"""
+    register_map = register_map or LUXPOWER_INPUT_REGISTERS
+    payload = {}
+    for name, address in register_map.items():
+        value = registers[address] if address < len(registers) else 0
+        payload[name] = value & 0xFF if name in BYTE_PACKED_REGISTERS else value
+    # The inverter does not report household load, derive it from the power flows
+    payload['consumptionPower'] = max(0, payload.get('pinv', 0) + payload.get('pToUser', 0)
+                                      - payload.get('prec', 0) - payload.get('pToGrid', 0))
+    return payload
+
+
+class ModbusInverterSource:
+    """Polls one inverter's runtime registers into the monitor's EG4 data format"""
+
+    def __init__(self, host: str, port: int = 502, unit_id: int = 1, timeout: float = 2.0,
+                 register_map: Optional[Dict[str, int]] = None):
+        self.client = ModbusTCPClient(host, port, unit_id, timeout)
+        self.register_map = register_map or LUXPOWER_INPUT_REGISTERS
+        self.register_count = max(self.register_map.values()) + 1
+        self.stats = {
+            'requests': 0,
+            'failures': 0,
+            'last_latency_ms': None,
+            'last_success': None,
+            'last_error': None
+        }
+        self.last_success_monotonic = None
+        self.created_monotonic = time.monotonic()
+
+    def fresh(self, max_age: float) -> bool:
+        """True when a sample was read within the last max_age seconds"""
+        return (self.last_success_monotonic is not None and
+                time.monotonic() - self.last_success_monotonic <= max_age)
+
+    async def get_data(self) -> Dict:
+        """Read the runtime registers and convert them, raising on any failure"""
+        self.stats['requests'] += 1
+        started = time.perf_counter()
+        try:
+            registers = await self.client.read_registers(0, self.register_count)
+        except Exception as e:
+            self.stats['failures'] += 1
+            self.stats['last_error'] = str(e) or type(e).__name__
+            raise
+        self.stats['last_latency_ms'] = round((time.perf_counter() - started) * 1000, 1)
+        self.stats['last_success'] = time.time()
+        self.stats['last_error'] = None
+        self.last_success_monotonic = time.monotonic()
+
+        data = parse_runtime_payload(decode_runtime_registers(registers, self.register_map))
+        data['source'] = 'modbus'
+        return data
+
+    async def close(self):
+        await self.client.close()
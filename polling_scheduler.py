@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Adaptive Polling Scheduler for EG4-SRP Monitor
+Adjusts each source's polling interval within configured bounds based on how fast
+its values are changing, how close they are to an alert threshold and time of day
+"""
+
+import logging
+import time
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Default interval bounds per source (seconds)
+DEFAULT_SOURCE_BOUNDS = {
+    'eg4': {'min_interval': 30, 'max_interval': 120, 'base_interval': 60},
+    'enphase': {'min_interval': 60, 'max_interval': 900, 'base_interval': 60}
+}
+
+# Change that counts as "significant" per field - a delta of one scale unit scores 1.0
+DEFAULT_CHANGE_SCALES = {
+    'battery_soc': 2,
+    'battery_power': 500,
+    'pv_power': 500,
+    'grid_power': 500,
+    'load_power': 500,
+    'latest_power_w': 500,
+    'today_energy_kwh': 0.5
+}
+
+# Samples scoring below this are "flat" and do not count as useful
+FLAT_THRESHOLD = 0.1
+
+
+class SourceSchedule:
+    """Polling state and cost accounting for one data source"""
+
+    def __init__(self, name: str, min_interval: float, max_interval: float, base_interval: float):
+        self.name = name
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.interval = base_interval
+        self.base_interval = base_interval
+        self.next_due = 0.0
+        self.last_values = None
+        self.last_decision = None
+        self.samples = 0
+        self.useful_samples = 0
+        self.failures = 0
+        self.scrape_seconds = 0.0
+
+    def state(self) -> Dict:
+        return {
+            'interval': round(self.interval, 1),
+            'min_interval': self.min_interval,
+            'max_interval': self.max_interval,
+            'due_in': round(max(0.0, self.next_due - time.monotonic()), 1),
+            'samples': self.samples,
+            'useful_samples': self.useful_samples,
+            'failures': self.failures,
+            'scrape_seconds': round(self.scrape_seconds, 1),
+            'cost_per_useful_sample': (round(self.scrape_seconds / self.useful_samples, 2)
+                                       if self.useful_samples else None),
+            'last_decision': self.last_decision
+        }
+
+
+class AdaptiveScheduler:
+    """Per-source polling intervals driven by rate of change, alert proximity and time of day"""
+
+    def __init__(self, config: Optional[Dict] = None):
+        config = config or {}
+        self.night_start_hour = config.get('night_start_hour', 20)
+        self.night_end_hour = config.get('night_end_hour', 6)
+        self.change_scales = dict(DEFAULT_CHANGE_SCALES)
+        self.change_scales.update(config.get('change_scales', {}))
+        self.sources = {}
+        source_config = config.get('sources', {})
+        for name, defaults in DEFAULT_SOURCE_BOUNDS.items():
+            bounds = dict(defaults)
+            bounds.update(source_config.get(name, {}))
+            self.sources[name] = SourceSchedule(name, **bounds)
+
+    def is_due(self, source: str) -> bool:
+        schedule = self.sources.get(source)
+        return schedule is None or time.monotonic() >= schedule.next_due
+
+    def seconds_until_next(self, sources: Optional[List[str]] = None) -> float:
+        """Seconds until the earliest of the given sources is due"""
+        names = sources or list(self.sources)
+        now = time.monotonic()
+        return max(0.0, min(self.sources[name].next_due - now for name in names if name in self.sources))
+
+    def is_night(self, hour: int) -> bool:
+        if self.night_start_hour > self.night_end_hour:
+            return hour >= self.night_start_hour or hour < self.night_end_hour
+        return self.night_start_hour <= hour < self.night_end_hour
+
+    def change_score(self, source: SourceSchedule, values: Dict[str, float]) -> float:
+        """Largest scaled change between this sample and the previous one"""
+        if source.last_values is None:
+            return 1.0
+        score = 0.0
+        for field, value in values.items():
+            previous = source.last_values.get(field)
+            scale = self.change_scales.get(field)
+            if previous is None or not scale:
+                continue
+            try:
+                score = max(score, abs(float(value) - float(previous)) / scale)
+            except (TypeError, ValueError):
+                continue
+        return score
+
+    def record_sample(self, source: str, values: Dict[str, float], hour: int,
+                      alert_proximity: float = 0.0, scrape_seconds: float = 0.0) -> float:
+        """Record a successful sample and schedule the next poll
+
+        alert_proximity is 0 when far from any alert condition and 1 at the threshold.
+        Returns the chosen interval in seconds.
+        """
+        schedule = self.sources[source]
+        change = self.change_score(schedule, values)
+        proximity = max(0.0, min(1.0, alert_proximity))
+        night = self.is_night(hour)
+        urgency = min(1.0, max(change, proximity))
+
+        if urgency >= FLAT_THRESHOLD:
+            interval = schedule.max_interval - urgency * (schedule.max_interval - schedule.min_interval)
+            reason = 'alert proximity' if proximity >= change else 'changing'
+        else:
+            # Flat values: back off gradually toward the maximum interval
+            interval = schedule.interval * 1.5
+            reason = 'flat'
+        if night and proximity < FLAT_THRESHOLD and change < 0.5:
+            interval = schedule.max_interval
+            reason = 'night'
+        interval = max(schedule.min_interval, min(schedule.max_interval, interval))
+
+        schedule.samples += 1
+        if change >= FLAT_THRESHOLD:
+            schedule.useful_samples += 1
+        schedule.scrape_seconds += scrape_seconds
+        schedule.last_values = dict(values)
+        schedule.interval = interval
+        schedule.next_due = time.monotonic() + interval
+        schedule.last_decision = {
+            'interval': round(interval, 1),
+            'reason': reason,
+            'change': round(change, 2),
+            'proximity': round(proximity, 2),
+            'night': night,
+            'scrape_seconds': round(scrape_seconds, 2),
+            'timestamp': time.time()
+        }
+        logger.info(f"Scheduler {source}: next poll in {interval:.0f}s ({reason}, change={change:.2f}, "
+                    f"proximity={proximity:.2f}, night={night}, scrape={scrape_seconds:.1f}s)")
+        return interval
+
+    def record_failure(self, source: str, scrape_seconds: float = 0.0) -> float:
+        """Record a failed poll and retry at the base interval"""
+        schedule = self.sources[source]
+        schedule.failures += 1
+        schedule.scrape_seconds += scrape_seconds
+        schedule.interval = schedule.base_interval
+        schedule.next_due = time.monotonic() + schedule.base_interval
+        schedule.last_decision = {
+            'interval': schedule.base_interval,
+            'reason': 'failure',
+            'scrape_seconds': round(scrape_seconds, 2),
+            'timestamp': time.time()
+        }
+        logger.info(f"Scheduler {source}: poll failed, retrying in {schedule.base_interval:.0f}s")
+        return schedule.base_interval
+
+    def defer(self, source: str, seconds: float):
+        """Push a source's next poll back without recording a sample, e.g. while its circuit is open"""
+        schedule = self.sources[source]
+        schedule.next_due = max(schedule.next_due, time.monotonic() + seconds)
+
+    def state(self) -> Dict:
+        return {name: schedule.state() for name, schedule in self.sources.items()}
+
+    def export_state(self) -> Dict:
+        """Intervals, last values and wall-clock due times per source, to carry across a restart"""
+        offset = time.time() - time.monotonic()
+        return {
+            name: {
+                'interval': schedule.interval,
+                'next_due_at': schedule.next_due + offset,
+                'last_values': schedule.last_values,
+                'samples': schedule.samples,
+                'useful_samples': schedule.useful_samples,
+                'failures': schedule.failures,
+                'scrape_seconds': schedule.scrape_seconds
+            }
+            for name, schedule in self.sources.items()
+        }
+
+    def restore_state(self, saved: Dict) -> List[str]:
+        """Resume from export_state output, returning the sources restored
+
+        Intervals are clamped to the current bounds, which may have changed
+        since the state was saved.
+        """
+        offset = time.time() - time.monotonic()
+        restored = []
+        for name, state in saved.items():
+            schedule = self.sources.get(name)
+            if schedule is None:
+                continue
+            try:
+                schedule.interval = max(schedule.min_interval, min(schedule.max_interval, float(state['interval'])))
+                schedule.next_due = min(float(state['next_due_at']) - offset, time.monotonic() + schedule.interval)
+                schedule.last_values = state.get('last_values')
+                for counter in ('samples', 'useful_samples', 'failures', 'scrape_seconds'):
+                    setattr(schedule, counter, state.get(counter, 0))
+            except (KeyError, TypeError, ValueError) as e:
+                logger.warning(f"Scheduler {name}: ignoring saved state ({e})")
+                continue
+            restored.append(name)
+        return restored
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Readiness Waits for EG4-SRP Monitor
+Replaces fixed sleeps in the scrapers with bounded waits on page conditions
+(URL changes, selectors, page functions, network idle). The old sleep becomes
+the ceiling, so a page that is ready early no longer costs the full delay.
+"""
+
+import logging
+import threading
+import time
+from typing import Awaitable, Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+
+class ReadinessWaits:
+    """Runs named readiness waits and tracks how much of each ceiling they use
+
+    A wait that reaches its ceiling is not an error: the scraper carries on
+    just as it did after the old fixed sleep.
+    """
+
+    def __init__(self):
+        self.stats = {}
+        self.lock = threading.Lock()
+
+    async def wait(self, name: str, waiter: Callable[..., Awaitable], ceiling: float, *args, **kwargs) -> bool:
+        """Await a Playwright wait_for_* call with the ceiling as its timeout
+
+        Returns True when the condition was met, False when the ceiling was
+        reached or the wait failed.
+        """
+        started = time.perf_counter()
+        try:
+            await waiter(*args, timeout=ceiling * 1000, **kwargs)
+            ready = True
+        except Exception as e:
+            # Playwright's TimeoutError, or the page navigated or closed mid-wait
+            logger.debug(f"Readiness wait '{name}' not met within {ceiling}s: {e}")
+            ready = False
+        self.record(name, ready, time.perf_counter() - started, ceiling)
+        return ready
+
+    def record(self, name: str, ready: bool, seconds: float, ceiling: float):
+        with self.lock:
+            stats = self.stats.setdefault(name, {
+                'waits': 0,
+                'ready': 0,
+                'ceiling_reached': 0,
+                'waited_seconds': 0.0,
+                'ceiling_seconds': 0.0
+            })
+            stats['waits'] += 1
+            stats['ready' if ready else 'ceiling_reached'] += 1
+            stats['waited_seconds'] += seconds
+            stats['ceiling_seconds'] += ceiling
+
+    def summary(self) -> Dict:
+        """Per-wait counts with average wait, ceiling and time saved against the fixed sleep"""
+        with self.lock:
+            items = [(name, dict(stats)) for name, stats in self.stats.items()]
+        summary = {}
+        for name, stats in items:
+            summary[name] = {
+                'waits': stats['waits'],
+                'ready': stats['ready'],
+                'ceiling_reached': stats['ceiling_reached'],
+                'average_seconds': round(stats['waited_seconds'] / stats['waits'], 3),
+                'ceiling': round(stats['ceiling_seconds'] / stats['waits'], 3),
+                'seconds_saved': round(stats['ceiling_seconds'] - stats['waited_seconds'], 1)
+            }
+        return summary
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Scrape Phase Timing for EG4-SRP Monitor
+Records how long each phase of a monitor's scrape takes (login, navigate, wait,
+extract, validate, store, emit) so scrapes can be compared across runs and
+against fixture replays, and keeps rolling percentiles per source and phase
+"""
+
+import functools
+import math
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+# Spans kept per source and phase for the rolling percentiles
+DEFAULT_WINDOW = 500
+
+
+def percentile(ordered, fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list: its ceil(fraction * n)-th value"""
+    # Rounded first, as 0.07 * 100 is 7.000000000000001
+    rank = math.ceil(round(fraction * len(ordered), 9))
+    index = max(0, min(len(ordered) - 1, rank - 1))
+    return ordered[index]
+
+
+class PhaseStats:
+    """Rolling window of phase durations per source, summarized as percentiles
+
+    Spans are recorded from the monitor thread and read by API requests, so
+    access goes through a lock.
+    """
+
+    def __init__(self, window: int = DEFAULT_WINDOW):
+        self.window = window
+        self.spans = {}  # (source, phase) -> deque of seconds
+        self.totals = {}  # (source, phase) -> [count, total seconds] since start
+        self.lock = threading.Lock()
+
+    def record(self, source: str, phase: str, seconds: float):
+        with self.lock:
+            key = (source, phase)
+            if key not in self.spans:
+                self.spans[key] = deque(maxlen=self.window)
+                self.totals[key] = [0, 0.0]
+            self.spans[key].append(seconds)
+            self.totals[key][0] += 1
+            self.totals[key][1] += seconds
+
+    @contextmanager
+    def span(self, source: str, phase: str):
+        """Time a block as one span of a source's phase"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(source, phase, time.perf_counter() - started)
+
+    def summary(self, source: Optional[str] = None) -> Dict:
+        """{source: {phase: percentiles}} over the rolling window, optionally for one source"""
+        with self.lock:
+            items = [(key, list(spans), list(self.totals[key])) for key, spans in self.spans.items()
+                     if source is None or key[0] == source]
+        summary = {}
+        for (span_source, phase), spans, (count, total) in items:
+            ordered = sorted(spans)
+            summary.setdefault(span_source, {})[phase] = {
+                'count': count,
+                'total_seconds': round(total, 3),
+                'window': len(ordered),
+                'last': round(spans[-1], 3),
+                'mean': round(sum(ordered) / len(ordered), 3),
+                'p50': round(percentile(ordered, 0.5), 3),
+                'p90': round(percentile(ordered, 0.9), 3),
+                'p99': round(percentile(ordered, 0.99), 3),
+                'max': round(ordered[-1], 3)
+            }
+        return summary
+
+    def reset(self):
+        with self.lock:
+            self.spans = {}
+            self.totals = {}
+
+
+class PhaseTimer:
+    """Per-monitor phase durations for the most recent scrape
+
+    begin() starts a scrape, lap(name) charges the time since the previous lap
+    to a phase, and phase(name) times a block explicitly. With a PhaseStats,
+    every lap and phase is also recorded there as a span of the timer's source.
+    """
+
+    def __init__(self, source: Optional[str] = None, stats: Optional[PhaseStats] = None):
+        self.source = source
+        self.stats = stats
+        self.scrape = {}
+        self.mark = time.perf_counter()
+
+    def begin(self):
+        self.scrape = {}
+        self.mark = time.perf_counter()
+
+    def lap(self, name: str):
+        now = time.perf_counter()
+        self._charge(name, now - self.mark)
+        self.mark = now
+
+    @contextmanager
+    def phase(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.mark = time.perf_counter()
+            self._charge(name, self.mark - started)
+
+    def _charge(self, name: str, seconds: float):
+        self.scrape[name] = self.scrape.get(name, 0.0) + seconds
+        if self.stats is not None and self.source:
+            self.stats.record(self.source, name, seconds)
+
+    def last_scrape(self) -> Dict[str, float]:
+        return {name: round(seconds, 3) for name, seconds in self.scrape.items()}
+
+
+def timed_phase(name: str):
+    """Decorator charging an async monitor method's duration to a phase of self.phases"""
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(self, *args, **kwargs):
+            with self.phases.phase(name):
+                return await func(self, *args, **kwargs)
+        return wrapper
+    return decorator
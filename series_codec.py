@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Series Codec for EG4-SRP Monitor
+Packs a window of samples into compact BLOBs, one per metric: timestamps as
+delta-of-delta integers and values as the XOR of each float with the previous
+one, as in Gorilla. Instead of Gorilla's bit-level stream the residuals are
+byte-shuffled and deflated, so encoding and decoding run as whole-array
+operations in C (array, itertools, zlib) rather than a Python loop per bit.
+"""
+
+import operator
+import sys
+import zlib
+from array import array
+from itertools import accumulate, chain
+from typing import Dict, List, Optional, Sequence
+
+FORMAT_VERSION = 1
+COMPRESSION_LEVEL = 6
+WORD_BYTES = 8
+
+# Metric name under which a chunk's timestamps are stored
+TIME_KEY = 'timestamp'
+
+
+class SeriesCodecError(ValueError):
+    """Raised when a BLOB is not a chunk this codec can decode"""
+
+
+def to_little_endian(words: array) -> array:
+    if sys.byteorder == 'big':
+        words.byteswap()
+    return words
+
+
+def shuffle(words: array) -> bytes:
+    """Group the nth byte of every word together, so the zero high bytes of small residuals form long runs"""
+    raw = to_little_endian(words).tobytes()
+    return b''.join(raw[index::WORD_BYTES] for index in range(WORD_BYTES))
+
+
+def unshuffle(data: bytes, typecode: str) -> array:
+    count = len(data) // WORD_BYTES
+    raw = bytearray(len(data))
+    for index in range(WORD_BYTES):
+        raw[index::WORD_BYTES] = data[index * count:(index + 1) * count]
+    return to_little_endian(array(typecode, bytes(raw)))
+
+
+def pack(words: array) -> bytes:
+    return bytes([FORMAT_VERSION]) + zlib.compress(shuffle(words), COMPRESSION_LEVEL)
+
+
+def unpack(blob: bytes, typecode: str) -> array:
+    if not blob or blob[0] != FORMAT_VERSION:
+        raise SeriesCodecError(f"unsupported series chunk format {blob[:1]!r}")
+    try:
+        return unshuffle(zlib.decompress(blob[1:]), typecode)
+    except zlib.error as e:
+        raise SeriesCodecError(f"corrupt series chunk: {e}")
+
+
+def encode_timestamps(offsets_ms: Sequence[int]) -> bytes:
+    """Millisecond offsets from the window start, as delta-of-delta integers
+
+    Samples at a steady interval leave all but the first two residuals zero.
+    """
+    deltas = list(map(operator.sub, offsets_ms, chain((0,), offsets_ms)))
+    return pack(array('q', map(operator.sub, deltas, chain((0,), deltas))))
+
+
+def decode_timestamps(blob: bytes) -> List[int]:
+    return list(accumulate(accumulate(unpack(blob, 'q'))))
+
+
+def encode_values(values: Sequence[Optional[float]]) -> bytes:
+    """Floats as the XOR of their bits with the previous value's, missing values as NaN
+
+    Unchanged values leave a zero word and slowly changing ones share their
+    sign, exponent and high mantissa bits, so most residual bytes are zero.
+    """
+    bits = array('Q', array('d', [float('nan') if value is None else value for value in values]).tobytes())
+    return pack(array('Q', map(operator.xor, bits, chain((0,), bits))))
+
+
+def decode_values(blob: bytes) -> array:
+    """Values as an array of doubles, with NaN where a sample had no value"""
+    return array('d', array('Q', accumulate(unpack(blob, 'Q'), operator.xor)).tobytes())
+
+
+def encode_chunk(offsets_ms: Sequence[int], columns: Dict[str, Sequence[Optional[float]]]) -> Dict[str, bytes]:
+    """One BLOB per metric plus TIME_KEY for the shared timestamps"""
+    blobs = {TIME_KEY: encode_timestamps(offsets_ms)}
+    for metric, values in columns.items():
+        if len(values) != len(offsets_ms):
+            raise ValueError(f"{metric} has {len(values)} values for {len(offsets_ms)} timestamps")
+        blobs[metric] = encode_values(values)
+    return blobs
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+SRP Export Store for EG4-SRP Monitor
+Content-hashes each downloaded SRP CSV export, discards exports identical to the
+current one, recognizes exports that only add new days, and prunes old files
+"""
+
+import csv
+import glob
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = '.srp_exports.json'
+EXPORT_PATTERN = re.compile(r'srp_(\w+?)_(\d{8})_(\d{6})\.csv$')
+
+UNCHANGED = 'unchanged'
+APPENDED = 'appended'
+CHANGED = 'changed'
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(65536), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def read_export_rows(path: str) -> List[List[str]]:
+    """Header plus data rows of an export, without the trailing combined-total row"""
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        rows = [row for row in csv.reader(f) if row]
+    return [row for row in rows if not any('Combined total' in value for value in row)]
+
+
+def find_overlap(old_rows: List[List[str]], new_rows: List[List[str]]) -> Optional[int]:
+    """Number of leading old rows the new export dropped, if it continues the old one
+
+    An export continues the old one when some suffix of the old rows (possibly
+    all of them) is exactly where the new rows begin, as happens when days are
+    appended to a fixed or rolling date range. Returns None otherwise.
+    """
+    if not old_rows or not new_rows:
+        return None
+    for dropped in range(len(old_rows)):
+        if old_rows[dropped] != new_rows[0]:
+            continue
+        kept = old_rows[dropped:]
+        if len(kept) <= len(new_rows) and new_rows[:len(kept)] == kept:
+            return dropped
+    return None
+
+
+class SRPExportStore:
+    """Tracks the current export per chart type in a small manifest next to the files"""
+
+    def __init__(self, downloads_dir: str):
+        self.downloads_dir = downloads_dir
+        self.manifest_path = os.path.join(downloads_dir, MANIFEST_NAME)
+        self.manifest = self.load_manifest()
+
+    def load_manifest(self) -> Dict:
+        try:
+            with open(self.manifest_path, 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable SRP export manifest: {e}")
+            return {}
+
+    def save_manifest(self):
+        tmp_path = f'{self.manifest_path}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.manifest, f, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+
+    def current(self, chart_key: str) -> Optional[Dict]:
+        """Manifest entry of a chart's current export, if its file still exists"""
+        entry = self.manifest.get(chart_key)
+        if entry and os.path.exists(os.path.join(self.downloads_dir, entry['file'])):
+            return entry
+        return None
+
+    def adopt_latest(self, chart_key: str, exclude: str) -> Optional[Dict]:
+        """Build a manifest entry for the newest existing export, e.g. from before the manifest existed"""
+        candidates = [path for path in glob.glob(os.path.join(self.downloads_dir, f'srp_{chart_key}_*.csv'))
+                      if EXPORT_PATTERN.search(os.path.basename(path)) and os.path.abspath(path) != exclude]
+        if not candidates:
+            return None
+        latest = max(candidates, key=os.path.basename)
+        return {
+            'file': os.path.basename(latest),
+            'sha256': file_sha256(latest),
+            'rows': max(0, len(read_export_rows(latest)) - 1)
+        }
+
+    def ingest(self, chart_key: str, path: str) -> Dict:
+        """Compare a fresh download with the chart's current export
+
+        Identical downloads are deleted and the current file is kept. Otherwise
+        the download becomes the current export, and the result reports whether
+        it only appended rows (with how many leading rows the date range dropped).
+        """
+        path = os.path.abspath(path)
+        sha256 = file_sha256(path)
+        previous = self.current(chart_key) or self.adopt_latest(chart_key, exclude=path)
+
+        if previous and previous['sha256'] == sha256:
+            os.remove(path)
+            logger.info(f"SRP {chart_key} export unchanged, keeping {previous['file']}")
+            self.manifest[chart_key] = dict(previous, checked=datetime.now().isoformat())
+            self.save_manifest()
+            return {'status': UNCHANGED, 'path': os.path.join(self.downloads_dir, previous['file']),
+                    'new_rows': 0, 'dropped_rows': 0}
+
+        rows = read_export_rows(path)
+        data_rows = max(0, len(rows) - 1)
+        status, new_rows, dropped_rows = CHANGED, data_rows, 0
+        if previous:
+            previous_rows = read_export_rows(os.path.join(self.downloads_dir, previous['file']))
+            if previous_rows and rows and previous_rows[0] == rows[0]:
+                dropped = find_overlap(previous_rows[1:], rows[1:])
+                if dropped is not None:
+                    status = APPENDED
+                    dropped_rows = dropped
+                    new_rows = data_rows - (len(previous_rows) - 1 - dropped)
+
+        self.manifest[chart_key] = {
+            'file': os.path.basename(path),
+            'sha256': sha256,
+            'rows': data_rows,
+            'status': status,
+            'previous_file': previous['file'] if previous else None,
+            'new_rows': new_rows,
+            'dropped_rows': dropped_rows,
+            'checked': datetime.now().isoformat()
+        }
+        self.save_manifest()
+        logger.info(f"SRP {chart_key} export {status}: {new_rows} new rows"
+                    + (f", {dropped_rows} dropped from the start of the range" if dropped_rows else ''))
+        return {'status': status, 'path': path, 'new_rows': new_rows, 'dropped_rows': dropped_rows}
+
+    def prune(self, keep_files: int = 5, keep_days: float = 30) -> int:
+        """Delete superseded exports beyond the newest keep_files per chart that are older than keep_days
+
+        A chart's current export is never deleted.
+        """
+        current_files = {entry['file'] for entry in self.manifest.values()}
+        by_chart = {}
+        for path in glob.glob(os.path.join(self.downloads_dir, 'srp_*.csv')):
+            match = EXPORT_PATTERN.search(os.path.basename(path))
+            if match:
+                by_chart.setdefault(match.group(1), []).append(path)
+
+        cutoff = time.time() - keep_days * 86400
+        removed = 0
+        for paths in by_chart.values():
+            paths.sort(key=os.path.basename, reverse=True)
+            for path in paths[keep_files:]:
+                if os.path.basename(path) in current_files or os.path.getmtime(path) >= cutoff:
+                    continue
+                try:
+                    os.remove(path)
+                    removed += 1
+                except OSError as e:
+                    logger.warning(f"Failed to prune SRP export {path}: {e}")
+        if removed:
+            logger.info(f"Pruned {removed} old SRP export files")
+        return removed
@@ -0,0 +1,26 @@
+"""
+Shared fixtures for the EG4-SRP Monitor tests
+"""
+
+import importlib
+import os
+import sys
+
+import pytest
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+
+@pytest.fixture(scope='session')
+def app_module(tmp_path_factory):
+    """The app module, imported from a scratch directory so its logs, config and data stay out of the repo"""
+    workdir = tmp_path_factory.mktemp('app')
+    for name in ('logs', 'data', 'config'):
+        (workdir / name).mkdir()
+    previous = os.getcwd()
+    os.chdir(workdir)
+    try:
+        yield importlib.import_module('app')
+    finally:
+        os.chdir(previous)
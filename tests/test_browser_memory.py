@@ -0,0 +1,53 @@
+"""
+Browser memory budgets: PSS sampling, minimum age and consecutive over-budget samples
+"""
+
+import os
+import time
+
+from browser_memory import BrowserMemoryTracker, SourceMemory, pss_bytes, rss_bytes
+
+
+def tracked(age_minutes, samples):
+    tracker = BrowserMemoryTracker()
+    memory = SourceMemory('eg4', 12345, 100)
+    memory.started_at = time.time() - age_minutes * 60
+    for offset, pss_mb in enumerate(samples):
+        memory.timeline.append((memory.started_at + offset + 1, pss_mb))
+    tracker.sources['eg4'] = memory
+    return tracker
+
+
+def test_pss_of_own_process_is_at_most_rss():
+    pid = os.getpid()
+    assert 0 < pss_bytes(pid) <= rss_bytes(pid)
+
+
+def test_young_browser_is_not_recycled():
+    tracker = tracked(10, [900, 900, 900])
+    assert tracker.needs_recycle('eg4', 500, 360, min_age_minutes=30) is None
+
+
+def test_single_spike_is_not_recycled():
+    tracker = tracked(60, [300, 300, 900])
+    assert tracker.needs_recycle('eg4', 500, 360) is None
+
+
+def test_sustained_excess_is_recycled():
+    tracker = tracked(60, [300, 600, 650, 700])
+    assert 'PSS 700' in tracker.needs_recycle('eg4', 500, 360)
+
+
+def test_samples_of_the_previous_browser_do_not_count():
+    tracker = tracked(60, [900, 900])
+    memory = tracker.sources['eg4']
+    # Relaunched: the timeline carries over, the new browser has one sample
+    memory.started_at = time.time() - 3600
+    memory.timeline.clear()
+    memory.timeline.extend([(memory.started_at - 2, 900), (memory.started_at - 1, 900), (memory.started_at + 1, 900)])
+    assert tracker.needs_recycle('eg4', 500, 360) is None
+
+
+def test_old_browser_is_recycled_by_age():
+    tracker = tracked(400, [100])
+    assert 'age' in tracker.needs_recycle('eg4', 500, 360)
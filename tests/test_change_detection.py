@@ -0,0 +1,114 @@
+"""
+Change detection: unchanged EG4 samples extend their run's row instead of adding one
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from data_storage import DataStorage
+
+# A recent minute boundary, so history queries of the last hour see every sample
+BASE = (datetime.now() - timedelta(minutes=30)).replace(second=0, microsecond=0)
+
+
+def sample(power=500, soc=60):
+    return {'battery': {'soc': soc, 'power': power, 'voltage': 52.4}, 'pv': {'power': 1000},
+            'grid': {'power': 0, 'voltage': 240.0}, 'load': {'power': 800}}
+
+
+def make_storage(tmp_path, tiers=None, **change_detection):
+    return DataStorage(str(tmp_path / 'runs.db'), tiers=tiers,
+                       change_detection=dict({'enabled': True}, **change_detection))
+
+
+def store(storage, seconds, **values):
+    assert storage.store_eg4_samples({'primary': sample(**values)}, timestamp=BASE + timedelta(seconds=seconds))
+
+
+def rows(storage):
+    with storage.get_connection() as conn:
+        return [dict(row) for row in conn.execute('SELECT timestamp, samples, valid_until FROM eg4_data ORDER BY id')]
+
+
+@pytest.fixture
+def storage(tmp_path):
+    return make_storage(tmp_path)
+
+
+def test_samples_within_deadbands_extend_the_run(storage):
+    for seconds, power in ((0, 500), (10, 510), (20, 485)):
+        store(storage, seconds, power=power)
+
+    assert [(row['samples'], row['valid_until']) for row in rows(storage)] == [(3, str(BASE + timedelta(seconds=20)))]
+    assert storage.write_stats == {'samples': 3, 'rows': 1}
+
+
+def test_deadbands_compare_with_the_first_sample_of_the_run(storage):
+    # Each step is within the 20 W deadband, the drift from the first sample is not
+    for seconds, power in ((0, 500), (10, 515), (20, 530)):
+        store(storage, seconds, power=power)
+
+    assert [row['samples'] for row in rows(storage)] == [2, 1]
+
+
+def test_any_change_in_exact_columns_starts_a_row(storage):
+    store(storage, 0, soc=60)
+    store(storage, 10, soc=61)
+
+    assert [row['samples'] for row in rows(storage)] == [1, 1]
+
+
+def test_gap_longer_than_max_gap_starts_a_row(tmp_path):
+    storage = make_storage(tmp_path, max_gap_seconds=30)
+    for seconds in (0, 20, 60):
+        store(storage, seconds)
+
+    assert [row['samples'] for row in rows(storage)] == [2, 1]
+
+
+def test_run_longer_than_max_run_starts_a_row(tmp_path):
+    storage = make_storage(tmp_path, max_run_minutes=1)
+    for seconds in range(0, 100, 20):
+        store(storage, seconds)
+
+    assert [(row['timestamp'], row['samples']) for row in rows(storage)] == [
+        (str(BASE), 3), (str(BASE + timedelta(seconds=60)), 2)]
+
+
+def test_runs_do_not_cross_minutes_with_tiered_storage(tmp_path):
+    tiered = make_storage(tmp_path, tiers={'enabled': True})
+    for seconds in (40, 50, 70):
+        store(tiered, seconds)
+    assert [row['samples'] for row in rows(tiered)] == [2, 1]
+
+    untiered = make_storage(tmp_path / 'untiered')
+    for seconds in (40, 50, 70):
+        store(untiered, seconds)
+    assert [row['samples'] for row in rows(untiered)] == [3]
+
+
+def test_history_expands_runs_to_one_row_per_sample(storage):
+    for seconds in (0, 10, 20):
+        store(storage, seconds)
+    store(storage, 30, power=900)
+
+    history = storage.get_historical_eg4_data(hours=1)
+    assert [(row['timestamp'], row['battery_power']) for row in history] == [
+        (str(BASE), 500), (str(BASE + timedelta(seconds=10)), 500),
+        (str(BASE + timedelta(seconds=20)), 500), (str(BASE + timedelta(seconds=30)), 900)]
+    assert all('samples' not in row and 'valid_until' not in row for row in history)
+
+
+def test_a_run_whose_row_is_gone_starts_a_new_row(storage):
+    store(storage, 0)
+    store(storage, 10)
+    # The run's row was trimmed or packed meanwhile
+    with storage.get_connection() as conn:
+        conn.execute('DELETE FROM eg4_data')
+        conn.commit()
+
+    store(storage, 20)
+    store(storage, 30)
+
+    assert [(row['timestamp'], row['samples']) for row in rows(storage)] == [(str(BASE + timedelta(seconds=20)), 2)]
@@ -0,0 +1,150 @@
+"""
+Circuit breaker state transitions, backoff and outcome recording
+"""
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import circuit_breaker
+from circuit_breaker import CLOSED, HALF_OPEN, OPEN, PROBE_TIMEOUT, CircuitBreaker
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """A monotonic clock the test advances by hand"""
+    clock = SimpleNamespace(now=1000.0)
+    clock.advance = lambda seconds: setattr(clock, 'now', clock.now + seconds)
+    monkeypatch.setattr(circuit_breaker, 'time', SimpleNamespace(monotonic=lambda: clock.now, time=time.time))
+    return clock
+
+
+@pytest.fixture
+def breaker(clock):
+    # No jitter, so the backoff delays are exact
+    return CircuitBreaker('srp', failure_threshold=3, base_delay=60, max_delay=1800, jitter=0)
+
+
+def trip(breaker):
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure('timeout')
+
+
+def test_opens_after_failure_threshold_consecutive_failures(breaker):
+    breaker.record_failure('timeout')
+    breaker.record_failure('timeout')
+    assert breaker.state == CLOSED
+    assert breaker.allow_request()
+
+    breaker.record_failure('timeout')
+    assert breaker.state == OPEN
+    assert breaker.retry_in() == 60
+    assert not breaker.allow_request()
+    assert breaker.stats['short_circuited'] == 1
+
+
+def test_success_resets_the_failure_count(breaker):
+    breaker.record_failure('timeout')
+    breaker.record_failure('timeout')
+    breaker.record_success()
+    breaker.record_failure('timeout')
+
+    assert breaker.state == CLOSED
+    assert breaker.consecutive_failures == 1
+
+
+def test_half_open_lets_through_a_single_probe(breaker, clock):
+    trip(breaker)
+    clock.advance(60)
+
+    assert breaker.allow_request()
+    assert breaker.state == HALF_OPEN
+    assert not breaker.allow_request()
+    assert not breaker.allow_request()
+
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    assert breaker.allow_request()
+
+
+def test_failed_probe_reopens_with_a_doubled_backoff(breaker, clock):
+    trip(breaker)
+    clock.advance(60)
+    assert breaker.allow_request()
+
+    breaker.record_failure('still down')
+    assert breaker.state == OPEN
+    assert breaker.retry_in() == 120
+
+    clock.advance(120)
+    assert breaker.allow_request()
+    breaker.record_failure('still down')
+    assert breaker.retry_in() == 240
+    assert breaker.stats['times_opened'] == 3
+
+
+def test_backoff_is_capped_at_max_delay(clock):
+    breaker = CircuitBreaker('srp', failure_threshold=1, base_delay=60, max_delay=100, jitter=0)
+    breaker.record_failure()
+    clock.advance(60)
+    breaker.allow_request()
+    breaker.record_failure()
+
+    assert breaker.retry_in() == 100
+
+
+def test_probe_that_never_reports_back_expires(breaker, clock):
+    trip(breaker)
+    clock.advance(60)
+    assert breaker.allow_request()
+
+    clock.advance(PROBE_TIMEOUT)
+    assert not breaker.allow_request()
+    assert breaker.state == HALF_OPEN
+
+    clock.advance(1)
+    # The lost probe counts as a failure and reopens the breaker
+    assert not breaker.allow_request()
+    assert breaker.state == OPEN
+    assert breaker.last_error == 'probe did not complete'
+    assert breaker.retry_in() == 120
+
+
+async def returning(result):
+    return result
+
+
+async def raising():
+    raise ConnectionError('portal unreachable')
+
+
+@pytest.mark.parametrize('result, validate, error', [
+    (None, None, 'no data returned'),
+    ({}, None, 'no data returned'),
+    ({'usage': []}, lambda data: bool(data['usage']), 'invalid data'),
+])
+def test_call_counts_empty_or_invalid_results_as_failures(breaker, result, validate, error):
+    assert asyncio.run(breaker.call(returning, result, validate=validate)) == result
+
+    assert breaker.consecutive_failures == 1
+    assert breaker.last_error == error
+    assert breaker.stats == {'calls': 1, 'failures': 1, 'short_circuited': 0, 'times_opened': 0}
+
+
+def test_call_records_exceptions_and_returns_none(breaker):
+    assert asyncio.run(breaker.call(raising)) is None
+    assert breaker.last_error == 'portal unreachable'
+
+
+def test_call_success_closes_a_half_open_breaker(breaker, clock):
+    trip(breaker)
+    clock.advance(60)
+    assert breaker.allow_request()
+
+    result = asyncio.run(breaker.call(returning, {'usage': [1]}, validate=lambda data: bool(data['usage'])))
+
+    assert result == {'usage': [1]}
+    assert breaker.state == CLOSED
+    assert breaker.consecutive_failures == 0
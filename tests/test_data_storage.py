@@ -0,0 +1,81 @@
+"""
+EG4 storage with several inverters
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from data_storage import ALL_EG4_DEVICES, CachedDataStorage, DataStorage
+
+
+def sample(soc, power=500):
+    return {
+        'battery': {'soc': soc, 'power': power, 'voltage': 52.4},
+        'pv': {'power': 1000, 'strings': {'pv1': {'power': 1000, 'voltage': 380.0}}},
+        'grid': {'power': 0, 'voltage': 240.0},
+        'load': {'power': 800}
+    }
+
+
+@pytest.fixture
+def storage(tmp_path):
+    storage = DataStorage(str(tmp_path / 'monitor.db'), primary_device='home')
+    now = datetime.now().replace(microsecond=0)
+    storage.store_eg4_batch([
+        (now - timedelta(minutes=2), 'home', sample(60)),
+        (now - timedelta(minutes=1), 'garage', sample(90)),
+    ])
+    return storage
+
+
+def test_latest_defaults_to_the_primary_device(storage):
+    assert storage.get_latest_eg4_data()['device'] == 'home'
+    assert storage.get_latest_eg4_data(device='garage')['battery_soc'] == 90
+    assert storage.get_latest_eg4_data(device=ALL_EG4_DEVICES)['device'] == 'garage'
+
+
+def test_history_defaults_to_the_primary_device(storage):
+    assert {row['device'] for row in storage.get_historical_eg4_data(hours=1)} == {'home'}
+    assert {row['device'] for row in storage.get_historical_eg4_data(hours=1, device=ALL_EG4_DEVICES)} == {'home', 'garage'}
+
+
+def test_dashboard_cache_shows_the_primary_device(storage):
+    assert CachedDataStorage(storage).get_dashboard_data()['latest_eg4']['device'] == 'home'
+
+
+@pytest.fixture
+def packed_storage(tmp_path):
+    """Storage whose samples were all packed into series chunks, leaving no raw rows"""
+    storage = DataStorage(str(tmp_path / 'packed.db'), series={'enabled': True}, primary_device='home')
+    now = datetime.now().replace(microsecond=0)
+    storage.store_eg4_batch([
+        (now - timedelta(minutes=3), 'home', sample(60)),
+        (now - timedelta(minutes=2), 'home', sample(61)),
+        (now - timedelta(minutes=1), 'garage', sample(90)),
+    ])
+    assert storage.pack_series_chunks(now + timedelta(days=1)) == 3
+    return storage
+
+
+def test_packed_devices_are_listed(packed_storage):
+    devices = {device['device']: device for device in packed_storage.get_eg4_devices()}
+
+    assert set(devices) == {'garage', 'home'}
+    assert devices['home']['samples'] == 2
+    assert devices['garage']['samples'] == 1
+    assert all(device['latest'] for device in devices.values())
+
+
+def test_packed_devices_are_restored(packed_storage, app_module, monkeypatch):
+    monkeypatch.setattr(app_module, 'data_storage', packed_storage)
+    monkeypatch.setattr(app_module, 'monitor_data', dict(app_module.monitor_data, eg4=None, eg4_devices={}))
+    monkeypatch.setitem(app_module.alert_config, 'eg4_fleet', {'primary_device': 'home'})
+    monkeypatch.setitem(app_module.alert_config, 'warm_start', {'enabled': False})
+
+    app_module.restore_data_on_startup()
+
+    devices = app_module.monitor_data['eg4_devices']
+    assert set(devices) == {'garage', 'home'}
+    assert devices['home']['battery']['soc'] == 61
+    assert devices['garage']['battery']['soc'] == 90
@@ -0,0 +1,137 @@
+"""
+EG4 HTTP collector against a local mock of the portal's runtime endpoint
+"""
+
+import asyncio
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from eg4_http_client import EG4HttpClient, SessionExpiredError, RUNTIME_PATH, parse_runtime_payload
+
+SESSION_COOKIE = 'JSESSIONID'
+
+RUNTIME_PAYLOAD = {
+    'success': True,
+    'soc': 87,
+    'pCharge': 1200,
+    'pDisCharge': 0,
+    'vBat': 532,
+    'ppv1': 2100,
+    'ppv2': 1900,
+    'ppv3': 0,
+    'vpv1': 3805,
+    'vpv2': 3712,
+    'vpv3': 0,
+    'pToGrid': 0,
+    'pToUser': 350,
+    'vacr': 2411,
+    'consumptionPower': 3150
+}
+
+
+def mock_portal(state):
+    """The runtime endpoint: JSON with a valid session cookie, a redirect to the login page without"""
+    async def runtime(request):
+        state['requests'] += 1
+        form = await request.post()
+        state['serial'] = form.get('serialNum')
+        if request.cookies.get(SESSION_COOKIE) != state['session']:
+            raise web.HTTPFound('/WManage/web/login')
+        return web.json_response(state.get('payload', RUNTIME_PAYLOAD))
+
+    app = web.Application()
+    app.router.add_post(f'/WManage{RUNTIME_PATH}', runtime)
+    return app
+
+
+async def poll(state, cookie):
+    server = TestServer(mock_portal(state))
+    await server.start_server()
+    client = EG4HttpClient(base_url=str(server.make_url('/WManage')), serial_number='1234567890')
+    client.load_cookies([{'name': SESSION_COOKIE, 'value': cookie}])
+    try:
+        return client, await client.get_runtime()
+    except SessionExpiredError as e:
+        return client, e
+    finally:
+        await client.close()
+        await server.close()
+
+
+def test_parse_runtime_payload():
+    data = parse_runtime_payload(RUNTIME_PAYLOAD)
+    assert data['battery'] == {'soc': 87, 'power': 1200, 'voltage': 53.2}
+    assert data['pv']['total_power'] == 4000
+    assert data['pv']['strings']['pv1'] == {'power': 2100, 'voltage': 380.5}
+    assert data['grid'] == {'power': -350, 'voltage': 241.1}
+    assert data['load'] == {'power': 3150}
+
+
+def test_parse_runtime_payload_tolerates_missing_and_bad_fields():
+    data = parse_runtime_payload({'soc': 'n/a', 'vBat': None})
+    assert data['battery'] == {'soc': 0, 'power': 0, 'voltage': 0}
+    assert data['pv']['power'] == 0
+
+
+def test_polls_runtime_with_exported_session():
+    state = {'requests': 0, 'session': 'abc'}
+    client, data = asyncio.run(poll(state, 'abc'))
+    assert data == parse_runtime_payload(RUNTIME_PAYLOAD)
+    assert state['serial'] == '1234567890'
+    assert client.stats['requests'] == 1 and client.stats['failures'] == 0
+    assert client.ready
+
+
+def test_login_redirect_expires_session():
+    state = {'requests': 0, 'session': 'abc'}
+    client, error = asyncio.run(poll(state, 'stale'))
+    assert isinstance(error, SessionExpiredError)
+    assert client.stats['session_expirations'] == 1
+    # The cookies are dropped so the browser logs in again
+    assert not client.ready
+
+
+def test_unsuccessful_payload_expires_session():
+    state = {'requests': 0, 'session': 'abc', 'payload': {'success': False, 'msg': 'not login'}}
+    client, error = asyncio.run(poll(state, 'abc'))
+    assert isinstance(error, SessionExpiredError)
+    assert 'not login' in str(error)
+    assert not client.ready
+
+
+def test_expired_session_falls_back_to_browser(app_module):
+    state = {'requests': 0, 'session': 'abc'}
+    calls = []
+
+    async def run():
+        server = TestServer(mock_portal(state))
+        await server.start_server()
+        monitor = app_module.EG4Monitor()
+        monitor.http_client = EG4HttpClient(base_url=str(server.make_url('/WManage')), serial_number='1234567890')
+        monitor.http_client.load_cookies([{'name': SESSION_COOKIE, 'value': 'stale'}])
+        monitor.logged_in = True
+
+        async def is_logged_in():
+            calls.append('is_logged_in')
+            return False
+
+        async def login():
+            calls.append('login')
+            return False
+
+        monitor.is_logged_in = is_logged_in
+        monitor.login = login
+        try:
+            return monitor, await monitor.get_data()
+        finally:
+            await monitor.http_client.close()
+            await server.close()
+
+    monitor, data = asyncio.run(run())
+    assert state['requests'] == 1
+    assert data is None
+    assert calls == ['is_logged_in', 'login']
+    assert not monitor.logged_in
+    assert not monitor.http_client.ready
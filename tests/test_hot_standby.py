@@ -0,0 +1,55 @@
+"""
+Hot standby failover and background close of the retired browser
+"""
+
+import asyncio
+
+from hot_standby import HotStandby
+
+
+class FakeMonitor:
+    def __init__(self, name):
+        self.name = name
+        self.closed = asyncio.Event()
+        self.release = asyncio.Event()
+
+    async def start(self):
+        pass
+
+    async def ensure_session(self):
+        return True
+
+    async def promote(self, standby):
+        self.name, standby.name = standby.name, self.name
+
+    async def close(self):
+        await self.release.wait()
+        self.closed.set()
+
+
+def test_failover_keeps_the_discard_task_until_the_old_browser_is_closed():
+    async def run():
+        built = []
+
+        def factory():
+            built.append(FakeMonitor(f'spare{len(built)}'))
+            return built[-1]
+
+        standby = HotStandby('eg4', factory)
+        standby.ensure_building()
+        await standby.build_task
+        active = FakeMonitor('active')
+        retired = standby.spare
+        assert await standby.failover(active)
+        assert active.name == 'spare0'
+        assert len(standby.discard_tasks) == 1
+        retired.release.set()
+        await asyncio.wait_for(retired.closed.wait(), 1)
+        await asyncio.sleep(0)
+        assert not standby.discard_tasks
+        await standby.build_task
+        assert standby.ready
+        standby.spare.release.set()
+        await standby.close()
+
+    asyncio.run(run())
@@ -0,0 +1,106 @@
+"""
+Bulk ingest endpoint, with JSON lines and columnar bodies
+"""
+
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from data_storage import ALL_EG4_DEVICES, DataStorage
+
+JSONL = 'application/x-ndjson'
+
+
+def sample(timestamp, soc=60, **fields):
+    return dict({'timestamp': timestamp.isoformat(), 'battery': {'soc': soc, 'power': 500, 'voltage': 52.4},
+                 'pv': {'power': 1000}, 'grid': {'power': 0}, 'load': {'power': 800}}, **fields)
+
+
+def jsonl(*samples):
+    return '\n'.join(json.dumps(sample) for sample in samples)
+
+
+@pytest.fixture
+def client(app_module, tmp_path, monkeypatch):
+    storage = DataStorage(str(tmp_path / 'ingest.db'), primary_device='home')
+    monkeypatch.setattr(app_module, 'data_storage', storage)
+    monkeypatch.setattr(app_module, 'broadcast_state', lambda topic, data: None)
+    monkeypatch.delenv('INGEST_TOKEN', raising=False)
+    client = app_module.app.test_client()
+    client.storage = storage
+    return client
+
+
+@pytest.fixture
+def now():
+    return datetime.now().replace(microsecond=0) - timedelta(minutes=10)
+
+
+def test_jsonl_body(client, now):
+    response = client.post('/api/ingest?device=site2', content_type=JSONL,
+                           data=jsonl(sample(now), sample(now + timedelta(seconds=1), soc=61, device='site3')))
+
+    assert response.status_code == 200
+    assert response.get_json()['accepted'] == 2
+    stored = client.storage.get_historical_eg4_data(hours=1, device=ALL_EG4_DEVICES)
+    assert {(row['device'], row['battery_soc']) for row in stored} == {('site2', 60), ('site3', 61)}
+
+
+def test_columnar_body(client, now):
+    body = {'device': 'site2', 'columns': {
+        'timestamp': [now.isoformat(), (now + timedelta(seconds=1)).isoformat()],
+        'battery.soc': [70, 71],
+        'pv.strings.pv1.power': [400, None],
+        'load.power': [800, 810]
+    }}
+    response = client.post('/api/ingest', json=body)
+
+    assert response.status_code == 200
+    assert response.get_json()['accepted'] == 2
+    stored = client.storage.get_historical_eg4_data(hours=1, device='site2')
+    assert [row['battery_soc'] for row in stored] == [70, 71]
+    assert stored[0]['pv1_power'] == 400
+
+
+def test_idempotency_key_replays_the_first_answer(client, now):
+    headers = {'Idempotency-Key': 'batch-1'}
+    first = client.post('/api/ingest?device=site2', content_type=JSONL, headers=headers, data=jsonl(sample(now)))
+    retry = client.post('/api/ingest?device=site2', content_type=JSONL, headers=headers, data=jsonl(sample(now)))
+
+    assert first.get_json()['duplicate'] is False
+    assert retry.get_json()['duplicate'] is True
+    assert retry.get_json()['accepted'] == 1
+    assert len(client.storage.get_historical_eg4_data(hours=1, device='site2')) == 1
+
+
+@pytest.mark.parametrize('fields, error', [
+    ({'battery': None}, 'battery must be an object'),
+    ({'battery': 5}, 'battery must be an object'),
+    ({'pv': {'strings': 5}}, 'pv.strings must be an object'),
+    ({'pv': {'power': 1000, 'strings': {'pv1': 5}}}, 'pv.strings.pv1 must be an object'),
+    ({'battery': {'soc': 'full'}}, 'battery.soc must be a number'),
+])
+def test_malformed_samples_are_rejected_per_index(client, now, fields, error):
+    response = client.post('/api/ingest?device=site2', content_type=JSONL,
+                           data=jsonl(sample(now), sample(now + timedelta(seconds=1), **fields)))
+
+    assert response.status_code == 200
+    result = response.get_json()
+    assert result['accepted'] == 1
+    assert result['errors'] == [{'index': 1, 'error': error}]
+
+
+def test_validation_errors_become_sample_errors(client, now):
+    # A null reading reaches the validator, which cannot compare it
+    response = client.post('/api/ingest?device=site2', content_type=JSONL,
+                           data=jsonl(sample(now, soc=None)))
+
+    assert response.status_code == 422
+    assert response.get_json()['errors'][0]['error'].startswith('failed EG4 data validation')
+
+
+def test_unparseable_body_is_rejected(client):
+    response = client.post('/api/ingest', data='{not json', content_type='application/json')
+
+    assert response.status_code == 400
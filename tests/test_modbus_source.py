@@ -0,0 +1,66 @@
+"""
+Modbus data source read back from the inverter simulator over a local TCP socket
+"""
+
+import asyncio
+
+import pytest
+
+from modbus_simulator import ModbusSimulator
+from modbus_source import ModbusError, ModbusInverterSource
+
+
+@pytest.fixture
+def simulator():
+    with ModbusSimulator(unit_id=1) as sim:
+        yield sim
+
+
+def read(port):
+    async def run():
+        source = ModbusInverterSource('127.0.0.1', port, timeout=2.0)
+        try:
+            return source, await source.get_data()
+        finally:
+            await source.close()
+    return asyncio.run(run())
+
+
+def test_round_trip_matches_simulated_registers(simulator):
+    source, data = read(simulator.port)
+
+    assert data['source'] == 'modbus'
+    assert data['battery'] == {'soc': 85, 'power': 1200, 'voltage': 53.2}
+    assert data['pv']['total_power'] == 3300
+    assert data['pv']['strings']['pv1'] == {'power': 1800, 'voltage': 380.5}
+    assert data['pv']['strings']['pv2'] == {'power': 1500, 'voltage': 371.0}
+    assert data['grid'] == {'power': -350, 'voltage': 241.6}
+    # Load is derived: inverter output plus grid import, less rectified and exported power
+    assert data['load'] == {'power': 2100}
+    assert source.stats['failures'] == 0
+    assert source.stats['last_latency_ms'] is not None
+
+
+def test_changed_registers_are_read_back(simulator):
+    simulator.set_values({'soc': 40, 'pToGrid': 900, 'pToUser': 0})
+    _, data = read(simulator.port)
+
+    assert data['battery']['soc'] == 40
+    assert data['grid']['power'] == 900
+    assert data['load']['power'] == 850
+
+
+def test_wrong_unit_id_raises_modbus_error(simulator):
+    async def run():
+        source = ModbusInverterSource('127.0.0.1', simulator.port, unit_id=7, timeout=2.0)
+        try:
+            with pytest.raises(ModbusError, match='exception 11'):
+                await source.get_data()
+            return source
+        finally:
+            await source.close()
+
+    source = asyncio.run(run())
+    assert source.stats['failures'] == 1
+    assert 'gateway target' in source.stats['last_error']
+    assert simulator.stats['exceptions'] == 1
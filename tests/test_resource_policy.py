@@ -0,0 +1,88 @@
+"""
+Resource policy accounting of blocked and loaded bytes
+"""
+
+import asyncio
+
+
+class FakeRequest:
+    def __init__(self, resource_type, url='https://monitor.eg4electronics.com/x', body_size=None, content_length=None):
+        self.resource_type = resource_type
+        self.url = url
+        self.body_size = body_size
+        self.content_length = content_length
+
+    async def sizes(self):
+        if self.body_size is None:
+            raise RuntimeError('sizes unavailable')
+        return {'responseBodySize': self.body_size}
+
+    async def response(self):
+        request = self
+
+        class Response:
+            headers = {} if request.content_length is None else {'content-length': str(request.content_length)}
+        return Response()
+
+
+class FakeRoute:
+    def __init__(self, request):
+        self.request = request
+        self.outcome = None
+
+    async def continue_(self):
+        self.outcome = 'continued'
+
+    async def abort(self):
+        self.outcome = 'aborted'
+
+
+def enforced_policy(app_module, monkeypatch, **config):
+    """An EG4 policy with first-party domains enforced, on top of the defaults"""
+    monkeypatch.setitem(app_module.alert_config['resource_policy'], 'eg4',
+                        dict(app_module.DEFAULT_RESOURCE_POLICIES['eg4'], enforce_domains=True, **config))
+    return app_module.ResourcePolicy('eg4')
+
+
+def test_blocked_types_use_default_sizes(app_module, monkeypatch):
+    policy = enforced_policy(app_module, monkeypatch, blocked_types=['image', 'manifest'])
+    route = FakeRoute(FakeRequest('image'))
+    asyncio.run(policy.handle_route(route))
+    assert route.outcome == 'aborted'
+    assert policy.stats['bytes_saved_estimate'] == app_module.DEFAULT_BLOCKED_TYPE_SIZES['image']
+    asyncio.run(policy.handle_route(FakeRoute(FakeRequest('manifest'))))
+    assert policy.stats['blocked_unsized'] == 1
+
+
+def test_defaults_block_only_heavy_types(app_module):
+    policy = app_module.ResourcePolicy('eg4')
+    for resource_type in ('image', 'font', 'media'):
+        route = FakeRoute(FakeRequest(resource_type))
+        asyncio.run(policy.handle_route(route))
+        assert route.outcome == 'aborted'
+    for resource_type in ('document', 'script', 'stylesheet', 'xhr', 'other'):
+        route = FakeRoute(FakeRequest(resource_type))
+        asyncio.run(policy.handle_route(route))
+        assert route.outcome == 'continued'
+
+
+def test_other_domains_are_only_counted_by_default(app_module):
+    policy = app_module.ResourcePolicy('eg4')
+    for _ in range(2):
+        route = FakeRoute(FakeRequest('script', url='https://www.google.com/recaptcha/api.js'))
+        asyncio.run(policy.handle_route(route))
+        assert route.outcome == 'continued'
+    assert policy.stats['outside_domains'] == {'www.google.com': 2}
+    assert policy.stats['requests_blocked'] == 0
+
+
+def test_loaded_sizes_count_without_content_length(app_module, monkeypatch):
+    policy = enforced_policy(app_module, monkeypatch)
+    asyncio.run(policy.handle_request_finished(FakeRequest('script', body_size=80000)))
+    asyncio.run(policy.handle_request_finished(FakeRequest('script', content_length=20000)))
+    assert policy.stats['bytes_loaded'] == 100000
+    # A script from a third-party domain is blocked and estimated from the learned average
+    route = FakeRoute(FakeRequest('script', url='https://tracker.example.com/t.js'))
+    asyncio.run(policy.handle_route(route))
+    assert route.outcome == 'aborted'
+    assert policy.stats['bytes_saved_estimate'] == 50000
@@ -0,0 +1,35 @@
+"""
+Phase timing percentiles
+"""
+
+import pytest
+
+from scrape_phases import PhaseStats, percentile
+
+
+@pytest.mark.parametrize('count, fraction, expected', [
+    (10, 0.5, 5),
+    (10, 0.9, 9),
+    (10, 0.99, 10),
+    (500, 0.99, 495),
+    (100, 0.07, 7),
+    (1, 0.5, 1),
+])
+def test_percentile_is_nearest_rank(count, fraction, expected):
+    assert percentile(list(range(1, count + 1)), fraction) == expected
+
+
+def test_summary_over_the_rolling_window():
+    stats = PhaseStats(window=10)
+    for seconds in [20.0] + [float(value) for value in range(1, 11)]:
+        stats.record('eg4', 'wait', seconds)
+    stats.record('srp', 'login', 3.0)
+
+    summary = stats.summary('eg4')
+    assert list(summary) == ['eg4']
+    wait = summary['eg4']['wait']
+    # The window keeps the last 10 spans, the totals count every span
+    assert (wait['count'], wait['window'], wait['total_seconds']) == (11, 10, 75.0)
+    assert (wait['p50'], wait['p90'], wait['p99'], wait['max']) == (5.0, 9.0, 10.0, 10.0)
+    assert (wait['last'], wait['mean']) == (10.0, 5.5)
+    assert stats.summary()['srp']['login']['p50'] == 3.0
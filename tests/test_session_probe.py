@@ -0,0 +1,50 @@
+"""
+Session probes of restored login state
+"""
+
+import asyncio
+
+LOGIN_FORM = '''<html><body><form action="/login" method="post">
+<input type="text" name="account"><input type="password" name="password">
+</form></body></html>'''
+
+
+class FakeResponse:
+    def __init__(self, status=200, url='https://portal.example.com/monitor', body='', location=''):
+        self.status = status
+        self.url = url
+        self.body = body
+        self.headers = {'location': location} if location else {}
+
+    @property
+    def ok(self):
+        return 200 <= self.status < 300
+
+    async def text(self):
+        return self.body
+
+
+class FakeContext:
+    def __init__(self, response):
+        self.request = self
+        self.response = response
+
+    async def get(self, url, **kwargs):
+        return self.response
+
+
+def probe(app_module, response):
+    return asyncio.run(app_module.probe_session(FakeContext(response), 'https://portal.example.com/monitor'))
+
+
+def test_monitor_page_is_a_valid_session(app_module):
+    assert probe(app_module, FakeResponse(body='<html><div id="soc">87%</div></html>'))
+
+
+def test_login_redirect_is_not_a_session(app_module):
+    assert not probe(app_module, FakeResponse(status=302, location='/WManage/web/login'))
+
+
+def test_login_form_served_with_200_is_not_a_session(app_module):
+    assert not probe(app_module, FakeResponse(body=LOGIN_FORM))
+    assert not probe(app_module, FakeResponse(body='<script>render({"username": "", "password": ""})</script>'))
@@ -0,0 +1,111 @@
+"""
+SRP export comparison and the incremental chart-data cache
+"""
+
+import os
+
+import pytest
+
+from srp_exports import APPENDED, CHANGED, UNCHANGED, SRPExportStore, find_overlap
+
+HEADER = 'Usage date,Off-peak kWh,On-peak kWh,High temperature (F),Low temperature (F)'
+
+
+def day(number, kwh=None):
+    return f'01/{number:02d}/2026,{kwh if kwh is not None else 10 + number},{number},{90 + number},{70 + number}'
+
+
+def write_export(directory, stamp, days, total=True):
+    """An SRP export file for the net chart, with its trailing combined-total row"""
+    path = os.path.join(directory, f'srp_net_20260201_{stamp}.csv')
+    lines = [HEADER] + days + (['Combined total,999,999,,'] if total else [])
+    with open(path, 'w', encoding='utf-8-sig') as f:
+        f.write('\n'.join(lines) + '\n')
+    return path
+
+
+@pytest.mark.parametrize('old, new, expected', [
+    ([['a'], ['b']], [['a'], ['b']], 0),              # identical
+    ([['a'], ['b']], [['a'], ['b'], ['c']], 0),       # appended
+    ([['a'], ['b'], ['c']], [['b'], ['c'], ['d']], 1),  # rolling range: dropped prefix, appended day
+    ([['a'], ['b']], [['a'], ['x'], ['c']], None),    # an earlier day changed
+    ([['a']], [], None),
+])
+def test_find_overlap(old, new, expected):
+    assert find_overlap(old, new) == expected
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SRPExportStore(str(tmp_path))
+
+
+def test_identical_export_is_discarded(store, tmp_path):
+    first = write_export(str(tmp_path), '000000', [day(1), day(2)])
+    assert store.ingest('net', first)['status'] == CHANGED
+
+    second = write_export(str(tmp_path), '010000', [day(1), day(2)])
+    result = store.ingest('net', second)
+
+    assert result == {'status': UNCHANGED, 'path': first, 'new_rows': 0, 'dropped_rows': 0}
+    assert not os.path.exists(second)
+
+
+def test_appended_days(store, tmp_path):
+    store.ingest('net', write_export(str(tmp_path), '000000', [day(1), day(2)]))
+    result = store.ingest('net', write_export(str(tmp_path), '010000', [day(1), day(2), day(3), day(4)]))
+
+    assert (result['status'], result['new_rows'], result['dropped_rows']) == (APPENDED, 2, 0)
+    assert store.manifest['net']['previous_file'] == 'srp_net_20260201_000000.csv'
+
+
+def test_rolling_range_drops_a_prefix_and_appends(store, tmp_path):
+    store.ingest('net', write_export(str(tmp_path), '000000', [day(1), day(2), day(3)]))
+    result = store.ingest('net', write_export(str(tmp_path), '010000', [day(2), day(3), day(4)]))
+
+    assert (result['status'], result['new_rows'], result['dropped_rows']) == (APPENDED, 1, 1)
+
+
+def test_changed_export(store, tmp_path):
+    store.ingest('net', write_export(str(tmp_path), '000000', [day(1), day(2)]))
+    # SRP revised an earlier day
+    result = store.ingest('net', write_export(str(tmp_path), '010000', [day(1), day(2, kwh=5), day(3)]))
+
+    assert (result['status'], result['new_rows'], result['dropped_rows']) == (CHANGED, 3, 0)
+
+
+@pytest.fixture
+def chart(app_module, tmp_path, monkeypatch):
+    """GET the net chart from a scratch downloads directory, counting parsed rows"""
+    monkeypatch.setattr(app_module, 'DOWNLOADS_DIR', str(tmp_path))
+    monkeypatch.setattr(app_module, 'srp_chart_cache', {})
+    parsed = []
+    parse = app_module.parse_srp_chart_row
+    monkeypatch.setattr(app_module, 'parse_srp_chart_row', lambda chart_type, row: parsed.append(row) or parse(chart_type, row))
+    client = app_module.app.test_client()
+
+    def get():
+        parsed.clear()
+        response = client.get('/api/srp-chart-data?type=net')
+        assert response.status_code == 200
+        return response.get_json(), len(parsed)
+
+    get.clear_cache = app_module.srp_chart_cache.clear
+    return get
+
+
+def test_incremental_chart_parse_matches_a_full_parse(chart, store, tmp_path):
+    store.ingest('net', write_export(str(tmp_path), '000000', [day(1), day(2), day(3)]))
+    first, parsed = chart()
+    assert parsed == 3
+    assert first['labels'] == ['Jan 01', 'Jan 02', 'Jan 03']
+
+    store.ingest('net', write_export(str(tmp_path), '010000', [day(2), day(3), day(4), day(5)]))
+    incremental, parsed = chart()
+    assert parsed == 2
+
+    chart.clear_cache()
+    full, parsed = chart()
+    assert parsed == 4
+    assert incremental == full
+    assert full['labels'] == ['Jan 02', 'Jan 03', 'Jan 04', 'Jan 05']
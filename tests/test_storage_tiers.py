@@ -0,0 +1,107 @@
+"""
+Tiered EG4 storage: rollups, trimming of aged raw samples and merging of late backfills
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from data_storage import DataStorage
+
+NOW = datetime(2026, 1, 10, 12, 0, 0)
+OLD = NOW - timedelta(days=3)
+
+
+def sample(soc, power=500):
+    return {'battery': {'soc': soc, 'power': power, 'voltage': 52.4}, 'pv': {'power': 1000},
+            'grid': {'power': 0}, 'load': {'power': 800}}
+
+
+@pytest.fixture
+def storage(tmp_path):
+    storage = DataStorage(str(tmp_path / 'tiers.db'), tiers={'enabled': True, 'raw_hours': 48})
+    storage.store_eg4_batch([
+        (OLD, 'primary', sample(60, 100)),
+        (OLD + timedelta(seconds=30), 'primary', sample(62, 300)),
+        (OLD + timedelta(minutes=1), 'primary', sample(70)),
+        (NOW - timedelta(hours=1), 'primary', sample(80)),
+    ])
+    return storage
+
+
+def minute_bucket(storage, bucket):
+    with storage.get_connection() as conn:
+        row = conn.execute('SELECT * FROM eg4_rollups WHERE resolution = 60 AND bucket = ?',
+                           (str(bucket),)).fetchone()
+        return dict(row) if row else None
+
+
+def raw_timestamps(storage):
+    with storage.get_connection() as conn:
+        return [row[0] for row in conn.execute('SELECT timestamp FROM eg4_data ORDER BY timestamp')]
+
+
+def test_rollup_aggregates_each_minute_and_hour(storage):
+    result = storage.maintain_tiers(NOW)
+
+    assert result['rolled_up'][60] == 3
+    bucket = minute_bucket(storage, OLD)
+    assert bucket['samples'] == 2
+    assert bucket['battery_soc_avg'] == 61
+    assert (bucket['battery_power_min'], bucket['battery_power_max']) == (100, 300)
+    with storage.get_connection() as conn:
+        hour = conn.execute('SELECT samples, battery_soc_avg FROM eg4_rollups WHERE resolution = 3600 AND bucket = ?',
+                            (str(OLD),)).fetchone()
+    assert hour['samples'] == 3
+    assert hour['battery_soc_avg'] == pytest.approx((60 + 62 + 70) / 3)
+
+
+def test_trim_drops_only_raw_samples_older_than_the_raw_tier(storage):
+    result = storage.maintain_tiers(NOW)
+
+    assert result['deleted']['raw'] == 3
+    assert len(raw_timestamps(storage)) == 1
+    # The trimmed minutes are still answered from their rollups
+    assert minute_bucket(storage, OLD + timedelta(minutes=1))['battery_soc_avg'] == 70
+
+
+def test_raw_samples_are_kept_until_rolled_up(tmp_path):
+    storage = DataStorage(str(tmp_path / 'tiers.db'), tiers={'enabled': True, 'raw_hours': 48})
+    storage.store_eg4_batch([(OLD, 'primary', sample(60))])
+    with storage.get_connection() as conn:
+        # A rollup that stopped before the old sample's minute
+        storage.set_state(conn, 60, OLD - timedelta(minutes=5))
+        conn.commit()
+    storage.pack_series_chunks = lambda now=None: 0
+    storage.rollup_eg4_data = lambda now=None: {}
+
+    storage.maintain_tiers(NOW)
+    assert len(raw_timestamps(storage)) == 1
+
+
+def test_backfill_into_trimmed_range_is_merged_into_its_buckets(storage):
+    storage.maintain_tiers(NOW)
+
+    # A late sample for a minute whose raw samples are already gone
+    storage.store_eg4_batch([(OLD + timedelta(seconds=45), 'primary', sample(70, 500))])
+    result = storage.maintain_tiers(NOW)
+
+    assert result['rolled_up']['merged'] >= 1
+    bucket = minute_bucket(storage, OLD)
+    assert bucket['samples'] == 3
+    assert bucket['battery_soc_avg'] == pytest.approx((60 + 62 + 70) / 3)
+    assert bucket['battery_power_max'] == 500
+    # Merged, then dropped like the rest of the trimmed range
+    assert len(raw_timestamps(storage)) == 1
+
+
+def test_backfill_within_raw_range_reopens_its_buckets(storage):
+    storage.maintain_tiers(NOW)
+    recent = (NOW - timedelta(hours=1)).replace(second=0)
+
+    storage.store_eg4_batch([(recent + timedelta(seconds=20), 'primary', sample(90))])
+    storage.maintain_tiers(NOW)
+
+    bucket = minute_bucket(storage, recent)
+    assert bucket['samples'] == 2
+    assert bucket['battery_soc_avg'] == 85
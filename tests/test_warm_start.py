@@ -0,0 +1,79 @@
+"""
+Warm-start history buffer and snapshot encoding, which other threads write to concurrently
+"""
+
+import json
+import threading
+import time
+
+from warm_start import HISTORY_FIELDS, RecentHistory
+
+
+def sample(soc):
+    return {'battery': {'soc': soc, 'power': 100, 'voltage': 52.0}, 'pv': {'power': 900},
+            'grid': {'power': 0}, 'load': {'power': 800}}
+
+
+def waits_for(lock, action):
+    """True when action blocks while lock is held by another thread, and then completes"""
+    done = threading.Event()
+    with lock:
+        thread = threading.Thread(target=lambda: (action(), done.set()))
+        thread.start()
+        blocked = not done.wait(0.2)
+    thread.join(timeout=5)
+    return blocked and done.is_set()
+
+
+def test_history_rows_trim_old_samples():
+    history = RecentHistory(max_age_seconds=60)
+    now = time.time()
+    history.append('home', sample(50), timestamp=now - 120)
+    history.append('home', sample(51), timestamp=now)
+
+    rows = history.rows('home')['home']
+    assert len(rows) == 1
+    assert rows[0][1 + HISTORY_FIELDS.index('battery.soc')] == 51
+
+
+def test_history_access_holds_the_lock():
+    history = RecentHistory()
+
+    assert waits_for(history.lock, lambda: history.append('home', sample(60)))
+    assert waits_for(history.lock, history.to_dict)
+    assert waits_for(history.lock, lambda: history.load({'fields': list(HISTORY_FIELDS), 'devices': {}}))
+    assert len(history.rows()['home']) == 1
+
+
+def test_snapshot_copies_monitor_data_under_its_lock(app_module, monkeypatch):
+    monkeypatch.setattr(app_module, 'monitor_data', dict(app_module.monitor_data, eg4_devices={}))
+    monkeypatch.setattr(app_module, 'recent_history', RecentHistory())
+    monkeypatch.setattr(app_module, 'broadcast_state', lambda topic, data: None)
+    monkeypatch.setattr(app_module, 'data_storage', None)
+
+    assert waits_for(app_module.monitor_data_lock, app_module.encode_warm_start)
+    assert waits_for(app_module.monitor_data_lock, lambda: app_module.publish_eg4_fleet_data({'garage': sample(70)}))
+
+    snapshot = json.loads(app_module.encode_warm_start())
+    assert snapshot['monitor_data']['eg4_devices']['garage']['battery']['soc'] == 70
+    assert snapshot['history']['devices']['garage'][0][1 + HISTORY_FIELDS.index('battery.soc')] == 70
+
+
+def test_restore_leaves_connection_flags_to_live_samples(app_module, monkeypatch, tmp_path):
+    path = str(tmp_path / 'warm_start.json')
+    monkeypatch.setattr(app_module, 'monitor_data', dict(app_module.monitor_data, enphase={},
+                                                         eg4_connected=False, enphase_connected=False))
+    monkeypatch.setattr(app_module, 'recent_history', RecentHistory())
+    monkeypatch.setattr(app_module, 'warm_start_status', dict(app_module.warm_start_status))
+    monkeypatch.setitem(app_module.alert_config, 'warm_start', {'enabled': True, 'path': path})
+    monkeypatch.setattr(app_module.atexit, 'register', lambda func: None)
+    snapshot = {'monitor_data': {'enphase': {'latest_power_w': 1200}, 'eg4_connected': True,
+                                 'enphase_connected': True}}
+    with open(path, 'wb') as f:
+        f.write(app_module.encode_snapshot(snapshot))
+
+    app_module.restore_warm_start()
+
+    assert app_module.monitor_data['enphase'] == {'latest_power_w': 1200}
+    assert app_module.monitor_data['eg4_connected'] is False
+    assert app_module.monitor_data['enphase_connected'] is False
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Topic Broadcasts for EG4-SRP Monitor
+Tracks which Socket.IO rooms (topics) each client subscribed to and coalesces
+emits per topic, so a burst of updates is sent once per interval with the
+latest value, and only to the clients watching that topic
+"""
+
+import logging
+import threading
+from collections import Counter
+from typing import Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Rooms a client can join, besides one 'device:<name>' room per EG4 inverter
+TOPIC_ROOMS = ('eg4', 'eg4_devices', 'srp', 'enphase', 'health', 'alerts', 'logs')
+DEVICE_ROOM_PREFIX = 'device:'
+
+
+def is_topic_room(room) -> bool:
+    return isinstance(room, str) and (room in TOPIC_ROOMS or
+                                      (room.startswith(DEVICE_ROOM_PREFIX) and len(room) > len(DEVICE_ROOM_PREFIX)))
+
+
+def topic_rooms(topic: str) -> List[str]:
+    """Rooms that receive a topic: a device's updates also go to everyone watching all devices"""
+    if topic.startswith(DEVICE_ROOM_PREFIX):
+        return ['eg4_devices', topic]
+    return [topic]
+
+
+class TopicHub:
+    """Room subscriptions per client and emits coalesced per topic"""
+
+    def __init__(self, interval: float = 1.0):
+        self.interval = interval
+        self.clients = {}
+        self.watchers = Counter()
+        self.pending = {}
+        self.lock = threading.Lock()
+        self.stats = {'submitted': 0, 'coalesced': 0, 'sent': 0}
+
+    def subscribe(self, sid: str, rooms: Iterable[str]) -> List[str]:
+        """Add rooms to a client's subscriptions, returning those it was not in yet"""
+        with self.lock:
+            current = self.clients.setdefault(sid, set())
+            joined = [room for room in dict.fromkeys(rooms) if is_topic_room(room) and room not in current]
+            current.update(joined)
+            self.watchers.update(joined)
+        return joined
+
+    def unsubscribe(self, sid: str, rooms: Iterable[str]) -> List[str]:
+        with self.lock:
+            current = self.clients.get(sid, set())
+            left = [room for room in dict.fromkeys(rooms) if room in current]
+            current.difference_update(left)
+            self.watchers.subtract(left)
+        return left
+
+    def drop(self, sid: str):
+        """Forget a disconnected client"""
+        with self.lock:
+            self.watchers.subtract(self.clients.pop(sid, ()))
+
+    def rooms_of(self, sid: str) -> set:
+        with self.lock:
+            return set(self.clients.get(sid, ()))
+
+    def watched(self, *rooms: str) -> bool:
+        return any(self.watchers[room] > 0 for room in rooms)
+
+    def submit(self, key: str, value, send: Callable, combine: Optional[Callable] = None):
+        """Queue value for the next flush, replacing a pending value of the same key
+
+        With combine, a pending value is merged with the new one instead, e.g.
+        to concatenate log entries. Without an interval, send right away.
+        """
+        with self.lock:
+            self.stats['submitted'] += 1
+            if key in self.pending:
+                self.stats['coalesced'] += 1
+                if combine:
+                    value = combine(self.pending[key][0], value)
+            self.pending[key] = (value, send)
+        if self.interval <= 0:
+            self.flush()
+
+    def flush(self) -> int:
+        """Send every pending value, returning how many were sent"""
+        with self.lock:
+            pending, self.pending = self.pending, {}
+        for key, (value, send) in pending.items():
+            try:
+                send(value)
+            except Exception as e:
+                logger.error(f"Failed to send {key} update: {e}")
+        with self.lock:
+            self.stats['sent'] += len(pending)
+        return len(pending)
+
+    def state(self) -> Dict:
+        with self.lock:
+            return dict(self.stats, interval=self.interval, clients=len(self.clients),
+                        rooms={room: count for room, count in self.watchers.items() if count > 0})
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Warm-Start Snapshot for EG4-SRP Monitor
+Periodically writes the live state (latest readings, health, scheduler state,
+last collection per source and a buffer of recent samples) to one compact JSON
+file, and loads it at boot so a restart is invisible to clients and does not
+repeat scrapes that had just run
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+from ingest import get_path
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_VERSION = 1
+
+# Fields kept per sample in the recent history buffer, as dotted paths into the EG4 data format
+HISTORY_FIELDS = ('battery.soc', 'battery.power', 'battery.voltage', 'pv.power', 'grid.power', 'load.power')
+
+
+class RecentHistory:
+    """Recent EG4 samples per device, as compact [epoch seconds, value, ...] rows
+
+    Collectors append and request threads read concurrently, so every access
+    holds the lock.
+    """
+
+    def __init__(self, max_age_seconds: float = 3 * 3600, max_samples: int = 5000):
+        self.max_age_seconds = max_age_seconds
+        self.max_samples = max_samples
+        self.devices = {}
+        self.lock = threading.Lock()
+
+    def append(self, device: str, data: Dict, timestamp: Optional[float] = None):
+        timestamp = time.time() if timestamp is None else timestamp
+        row = [round(timestamp, 3)] + [get_path(data, field) for field in HISTORY_FIELDS]
+        with self.lock:
+            samples = self.devices.get(device)
+            if samples is None:
+                samples = self.devices[device] = deque(maxlen=self.max_samples)
+            samples.append(row)
+            self.trim(samples, timestamp)
+
+    def trim(self, samples: deque, now: float):
+        """Drop samples older than max_age_seconds, with the lock held"""
+        while samples and now - samples[0][0] > self.max_age_seconds:
+            samples.popleft()
+
+    def rows(self, device: Optional[str] = None) -> Dict[str, List[list]]:
+        now = time.time()
+        with self.lock:
+            for samples in self.devices.values():
+                self.trim(samples, now)
+            return {name: list(samples) for name, samples in self.devices.items() if device is None or name == device}
+
+    def to_dict(self) -> Dict:
+        return {'fields': list(HISTORY_FIELDS), 'devices': self.rows()}
+
+    def load(self, saved: Dict) -> int:
+        """Take over a saved buffer, unless its fields differ from the current ones"""
+        if saved.get('fields') != list(HISTORY_FIELDS):
+            return 0
+        count = 0
+        with self.lock:
+            for device, rows in saved.get('devices', {}).items():
+                samples = self.devices[device] = deque(rows, maxlen=self.max_samples)
+                self.trim(samples, time.time())
+                count += len(samples)
+        return count
+
+
+def encode_snapshot(state: Dict) -> bytes:
+    """Serialize a snapshot, tagged with the format version and the time it was taken"""
+    snapshot = dict(state, version=SNAPSHOT_VERSION, saved_at=time.time())
+    return json.dumps(snapshot, separators=(',', ':'), default=str).encode('utf-8')
+
+
+def write_snapshot(path: str, data: bytes):
+    """Replace the snapshot file atomically, so a crash mid-write keeps the previous one"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def load_snapshot(path: str, max_age_seconds: float) -> Optional[Dict]:
+    """The saved snapshot, or None when it is missing, unreadable, of another version or too old"""
+    try:
+        with open(path, 'rb') as f:
+            snapshot = json.loads(f.read())
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable warm-start snapshot: {e}")
+        return None
+    if not isinstance(snapshot, dict) or snapshot.get('version') != SNAPSHOT_VERSION:
+        logger.info("Ignoring warm-start snapshot from another version")
+        return None
+    age = time.time() - snapshot.get('saved_at', 0)
+    if age > max_age_seconds:
+        logger.info(f"Ignoring warm-start snapshot taken {age / 60:.0f} minutes ago")
+        return None
+    return snapshot